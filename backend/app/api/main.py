@@ -11,6 +11,7 @@ from .routes import (
     show_router,
     reservation_router,
     payments_router,
+    export_router,
 )
 
 api_router = APIRouter()
@@ -27,3 +28,4 @@ api_router.include_router(seat_router.router)
 api_router.include_router(show_router.router)
 api_router.include_router(reservation_router.router)
 api_router.include_router(payments_router.router)
+api_router.include_router(export_router.router)
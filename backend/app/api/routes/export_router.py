@@ -0,0 +1,119 @@
+from core import (
+    admin_required,
+    employee_required,
+    EXPORT_MEDIA_TYPES,
+    Region,
+    stream_export,
+    where_range,
+)
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from typing import Literal, Optional
+from models_global import UsersGlobal
+from models_local import Payment, Reservation
+from sqlalchemy import select
+from datetime import datetime
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+
+def export_response(
+    region: str, query, name: str, fmt: str, compress: bool
+) -> StreamingResponse:
+    """
+    Wraps a streaming export of a query in a downloadable response.
+    """
+    filename = f"{name}-{region}.{fmt}"
+    media_type = EXPORT_MEDIA_TYPES[fmt]
+    if compress:
+        # The gzip file is the content itself, not a transfer encoding that
+        # clients would strip while keeping the .gz name
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        stream_export(region, query, fmt, compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get(
+    "/reservations",
+    response_description="Reservations as CSV or NDJSON",
+    summary="Export reservations",
+    description="Stream all reservations of a region matching the filters as CSV or NDJSON, optionally gzip-compressed.",
+)
+async def export_reservations(
+    region: Region,
+    format: Literal["csv", "ndjson"] = "csv",
+    compress: bool = False,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    show_id: Optional[int] = None,
+    current_user: UsersGlobal = Depends(employee_required),
+):
+    """
+    Stream reservations from the database.
+    - **Input**: Region, output format, compression flag and optional filters on creation time range and show.
+    - **Returns**: The reservations, one per line, in creation order.
+    """
+    query = where_range(
+        select(
+            Reservation.id,
+            Reservation.user_id,
+            Reservation.show_id,
+            Reservation.status,
+            Reservation.created_at,
+            Reservation.expires_at,
+        ),
+        Reservation.created_at,
+        created_from,
+        created_to,
+    )
+    if show_id is not None:
+        query = query.where(Reservation.show_id == show_id)
+    query = query.order_by(Reservation.created_at, Reservation.id)
+
+    return export_response(region, query, "reservations", format, compress)
+
+
+@router.get(
+    "/payments",
+    response_description="Payments as CSV or NDJSON",
+    summary="Export payments",
+    description="Stream all payments of a region matching the filters as CSV or NDJSON, optionally gzip-compressed.",
+)
+async def export_payments(
+    region: Region,
+    format: Literal["csv", "ndjson"] = "csv",
+    compress: bool = False,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    show_id: Optional[int] = None,
+    current_user: UsersGlobal = Depends(admin_required),
+):
+    """
+    Stream payments from the database.
+    - **Input**: Region, output format, compression flag and optional filters on creation time range and the show of the reservation.
+    - **Returns**: The payments, one per line, in creation order.
+    """
+    query = where_range(
+        select(
+            Payment.id,
+            Payment.reservation_id,
+            Reservation.show_id,
+            Payment.amount,
+            Payment.payment_method,
+            Payment.status,
+            Payment.created_at,
+        ).join(Reservation, Payment.reservation_id == Reservation.id),
+        Payment.created_at,
+        created_from,
+        created_to,
+    )
+    if show_id is not None:
+        query = query.where(Reservation.show_id == show_id)
+    query = query.order_by(Payment.created_at, Payment.id)
+
+    return export_response(region, query, "payments", format, compress)
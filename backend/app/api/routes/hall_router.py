@@ -1,5 +1,13 @@
-from core import admin_required, get_db_local, logger
-from fastapi import APIRouter, Depends, HTTPException
+from core import (
+    admin_required,
+    get_db_local,
+    get_db_read,
+    hall_layout_cache,
+    logger,
+    occupancy_cache,
+    Region,
+)
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from models_global import UsersGlobal
 from models_local import Hall, HallRow, Seat
 from schemas import (
@@ -8,7 +16,6 @@ from schemas import (
     HallRowsModel,
     HallRowWithSeatsModel,
     SeatModel,
-    SeatHallModel,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -24,15 +31,10 @@ router = APIRouter(prefix="/halls", tags=["Halls"])
     summary="Fetch Halls",
     description="Fetch a list of halls stored in the database.",
 )
-async def get_halls(region: str, db: AsyncSession = Depends(get_db_local)):
+async def get_halls(region: Region, db: AsyncSession = Depends(get_db_read)):
     """
     Retrieve a list of halls stored in the database.
     """
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid region: {region}. Supported regions are 'krakow' and 'warsaw'.",
-        )
     query = select(Hall)
     result = await db.execute(query)
     halls = result.scalars().all()
@@ -48,7 +50,7 @@ async def get_halls(region: str, db: AsyncSession = Depends(get_db_local)):
 )
 async def add_hall(
     hall: HallBase,
-    region: str,
+    region: Region,
     db: AsyncSession = Depends(get_db_local),
     current_user: UsersGlobal = Depends(admin_required),
 ):
@@ -72,7 +74,9 @@ async def add_hall(
     summary="Fetch Hall Details",
     description="Fetch details of a specific hall by ID.",
 )
-async def get_hall(hall_id: int, region: str, db: AsyncSession = Depends(get_db_local)):
+async def get_hall(
+    hall_id: int, region: Region, db: AsyncSession = Depends(get_db_read)
+):
     """
     Retrieve details of a specific hall by ID.
     """
@@ -92,7 +96,7 @@ async def get_hall(hall_id: int, region: str, db: AsyncSession = Depends(get_db_
     description="Fetch rows of a specific hall by ID.",
 )
 async def get_hall_rows(
-    hall_id: int, region: str, db: AsyncSession = Depends(get_db_local)
+    hall_id: int, region: Region, db: AsyncSession = Depends(get_db_read)
 ):
     """
     Retrieve rows of a specific hall by ID.
@@ -110,50 +114,44 @@ async def get_hall_rows(
     response_model=list[HallRowWithSeatsModel],
     response_description="Retrieve hall rows and seats",
     summary="Fetch Hall, Hall Rows and Seats",
-    description="Fetch rows and seats of a specific hall by ID.",
+    description="Fetch rows and seats of a specific hall by ID. The response carries the layout version as its ETag.",
 )
 async def get_hall_rows_seats(
-    hall_id: int, region: str, db: AsyncSession = Depends(get_db_local)
+    hall_id: int,
+    region: Region,
+    request: Request,
+    db: AsyncSession = Depends(get_db_local),
 ):
     """
     Retrieve rows and seats of a specific hall by ID.
+
+    - **Returns**: The pre-serialized layout from the hall layout cache, or
+      HTTP 304 if the client's `If-None-Match` matches the layout version.
+    - **Raises**: HTTP 404 error if the hall has no rows.
     """
-    query = select(HallRow).where(HallRow.hall_id == hall_id)
-    result = await db.execute(query)
-    rows = result.scalars().all()
-    if not rows:
+    layout = await hall_layout_cache.get(region, hall_id, db)
+    if layout is None:
         raise HTTPException(status_code=404, detail="Rows not found")
-    rows_with_seats = []
-    for row in rows:
-        seats_query = select(Seat).where(Seat.row_id == row.id)
-        seats_result = await db.execute(seats_query)
-        seats = seats_result.scalars().all()
-        row_with_seats = HallRowWithSeatsModel(
-            id=row.id,
-            row_number=row.row_number,
-            hall_id=row.hall_id,
-            seat_count=len(seats),
-            seats=[
-                SeatHallModel(id=seat.id, seat_number=seat.seat_number)
-                for seat in seats
-            ],
-        )
-        rows_with_seats.append(row_with_seats)
-    return rows_with_seats
+    headers = {
+        "ETag": f'"{layout.version}"',
+        "X-Layout-Version": layout.version,
+        "Cache-Control": "no-cache",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=layout.body, media_type="application/json", headers=headers)
 
 
 @router.delete("/{hall_id}", status_code=204)
 async def delete_hall(
     hall_id: int,
-    region: str,
+    region: Region,
     db: AsyncSession = Depends(get_db_local),
     current_user: UsersGlobal = Depends(admin_required),
 ):
     """
     Delete a hall and its associated rows and seats.
     """
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(status_code=400, detail="Invalid region.")
     hall = await db.get(Hall, hall_id)
     if not hall:
         raise HTTPException(status_code=404, detail="Hall not found.")
@@ -168,6 +166,8 @@ async def delete_hall(
     # Delete the hall itself
     await db.delete(hall)
     await db.commit()
+    occupancy_cache.invalidate(region)
+    hall_layout_cache.invalidate(region, hall_id)
     # Reset sequence if no halls remain
     result = await db.execute(select(func.count()).select_from(Hall))
     hall_count = result.scalar()
@@ -1,7 +1,16 @@
 from typing import List
 
-from core import admin_required, get_db_local
-from fastapi import APIRouter, Depends, HTTPException
+from core import (
+    admin_required,
+    get_db_local,
+    get_db_read,
+    hall_layout_cache,
+    page_items,
+    paginate,
+    PageParams,
+    Region,
+)
+from fastapi import APIRouter, Depends, HTTPException, Response
 from models_global import UsersGlobal
 from models_local import HallRow
 from schemas import HallRowsBase, HallRowsModel
@@ -21,7 +30,7 @@ router = APIRouter(prefix="/hall_rows", tags=["Hall Rows"])
 )
 async def add_multiple_hall_rows(
     rows: List[HallRowsBase],
-    region: str,
+    region: Region,
     db: AsyncSession = Depends(get_db_local),
     current_user: UsersGlobal = Depends(admin_required),
 ):
@@ -33,9 +42,6 @@ async def add_multiple_hall_rows(
     - Returns: A list of newly added row objects.
     - Raises: HTTP error if any row already exists in the hall.
     """
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(status_code=400, detail="Invalid region.")
-
     for row in rows:
         existing = await db.execute(
             select(HallRow).where(
@@ -51,6 +57,8 @@ async def add_multiple_hall_rows(
     new_rows = [HallRow(**row.model_dump()) for row in rows]
     db.add_all(new_rows)
     await db.commit()
+    for hall_id in {row.hall_id for row in rows}:
+        hall_layout_cache.invalidate(region, hall_id)
 
     for r in new_rows:
         await db.refresh(r)
@@ -63,27 +71,28 @@ async def add_multiple_hall_rows(
     response_model=List[HallRowsModel],
     response_description="Retrieve all hall rows",
     summary="Fetch All Hall Rows",
-    description="Fetch a list of all hall rows. You can optionally filter by hall ID.",
+    description="Fetch a list of hall rows ordered by ID. You can optionally filter by hall ID. Paginated with `limit` and `cursor`; the next cursor is returned in the X-Next-Cursor header.",
 )
 async def get_all_rows(
-    region: str, hall_id: int = None, db: AsyncSession = Depends(get_db_local)
+    region: Region,
+    response: Response,
+    hall_id: int = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db_read),
 ):
     """
-    Retrieve a list of all hall rows.
+    Retrieve a list of hall rows.
 
-    - Input: Optional hall_id to filter rows for a specific hall.
-    - Returns: A list of hall row objects.
+    - Input: Page parameters and an optional hall_id to filter rows for a specific hall.
+    - Returns: A page of hall row objects.
     - Raises: HTTP 404 if no rows are found.
     """
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(status_code=400, detail="Invalid region.")
-
     query = select(HallRow)
     if hall_id:
         query = query.where(HallRow.hall_id == hall_id)
 
-    result = await db.execute(query)
-    rows = result.scalars().all()
+    result = await db.execute(paginate(query, page, HallRow.id, descending=False))
+    rows = page_items(result.scalars().all(), page, response, lambda row: (row.id,))
 
     if not rows:
         raise HTTPException(status_code=404, detail="No rows found.")
@@ -99,7 +108,7 @@ async def get_all_rows(
     description="Fetch all rows belonging to a specific hall by its ID.",
 )
 async def get_rows_by_hall(
-    hall_id: int, region: str, db: AsyncSession = Depends(get_db_local)
+    hall_id: int, region: Region, db: AsyncSession = Depends(get_db_read)
 ):
     """
     Retrieve all rows for a specific hall.
@@ -108,9 +117,6 @@ async def get_rows_by_hall(
     - Returns: List of row objects for the given hall.
     - Raises: HTTP 404 if no rows found for the hall.
     """
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(status_code=400, detail="Invalid region.")
-
     query = select(HallRow).where(HallRow.hall_id == hall_id)
     result = await db.execute(query)
     rows = result.scalars().all()
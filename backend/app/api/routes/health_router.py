@@ -1,4 +1,14 @@
-from core import admin_required, employee_required, user_required
+from core import (
+    admin_required,
+    employee_required,
+    get_pool_status,
+    get_replica_status,
+    login_throttle,
+    password_pool,
+    principal_cache,
+    single_flight,
+    user_required,
+)
 from fastapi import APIRouter, Depends
 from models_global import UsersGlobal
 
@@ -70,3 +80,99 @@ async def employee_health_check(current_user: UsersGlobal = Depends(employee_req
     - **Returns**: A JSON object with a status of 'ok' and a message confirming that the API is running for employees.
     """
     return {"status": "ok", "message": "API is running for employees"}
+
+
+@router.get(
+    "/principal-cache",
+    response_description="Principal cache counters",
+    summary="Principal Cache Statistics",
+    description="Return the hit/miss counters and size of this worker's principal cache. Requires admin authentication.",
+)
+async def principal_cache_stats(current_user: UsersGlobal = Depends(admin_required)):
+    """
+    Report how often authenticated requests were served without the global database.
+
+    - **Requires**: Admin authentication.
+    - **Returns**: Hits, misses, hit ratio and size of the principal cache of the worker serving the request.
+    """
+    return principal_cache.stats()
+
+
+@router.get(
+    "/password-pool",
+    response_description="Password worker pool counters",
+    summary="Password Pool Statistics",
+    description="Return the queue depth and job counters of this worker's password hashing pool. Requires admin authentication.",
+)
+async def password_pool_stats(current_user: UsersGlobal = Depends(admin_required)):
+    """
+    Report the load of the pool hashing and verifying passwords.
+
+    - **Requires**: Admin authentication.
+    - **Returns**: Workers, queued, running and completed jobs and the largest queue depth seen by the worker serving the request.
+    """
+    return password_pool.stats()
+
+
+@router.get(
+    "/login-throttle",
+    response_description="Login throttle counters",
+    summary="Login Throttle Statistics",
+    description="Return the check, rejection and failure counters of this worker's login throttle. Requires admin authentication.",
+)
+async def login_throttle_stats(current_user: UsersGlobal = Depends(admin_required)):
+    """
+    Report how many login attempts were throttled.
+
+    - **Requires**: Admin authentication.
+    - **Returns**: Backend name, checks, rejections, recorded failures, resets and currently blocked keys on the worker serving the request.
+    """
+    return login_throttle.stats()
+
+
+@router.get(
+    "/db-pools",
+    response_description="Connection pool status per database",
+    summary="Database Pool Statistics",
+    description="Return the checked-out connections, overflow usage and checkout wait histogram of every database pool of this worker. Requires admin authentication.",
+)
+async def db_pool_stats(current_user: UsersGlobal = Depends(admin_required)):
+    """
+    Report the connection pool usage of each database.
+
+    - **Requires**: Admin authentication.
+    - **Returns**: Per database (global and each region): pool size, checked-out and idle connections, overflow in use, timeouts and the cumulative checkout wait histogram in milliseconds.
+    """
+    return get_pool_status()
+
+
+@router.get(
+    "/replicas",
+    response_description="Read replica health per replica",
+    summary="Read Replica Status",
+    description="Return whether each regional read replica is currently used for reads by this worker. Requires admin authentication.",
+)
+async def replica_status(current_user: UsersGlobal = Depends(admin_required)):
+    """
+    Report the health of each read replica.
+
+    - **Requires**: Admin authentication.
+    - **Returns**: Per replica: whether it is healthy and the seconds left before a failed replica is tried again.
+    """
+    return get_replica_status()
+
+
+@router.get(
+    "/coalescing",
+    response_description="Request coalescing counters per route",
+    summary="Request Coalescing Statistics",
+    description="Return how many catalogue reads of this worker executed a query and how many shared another request's result. Requires admin authentication.",
+)
+async def coalescing_stats(current_user: UsersGlobal = Depends(admin_required)):
+    """
+    Report how many identical concurrent reads were coalesced.
+
+    - **Requires**: Admin authentication.
+    - **Returns**: Per route: fetches executed, requests that joined a running fetch, requests served a fresh result, requests served a stale result while it was refreshed, requests that bypassed coalescing after a write, and failed fetches; plus the fetches in flight and results kept.
+    """
+    return single_flight.stats()
@@ -1,5 +1,10 @@
-from core import create_access_token, get_db_global, verify_password
-from fastapi import APIRouter, Depends, HTTPException
+from core import (
+    create_access_token,
+    get_db_global,
+    login_throttle,
+    verify_and_update_password,
+)
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from models_global import UsersGlobal
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -15,6 +20,7 @@ router = APIRouter(prefix="/login", tags=["Login"])
     description="Authenticate a user using their credentials and return a JWT access token.",
 )
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db_global),
 ):
@@ -25,13 +31,30 @@ async def login(
     - **Input**: Username and password via `OAuth2PasswordRequestForm`.
     - **Validation**: Checks if the user exists and if the password is correct.
     - **Returns**: A JSON object containing a JWT access token and its type if authentication is successful.
-    - **Raises**: HTTP 400 error if the credentials are invalid.
+    - **Raises**: HTTP 400 error if the credentials are invalid, HTTP 429 error if
+      the username or client made too many failed attempts.
     """
+    # Throttled attempts are rejected before any query or password verification
+    client = request.client.host if request.client else "unknown"
+    await login_throttle.check(form_data.username, client)
+
     query = select(UsersGlobal).where(UsersGlobal.username == form_data.username)
     result = await db.execute(query)
     user = result.scalars().first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update_password(
+            form_data.password, user.hashed_password
+        )
+    if not valid:
+        await login_throttle.record_failure(form_data.username, client)
         raise HTTPException(status_code=400, detail="Invalid credentials")
+    await login_throttle.record_success(form_data.username)
+
+    # Upgrade hashes made with a different bcrypt cost factor
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        await db.commit()
 
     token = create_access_token({"sub": user.username, "role": user.role})
     return {"access_token": token, "token_type": "bearer"}
@@ -1,18 +1,64 @@
-from datetime import datetime
+from datetime import date
+from typing import List, Optional
 
-import requests
-from core import admin_required, get_db_local, settings
-from fastapi import APIRouter, Depends, HTTPException
+from core import (
+    admin_required,
+    FlightResult,
+    get_db_global,
+    get_db_local,
+    get_db_read,
+    get_many_movie_details,
+    get_region,
+    get_movie_details,
+    logger,
+    NEXT_CURSOR_HEADER,
+    page_items,
+    paginate,
+    PageParams,
+    read_session,
+    Region,
+    sessions,
+    single_flight,
+    TmdbError,
+    where_range,
+)
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from models_global import UsersGlobal
 from models_local import Movie
 from pydantic import ValidationError
-from schemas import MovieAdd, MovieBase, MovieModel, MovieTitle
+from schemas import (
+    MovieAdd,
+    MovieBase,
+    MovieImport,
+    MovieImportResult,
+    MovieModel,
+    MovieTitle,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 router = APIRouter(prefix="/movies", tags=["Movies"])
 
 
+def movie_from_tmdb(tmdb_id: int, movie_data: dict) -> MovieBase:
+    """
+    Builds a movie from TMDB movie details.
+
+    Raises:
+        ValidationError: If the details lack required fields.
+    """
+    return MovieBase(
+        tmdbID=tmdb_id,
+        title=movie_data.get("title"),
+        release_date=movie_data.get("release_date"),
+        poster_path=movie_data.get("poster_path"),
+        runtime=movie_data.get("runtime"),
+        description=movie_data.get("overview"),
+        genres=[genre["name"] for genre in movie_data.get("genres", [])],
+    )
+
+
 @router.post(
     "/add",
     response_model=MovieModel,
@@ -22,22 +68,19 @@ router = APIRouter(prefix="/movies", tags=["Movies"])
 )
 async def add_movie(
     movie: MovieAdd,
-    region: str,
+    region: Region,
     db: AsyncSession = Depends(get_db_local),
+    db_global: AsyncSession = Depends(get_db_global),
     current_user: UsersGlobal = Depends(admin_required),
 ):
     """
     Add a new movie to the database.
 
     - **Input**: Movie object containing the TMDB ID.
-    - **Validation**: Fetches movie details from the TMDB API.
+    - **Validation**: Fetches movie details from the TMDB metadata cache, or the TMDB API on a miss.
     - **Returns**: The added movie object.
     - **Raises**: HTTP error if the TMDB API request fails.
     """
-    response = requests.get(
-        f"{settings.TMDB_API_URL}/movie/{movie.tmdbID}?api_key={settings.TMDB_API_KEY}&language=en-US"
-    )
-
     # Check if tmdbID already exists in the database
     existing_movie_query = select(Movie).where(Movie.tmdbID == movie.tmdbID)
     existing_movie_result = await db.execute(existing_movie_query)
@@ -48,25 +91,13 @@ async def add_movie(
             detail=f"Movie with tmdbID {movie.tmdbID} already exists in the database.",
         )
 
-    if response.status_code != 200:
-        raise HTTPException(
-            status_code=response.status_code, detail="Error fetching data from TMDB API"
-        )
+    try:
+        movie_data = await get_movie_details(movie.tmdbID, db_global)
+    except TmdbError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
 
-    movie_data = response.json()
-    genres_list = [genre["name"] for genre in movie_data.get("genres", [])]
     try:
-        validated_movie = MovieBase(
-            tmdbID=movie.tmdbID,
-            title=movie_data.get("title"),
-            release_date=datetime.strptime(
-                movie_data.get("release_date"), "%Y-%m-%d"
-            ).date(),  # Convert to date object
-            poster_path=movie_data.get("poster_path"),
-            runtime=movie_data.get("runtime"),
-            description=movie_data.get("overview"),
-            genres=genres_list,
-        )
+        validated_movie = movie_from_tmdb(movie.tmdbID, movie_data)
     except ValidationError as e:
         raise HTTPException(status_code=400, detail=f"Validation error: {e.errors()}")
 
@@ -82,35 +113,165 @@ async def add_movie(
     db.add(new_movie)
     await db.commit()
     await db.refresh(new_movie)
+    single_flight.invalidate(region)
     return new_movie
 
 
+@router.post(
+    "/bulk-add",
+    response_model=List[MovieImportResult],
+    response_description="Outcome of each movie in each region",
+    summary="Bulk Import Movies",
+    description="Imports movies by TMDB ID into one or more regions, reporting per movie and region whether it was added, already present or failed.",
+)
+async def bulk_add_movies(
+    movies: MovieImport,
+    db_global: AsyncSession = Depends(get_db_global),
+    current_user: UsersGlobal = Depends(admin_required),
+):
+    """
+    Import many movies into the given regions.
+
+    - **Input**: TMDB IDs and target regions.
+    - **Validation**: Movies already present in every region are not fetched.
+      The others are fetched concurrently from the TMDB metadata cache or API,
+      a failed or slow movie only affects its own results.
+    - **Returns**: One result per movie and region.
+    - **Raises**: HTTP 400 error if a region is invalid.
+    """
+    for region in movies.regions:
+        get_region(region)
+    regions = list(dict.fromkeys(movies.regions))
+    tmdb_ids = list(dict.fromkeys(movies.tmdbIDs))
+
+    existing = {}
+    for region in regions:
+        async with sessions[region]() as db:
+            result = await db.execute(
+                select(Movie.tmdbID, Movie.id).where(Movie.tmdbID.in_(tmdb_ids))
+            )
+            existing[region] = dict(result.all())
+
+    needed = [
+        tmdb_id
+        for tmdb_id in tmdb_ids
+        if any(tmdb_id not in existing[region] for region in regions)
+    ]
+    details = await get_many_movie_details(needed, db_global)
+
+    validated, errors = {}, {}
+    for tmdb_id in needed:
+        movie_data = details[tmdb_id]
+        if isinstance(movie_data, TmdbError):
+            errors[tmdb_id] = str(movie_data)
+            continue
+        try:
+            validated[tmdb_id] = movie_from_tmdb(tmdb_id, movie_data)
+        except ValidationError as e:
+            errors[tmdb_id] = f"Validation error: {e.errors()}"
+
+    results = []
+    for region in regions:
+        new_movies = [
+            validated[tmdb_id].model_dump()
+            for tmdb_id in tmdb_ids
+            if tmdb_id not in existing[region] and tmdb_id in validated
+        ]
+        added = {}
+        if new_movies:
+            async with sessions[region]() as db:
+                result = await db.execute(
+                    insert(Movie)
+                    .values(new_movies)
+                    .on_conflict_do_nothing(index_elements=["tmdbID"])
+                    .returning(Movie.tmdbID, Movie.id)
+                )
+                added = dict(result.all())
+                await db.commit()
+            single_flight.invalidate(region)
+            logger.info(f"Imported {len(added)} movies into {region}.")
+
+        for tmdb_id in tmdb_ids:
+            if tmdb_id in existing[region]:
+                status, movie_id = "duplicate", existing[region][tmdb_id]
+            elif tmdb_id in added:
+                status, movie_id = "added", added[tmdb_id]
+            elif tmdb_id in errors:
+                status, movie_id = "failed", None
+            else:
+                # Inserted concurrently by another request
+                status, movie_id = "duplicate", None
+            results.append(
+                MovieImportResult(
+                    tmdbID=tmdb_id,
+                    region=region,
+                    status=status,
+                    movie_id=movie_id,
+                    detail=errors.get(tmdb_id) if status == "failed" else None,
+                )
+            )
+
+    return results
+
+
 @router.get(
     "/get",
     response_model=list[MovieModel],
     response_description="List of movies by city",
     summary="Fetch Movies by City",
-    description="Retrieve movies based on the specified region.",
+    description="Retrieve movies based on the specified region, ordered by ID. Paginated with `limit` and `cursor`; the next cursor is returned in the X-Next-Cursor header.",
 )
-async def get_movies(region: str, db: AsyncSession = Depends(get_db_local)):
+async def get_movies(
+    request: Request,
+    region: Region,
+    page: PageParams = Depends(),
+    released_from: Optional[date] = None,
+    released_to: Optional[date] = None,
+):
     """
     Retrieve movies based on the specified region.
 
-    - **Input**: Region name ('krakow', 'warsaw').
-    - **Returns**: A list of movies for the selected region.
+    - **Input**: Region name (e.g. 'krakow'), page parameters and an optional release date range.
+    - **Returns**: A page of movies for the selected region. Identical
+      concurrent requests share one query.
     - **Raises**: HTTP 400 error if the region is invalid.
     """
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid region: {region}. Supported regions are 'krakow' and 'warsaw'.",
+    async def fetch() -> FlightResult:
+        query = where_range(
+            select(Movie), Movie.release_date, released_from, released_to
+        )
+        async with read_session(request, region) as db:
+            result = await db.execute(
+                paginate(query, page, Movie.id, descending=False)
+            )
+            movies = result.scalars().all()
+        response = Response()
+        movies = page_items(movies, page, response, lambda movie: (movie.id,))
+        body = b",".join(
+            MovieModel.model_validate(movie).model_dump_json().encode()
+            for movie in movies
+        )
+        next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        return FlightResult(
+            b"[" + body + b"]",
+            {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None,
         )
 
-    query = select(Movie)
-    result = await db.execute(query)
-    movies = result.scalars().all()
-
-    return movies
+    result = await single_flight.run(
+        request,
+        "movies.get",
+        region,
+        {
+            "limit": page.limit,
+            "cursor": page.cursor,
+            "released_from": released_from,
+            "released_to": released_to,
+        },
+        fetch,
+    )
+    return Response(
+        content=result.body, media_type="application/json", headers=result.headers
+    )
 
 
 @router.get(
@@ -120,20 +281,14 @@ async def get_movies(region: str, db: AsyncSession = Depends(get_db_local)):
     summary="Fetch Movies by City",
     description="Retrieve movies based on the specified region.",
 )
-async def get_movies_title(region: str, db: AsyncSession = Depends(get_db_local)):
+async def get_movies_title(region: Region, db: AsyncSession = Depends(get_db_read)):
     """
     Retrieve movies based on the specified region.
 
-    - **Input**: Region name ('krakow', 'warsaw').
+    - **Input**: Region name (e.g. 'krakow').
     - **Returns**: A list of movies title for the selected region.
     - **Raises**: HTTP 400 error if the region is invalid.
     """
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid region: {region}. Supported regions are 'krakow' and 'warsaw'.",
-        )
-
     query = select(Movie)
     result = await db.execute(query)
     movies = result.scalars().all()
@@ -149,7 +304,7 @@ async def get_movies_title(region: str, db: AsyncSession = Depends(get_db_local)
     description="Returns a movie by its ID.",
 )
 async def get_movie_by_id(
-    movie_id: int, region: str, db: AsyncSession = Depends(get_db_local)
+    movie_id: int, region: Region, db: AsyncSession = Depends(get_db_read)
 ):
     """
     Retrieve a movie by its ID.
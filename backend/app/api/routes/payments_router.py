@@ -1,12 +1,20 @@
 from core import (
     admin_required,
+    confirm_hold,
     employee_required,
     get_db_local,
     get_db_global,
+    hold_queue,
+    page_items,
+    paginate,
+    PageParams,
+    Region,
     user_required,
+    where_range,
     logger,
 )
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import Optional
 from models_global import UsersGlobal
 from models_local import Reservation, Payment
 from schemas import PaymentModel, ReservationDetails, PaymentBase
@@ -24,14 +32,31 @@ router = APIRouter(prefix="/payment", tags=["Payments"])
     response_model=list[PaymentModel],
     response_description="Get all payments",
     summary="Get all payments",
-    description="Get all payments in the database.",
+    description="Get payments in the database, newest first. Paginated with `limit` and `cursor`; the next cursor is returned in the X-Next-Cursor header.",
 )
 async def get_all_payments(
+    response: Response,
+    page: PageParams = Depends(),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    status: Optional[str] = None,
+    reservation_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db_local),
     current_user: UsersGlobal = Depends(admin_required),
 ):
-    result = await db.execute(select(Payment))
-    return result.scalars().all()
+    query = where_range(select(Payment), Payment.created_at, created_from, created_to)
+    if status is not None:
+        query = query.where(Payment.status == status)
+    if reservation_id is not None:
+        query = query.where(Payment.reservation_id == reservation_id)
+
+    result = await db.execute(paginate(query, page, Payment.created_at, Payment.id))
+    return page_items(
+        result.scalars().all(),
+        page,
+        response,
+        lambda payment: (payment.created_at, payment.id),
+    )
 
 
 @router.post(
@@ -43,6 +68,7 @@ async def get_all_payments(
 )
 async def create_payment(
     payment: PaymentBase,
+    region: Region,
     db: AsyncSession = Depends(get_db_local),
     current_user: UsersGlobal = Depends(user_required),
 ):
@@ -73,14 +99,19 @@ async def create_payment(
 
     payment.created_at = payment.created_at.replace(tzinfo=None)
 
+    # Convert the hold and record the payment in one transaction
+    if not await confirm_hold(reservation.id, db):
+        await db.rollback()
+        raise HTTPException(
+            status_code=409, detail="Reservation hold has expired or is already paid."
+        )
+
     new_payment = Payment(**payment.model_dump())
 
     db.add(new_payment)
 
-    reservation.status = "paid"
-    db.add(reservation)
-
     await db.commit()
     await db.refresh(new_payment)
+    hold_queue.cancel(region, reservation.id)
 
     return PaymentModel.from_orm(new_payment)
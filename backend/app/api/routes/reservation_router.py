@@ -1,13 +1,25 @@
 from core import (
     admin_required,
+    claim_seats,
+    classify_unclaimed_seats,
     employee_required,
     get_db_local,
     get_db_global,
+    hold_deadline,
+    hold_queue,
+    occupancy_cache,
+    page_items,
+    paginate,
+    PageParams,
+    Region,
+    release_expired_seat_holds,
     user_required,
+    utc_now,
+    where_range,
     logger,
 )
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import List, Literal, Optional
 from models_global import UsersGlobal
 from models_local import (
     Payment,
@@ -39,56 +51,80 @@ from datetime import datetime
 router = APIRouter(prefix="/reservation", tags=["Reservation"])
 
 
-async def check_reserved_seats(seat_ids: List[int], db: AsyncSession):
-    """
-    Check if any of the given seat IDs are already reserved.
-    - **Input**: List of seat IDs.
-    - **Raises**: HTTPException if any seat is already reserved.
-    """
-    existing_reservations = await db.execute(
-        select(ReservationSeat).where(ReservationSeat.seat_id.in_(seat_ids))
-    )
-    if existing_reservations.scalars().first():
-        raise HTTPException(
-            status_code=400, detail="One or more seats are already reserved."
-        )
-
-
 async def create_reservation_entry(
     user_id: int,
     reservation_data: ReservationBase,
     seat_ids: List[int],
+    region: str,
     db: AsyncSession,
 ):
     """
-    Create a reservation and associated reservation_seat entries in the database.
-    - **Input**: User ID, reservation data, and seat IDs.
+    Create a reservation and claim its seats in the database.
+    Unpaid reservations hold their seats until `expires_at`.
+    - **Input**: User ID, reservation data, seat IDs, and region.
     - **Returns**: The newly created reservation object.
+    - **Raises**: HTTP 409 listing the conflicting seats if any seat is already
+      reserved for the show, HTTP 400 if a seat does not belong to the show's hall.
     """
     new_reservation = Reservation(
         user_id=user_id,
         show_id=reservation_data.show_id,
         status=reservation_data.status,
         created_at=reservation_data.created_at,
+        expires_at=hold_deadline() if reservation_data.status != "paid" else None,
     )
     db.add(new_reservation)
     await db.flush()  # Flush to get the reservation ID
 
-    reservation_seats = [
-        ReservationSeat(seat_id=seat_id, reservation_id=new_reservation.id)
-        for seat_id in seat_ids
-    ]
-    db.add_all(reservation_seats)
+    unclaimed = await claim_seats(
+        new_reservation.id, reservation_data.show_id, seat_ids, db
+    )
+    freed_seats = []
+    if unclaimed:
+        # Seats held by expired reservations are freed and claimed again
+        freed_seats = await release_expired_seat_holds(
+            reservation_data.show_id, unclaimed, db
+        )
+        if freed_seats:
+            unclaimed = await claim_seats(
+                new_reservation.id, reservation_data.show_id, unclaimed, db
+            )
+    if unclaimed:
+        await db.rollback()
+        reserved, invalid = await classify_unclaimed_seats(
+            reservation_data.show_id, unclaimed, db
+        )
+        raise HTTPException(
+            status_code=409 if reserved else 400,
+            detail={
+                "message": (
+                    "One or more seats are already reserved."
+                    if reserved
+                    else "One or more seats do not belong to the show's hall."
+                ),
+                "conflicting_seat_ids": reserved,
+                "invalid_seat_ids": invalid,
+            },
+        )
+
     await db.commit()
+    occupancy_cache.release_rows(region, freed_seats)
+    occupancy_cache.mark_reserved(region, reservation_data.show_id, seat_ids)
+    if new_reservation.expires_at is not None:
+        hold_queue.schedule(region, new_reservation.id, new_reservation.expires_at)
     return new_reservation
 
 
 async def validate_and_create_reservation(
-    user_id: int, reservation: ReservationBase, seat_ids: List[int], db: AsyncSession
+    user_id: int,
+    reservation: ReservationBase,
+    seat_ids: List[int],
+    region: str,
+    db: AsyncSession,
 ):
     """
     Validate seat availability and create a reservation.
-    - **Input**: User ID, reservation data, and seat IDs.
+    - **Input**: User ID, reservation data, seat IDs, and region.
     - **Returns**: The newly created reservation object.
     """
     try:
@@ -98,8 +134,9 @@ async def validate_and_create_reservation(
         ):
             reservation.created_at = reservation.created_at.replace(tzinfo=None)
 
-        await check_reserved_seats(seat_ids, db)
-        return await create_reservation_entry(user_id, reservation, seat_ids, db)
+        return await create_reservation_entry(
+            user_id, reservation, seat_ids, region, db
+        )
     except HTTPException as e:
         logger.error(f"HTTP exception: {e.detail}")
         raise e
@@ -134,16 +171,61 @@ async def fetch_payment_by_reservation_id(reservation_id: int, db: AsyncSession)
     return payment_query.scalars().first()
 
 
-async def fetch_reservations_by_user(user_id: int, db: AsyncSession):
+async def fetch_reservation_page_by_user(
+    user_id: int, page: PageParams, when: Optional[str], db: AsyncSession
+):
     """
-    Fetch all reservations for a specific user.
-    - **Input**: User ID.
-    - **Returns**: A list of reservation objects.
+    Fetch one page of a user's reservations with payment, show, hall and movie details.
+    - **Input**: User ID, page parameters, and an optional 'upcoming'/'past' filter.
+    - **Returns**: Rows ordered from the newest reservation, with one extra row
+      when a next page exists.
     """
-    reservations_query = await db.execute(
-        select(Reservation).where(Reservation.user_id == user_id)
+    query = (
+        select(
+            Reservation,
+            Payment,
+            Show.start_time.label("show_start_time"),
+            Show.price.label("show_price"),
+            Hall.name.label("hall_name"),
+            Movie.id.label("movie_id"),
+            Movie.title.label("movie_title"),
+            Movie.runtime.label("movie_runtime"),
+        )
+        .join(Show, Show.id == Reservation.show_id)
+        .join(Hall, Show.hall_id == Hall.id)
+        .join(Movie, Show.movie_id == Movie.id)
+        .outerjoin(Payment, Payment.reservation_id == Reservation.id)
+        .where(Reservation.user_id == user_id)
+    )
+    if when == "upcoming":
+        query = query.where(Show.start_time >= utc_now())
+    elif when == "past":
+        query = query.where(Show.start_time < utc_now())
+
+    result = await db.execute(
+        paginate(query, page, Reservation.created_at, Reservation.id)
     )
-    return reservations_query.scalars().all()
+    return result.all()
+
+
+async def fetch_seats_by_reservations(reservation_ids: List[int], db: AsyncSession):
+    """
+    Fetch seat and row numbers for given reservation IDs.
+    - **Input**: List of reservation IDs.
+    - **Returns**: Query result rows with reservation ID, seat number and row number.
+    """
+    seats_query = await db.execute(
+        select(
+            ReservationSeat.reservation_id,
+            Seat.seat_number,
+            HallRow.row_number,
+        )
+        .join(Seat, ReservationSeat.seat_id == Seat.id)
+        .join(HallRow, Seat.row_id == HallRow.id)
+        .where(ReservationSeat.reservation_id.in_(reservation_ids))
+        .order_by(HallRow.row_number, Seat.seat_number)
+    )
+    return seats_query.all()
 
 
 async def fetch_seat_hall_movie_details(reservation_ids: List[int], db: AsyncSession):
@@ -185,6 +267,7 @@ async def fetch_seat_hall_movie_details(reservation_ids: List[int], db: AsyncSes
 async def create_reservation(
     reservation: ReservationBase,
     seat_ids: List[int],
+    region: Region,
     db: AsyncSession = Depends(get_db_local),
     current_user: UsersGlobal = Depends(user_required),
 ):
@@ -192,7 +275,7 @@ async def create_reservation(
     Create a reservation in the database.
     """
     return await validate_and_create_reservation(
-        current_user.id, reservation, seat_ids, db
+        current_user.id, reservation, seat_ids, region, db
     )
 
 
@@ -207,13 +290,16 @@ async def create_reservation_for_user(
     user_id: int,
     reservation: ReservationBase,
     seat_ids: List[int],
+    region: Region,
     db: AsyncSession = Depends(get_db_local),
     current_user: UsersGlobal = Depends(employee_required),
 ):
     """
     Create a reservation in the database for a specific user.
     """
-    return await validate_and_create_reservation(user_id, reservation, seat_ids, db)
+    return await validate_and_create_reservation(
+        user_id, reservation, seat_ids, region, db
+    )
 
 
 @router.get(
@@ -221,81 +307,101 @@ async def create_reservation_for_user(
     response_model=List[ReservationModel],
     response_description="Get all reservations",
     summary="Get all reservations",
-    description="Retrieve all reservations from the database. Returns a list of reservations.",
+    description="Retrieve reservations from the database, newest first. Paginated with `limit` and `cursor`; the next cursor is returned in the X-Next-Cursor header.",
 )
 async def get_reservations(
+    response: Response,
+    page: PageParams = Depends(),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    status: Optional[str] = None,
+    show_id: Optional[int] = None,
+    user_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db_local),
     current_user: UsersGlobal = Depends(employee_required),
 ):
     """
-    Retrieve all reservations from the database.
-    - **Returns**: A list of reservation objects.
+    Retrieve reservations from the database.
+    - **Input**: Page parameters and optional filters on creation time range, status, show and user.
+    - **Returns**: A page of reservation objects.
     """
-    result = await db.execute(select(Reservation))
-    return result.scalars().all()
+    query = where_range(
+        select(Reservation), Reservation.created_at, created_from, created_to
+    )
+    if status is not None:
+        query = query.where(Reservation.status == status)
+    if show_id is not None:
+        query = query.where(Reservation.show_id == show_id)
+    if user_id is not None:
+        query = query.where(Reservation.user_id == user_id)
+
+    result = await db.execute(
+        paginate(query, page, Reservation.created_at, Reservation.id)
+    )
+    return page_items(
+        result.scalars().all(),
+        page,
+        response,
+        lambda reservation: (reservation.created_at, reservation.id),
+    )
 
 
 @router.get(
     "/my-reservations",
     response_model=List[ReservationDetails],
-    response_description="Get all reservations for the current user with details",
-    summary="Get all reservations for the current user with details",
-    description="Retrieve all reservations for the current user from the database, including seat details, hall name, movie details, and show start time.",
+    response_description="Get reservations for the current user with details",
+    summary="Get reservations for the current user with details",
+    description="Retrieve the current user's reservations, newest first, including seat details, hall name, movie details, show start time and payment. Paginated with `limit` and `cursor`; the next cursor is returned in the X-Next-Cursor header.",
 )
 async def get_my_reservations(
+    response: Response,
+    page: PageParams = Depends(),
+    when: Optional[Literal["upcoming", "past"]] = None,
     db: AsyncSession = Depends(get_db_local),
     current_user: UsersGlobal = Depends(user_required),
 ):
     """
-    Retrieve all reservations for the current user from the database, including seat details, hall name, movie details, and show start time.
-    - **Returns**: A list of reservation objects with detailed information.
+    Retrieve the current user's reservations from the database, including seat details, hall name, movie details, and show start time.
+    Uses two queries regardless of the number of reservations.
+    - **Input**: Page parameters and an optional 'upcoming'/'past' filter on the show start time.
+    - **Returns**: A page of reservation objects with detailed information.
     """
     try:
-        reservations = await fetch_reservations_by_user(current_user.id, db)
-
-        if not reservations:
+        rows = await fetch_reservation_page_by_user(current_user.id, page, when, db)
+        rows = page_items(
+            rows,
+            page,
+            response,
+            lambda row: (row.Reservation.created_at, row.Reservation.id),
+        )
+        if not rows:
             return []
 
-        reservation_ids = [reservation.id for reservation in reservations]
-        seat_hall_movie_data = await fetch_seat_hall_movie_details(reservation_ids, db)
-
-        # Fetch payment details for each reservation
-        payments = {
-            payment.reservation_id: payment
-            for payment in [
-                await fetch_payment_by_reservation_id(reservation_id, db)
-                for reservation_id in reservation_ids
-            ]
-            if payment
-        }
-
-        # Organize seat details, hall name, movie details, show start_time, and payment by reservation ID
-        reservation_details = {}
-        for row in seat_hall_movie_data:
-            if row.reservation_id not in reservation_details:
-                reservation_details[row.reservation_id] = {
-                    "seat_details": [],
-                    "hall_name": row.hall_name,
-                    "movie_details": {
-                        "title": row.movie_title,
-                        "runtime": row.movie_runtime,
-                        "id": row.movie_id,
-                    },
-                    "show_start_time": row.show_start_time,
-                    "show_price": row.show_price,
-                    "payment": payments.get(row.reservation_id),
-                }
-            reservation_details[row.reservation_id]["seat_details"].append(
-                {"seat_number": row.seat_number, "row_number": row.row_number}
+        seat_details = {row.Reservation.id: [] for row in rows}
+        for seat in await fetch_seats_by_reservations(list(seat_details), db):
+            seat_details[seat.reservation_id].append(
+                {"seat_number": seat.seat_number, "row_number": seat.row_number}
             )
 
         return [
             {
-                "reservation": reservation,
-                **reservation_details.get(reservation.id, {}),
+                "reservation": row.Reservation,
+                "payment": row.Payment,
+                "seat_details": seat_details[row.Reservation.id],
+                "hall_name": row.hall_name,
+                "movie_details": {
+                    "title": row.movie_title,
+                    "runtime": row.movie_runtime,
+                    "id": row.movie_id,
+                },
+                "show_start_time": row.show_start_time,
+                "show_price": row.show_price,
             }
-            for reservation in reservations
+            for row in rows
         ]
+    except HTTPException as e:
+        logger.error(f"HTTP exception: {e.detail}")
+        raise e
     except Exception as e:
         logger.exception(
             "Unexpected error occurred while retrieving reservations with details."
@@ -468,6 +574,7 @@ async def get_user_reservation_details(
 )
 async def delete_reservation(
     reservation_id: int,
+    region: Region,
     db: AsyncSession = Depends(get_db_local),
     current_user: UsersGlobal = Depends(admin_required),
 ):
@@ -488,11 +595,12 @@ async def delete_reservation(
             logger.warning(f"Reservation ID {reservation_id} not found.")
             raise HTTPException(status_code=404, detail="Reservation not found.")
 
-        await db.execute(
-            delete(ReservationSeat).where(
-                ReservationSeat.reservation_id == reservation_id
-            )
+        released = await db.execute(
+            delete(ReservationSeat)
+            .where(ReservationSeat.reservation_id == reservation_id)
+            .returning(ReservationSeat.show_id, ReservationSeat.seat_id)
         )
+        released_seats = released.all()
 
         await db.execute(
             delete(Payment).where(Payment.reservation_id == reservation_id)
@@ -500,6 +608,8 @@ async def delete_reservation(
 
         await db.execute(delete(Reservation).where(Reservation.id == reservation_id))
         await db.commit()
+        occupancy_cache.release_rows(region, released_seats)
+        hold_queue.cancel(region, reservation_id)
 
         logger.info(
             f"Reservation ID {reservation_id} deleted successfully by admin {current_user.id}."
@@ -1,4 +1,10 @@
-from core import admin_required, get_db_local
+from core import (
+    admin_required,
+    get_db_local,
+    hall_layout_cache,
+    occupancy_cache,
+    Region,
+)
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List
 from models_global import UsersGlobal
@@ -8,6 +14,7 @@ from schemas import SeatModel, SeatBase
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import delete, text, select, func
+from sqlalchemy.exc import IntegrityError
 
 router = APIRouter(prefix="/seat", tags=["Seat"])
 
@@ -21,7 +28,7 @@ router = APIRouter(prefix="/seat", tags=["Seat"])
 )
 async def add_multiple_seats(
     seats: List[SeatBase],
-    region: str,
+    region: Region,
     db: AsyncSession = Depends(get_db_local),
     current_user: UsersGlobal = Depends(admin_required),
 ):
@@ -45,7 +52,23 @@ async def add_multiple_seats(
             )
     new_seats = [Seat(**seat.model_dump()) for seat in seats]
     db.add_all(new_seats)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Duplicates within the request, or seats added concurrently
+        await db.rollback()
+        raise HTTPException(
+            status_code=400, detail="Seat numbers must be unique within a row"
+        )
+    # Cached occupancy bitmaps are indexed by the seats of a hall
+    occupancy_cache.invalidate(region)
+    hall_ids = await db.execute(
+        select(HallRow.hall_id)
+        .where(HallRow.id.in_({seat.row_id for seat in seats}))
+        .distinct()
+    )
+    for hall_id in hall_ids.scalars().all():
+        hall_layout_cache.invalidate(region, hall_id)
     result = await db.execute(select(func.count()).select_from(Seat))
     seat_count = result.scalar()
     if seat_count == 0:
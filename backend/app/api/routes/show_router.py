@@ -1,49 +1,159 @@
-from core import admin_required, get_db_local, settings, employee_required
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+
+from core import (
+    admin_required,
+    employee_required,
+    exceeds_max_span,
+    find_conflicts,
+    FlightResult,
+    get_db_local,
+    get_db_read,
+    hall_layout_cache,
+    insert_accepted_shows,
+    is_overlap_violation,
+    load_hall_days,
+    load_movie_demands,
+    NEXT_CURSOR_HEADER,
+    now_showing,
+    occupancy_cache,
+    page_items,
+    paginate,
+    PageParams,
+    plan_timetable,
+    read_session,
+    recurrence_count,
+    recurrence_starts,
+    Region,
+    resolve_schedule,
+    sessions,
+    settings,
+    show_calendar_cache,
+    show_end_time,
+    single_flight,
+    where_range,
+)
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
 from models_global import UsersGlobal
-from models_local import Show, Movie, Hall, Reservation, ReservationSeat, Seat
-from schemas import ShowBase, ShowModel
+from models_local import Show, Movie, Hall
+from schemas import (
+    ShowBase,
+    ShowCalendar,
+    ShowModel,
+    ShowSchedule,
+    ShowScheduleResult,
+    TimetablePlan,
+    TimetableRequest,
+)
 from schemas.show_schema import (
     ShowDetailsReservation,
     ShowDetailsShow,
     ShowDetailsMovie,
     ShowDetailsHall,
 )
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from sqlalchemy import text, select, func, cast, TIMESTAMP
-from datetime import datetime, timedelta, date, timezone
+from datetime import datetime, timedelta, date
 
 
 router = APIRouter(prefix="/show", tags=["Shows"])
 
 
+def filter_shows(query, start_from, start_to, hall_id, movie_id):
+    """
+    Apply the optional start time range, hall and movie filters to a show query.
+    """
+    query = where_range(query, Show.start_time, start_from, start_to)
+    if hall_id is not None:
+        query = query.where(Show.hall_id == hall_id)
+    if movie_id is not None:
+        query = query.where(Show.movie_id == movie_id)
+    return query
+
+
+async def fetch_show_for_reservation(show_id: int, db: AsyncSession):
+    """
+    Fetch a show with the movie and hall details needed to book it.
+    - **Input**: Show ID.
+    - **Returns**: A ShowDetailsReservation or None if the show is not found.
+    """
+    query = (
+        select(
+            Show.id,
+            Show.start_time,
+            Show.price,
+            Movie.id.label("movie_id"),
+            Movie.title,
+            Movie.runtime,
+            Movie.poster_path,
+            Hall.id.label("hall_id"),
+            Hall.name.label("hall_name"),
+        )
+        .join(Movie, Show.movie_id == Movie.id)
+        .join(Hall, Show.hall_id == Hall.id)
+        .where(Show.id == show_id)
+    )
+    result = await db.execute(query)
+    row = result.first()
+
+    if not row:
+        return None
+
+    return ShowDetailsReservation(
+        show=ShowDetailsShow(
+            id=row.id,
+            start_time=row.start_time,
+            price=row.price,
+        ),
+        movie=ShowDetailsMovie(
+            id=row.movie_id,
+            title=row.title,
+            runtime=row.runtime,
+            poster_path=row.poster_path,
+        ),
+        hall=ShowDetailsHall(
+            id=row.hall_id,
+            name=row.hall_name,
+        ),
+    )
+
+
 @router.get(
     "/get",
     response_model=list[ShowModel],
     response_description="Retrieve list of shows",
     summary="Fetch Shows",
-    description="Fetch a list of shows stored in the database.",
+    description="Fetch a list of shows stored in the database, ordered by start time. Paginated with `limit` and `cursor`; the next cursor is returned in the X-Next-Cursor header.",
 )
-async def get_shows(region: str, db: AsyncSession = Depends(get_db_local)):
+async def get_shows(
+    region: Region,
+    response: Response,
+    page: PageParams = Depends(),
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    hall_id: Optional[int] = None,
+    movie_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db_read),
+):
     """
     Retrieve a list of shows stored in the database.
 
-    - **Input**: Region name ('krakow', 'warsaw').
-    - **Returns**: A list of shows with their IDs and names.
-    - **Raises**: HTTP 404 error if no shows are found.
+    - **Input**: Region name (e.g. 'krakow'), page parameters and optional
+      filters on start time range, hall and movie.
+    - **Returns**: A page of shows.
+    - **Raises**: HTTP 400 error if the region is invalid.
     """
 
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid region: {region}. Supported regions are 'krakow' and 'warsaw'.",
-        )
-
-    query = select(Show)
-    result = await db.execute(query)
+    query = filter_shows(select(Show), start_from, start_to, hall_id, movie_id)
+    result = await db.execute(
+        paginate(query, page, Show.start_time, Show.id, descending=False)
+    )
     shows = result.scalars().all()
 
-    return shows
+    return page_items(shows, page, response, lambda show: (show.start_time, show.id))
 
 
 @router.post(
@@ -51,11 +161,11 @@ async def get_shows(region: str, db: AsyncSession = Depends(get_db_local)):
     response_model=ShowModel,
     response_description="Add a new show",
     summary="Add Show",
-    description="Adds a new show to the database.",
+    description="Adds a new show to the database. The hall must be free from the start of the show until the end of the movie plus the cleaning gap.",
 )
 async def add_show(
     show: ShowBase,
-    region: str,
+    region: Region,
     db: AsyncSession = Depends(get_db_local),
     current_user: UsersGlobal = Depends(employee_required),
 ):
@@ -63,19 +173,229 @@ async def add_show(
     Add a new show to the database.
 
     - **Input**: Show object containing the show details.
-    - **Validation**: Checks if the show already exists in the database.
+    - **Validation**: Checks that no other show occupies the hall during the
+      show and its cleaning gap. The database enforces the same rule, so
+      concurrent additions cannot both succeed.
     - **Returns**: The added show object.
-    - **Raises**: HTTP error if the show already exists.
+    - **Raises**: HTTP 400 error if the movie and cleaning gap last longer
+      than `SHOW_MAX_SPAN_HOURS`, HTTP 404 error if the movie is not found,
+      HTTP 409 error if the show conflicts with another show in the hall.
     """
+    result = await db.execute(
+        select(Movie.id, Movie.runtime).where(Movie.id == show.movie_id)
+    )
+    movie = result.first()
+    if movie is None:
+        raise HTTPException(status_code=404, detail="Movie not found")
+
+    end_time = show_end_time(show.start_time, movie.runtime)
+    if exceeds_max_span(show.start_time, end_time):
+        raise HTTPException(
+            status_code=400,
+            detail=f"The movie and cleaning take longer than {settings.SHOW_MAX_SPAN_HOURS} hours, the longest a show may block a hall.",
+        )
+    conflicts = await find_conflicts(db, show.hall_id, show.start_time, end_time)
+    if conflicts:
+        raise HTTPException(
+            status_code=409,
+            detail=f"The show conflicts with these shows in the hall: {', '.join(str(c['show_id']) for c in conflicts)}.",
+        )
 
-    new_show = Show(**show.model_dump())
+    new_show = Show(**show.model_dump(), end_time=end_time)
     db.add(new_show)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if not is_overlap_violation(e):
+            raise
+        raise HTTPException(
+            status_code=409,
+            detail="The show conflicts with a show added concurrently in the hall.",
+        )
     await db.refresh(new_show)
+    show_calendar_cache.invalidate(region)
+    single_flight.invalidate(region)
+    now_showing.add_shows(
+        region,
+        [(new_show.id, new_show.movie_id, new_show.hall_id, new_show.start_time)],
+    )
 
     return new_show
 
 
+@router.post(
+    "/bulk-add",
+    response_model=List[ShowScheduleResult],
+    response_description="Outcome of each requested show",
+    summary="Bulk Schedule Shows",
+    description="Schedules many shows, given individually or as recurrence rules, in one transaction. Reports per show whether it was added, conflicts with other shows or failed.",
+)
+async def bulk_add_shows(
+    schedule: ShowSchedule,
+    region: Region,
+    dry_run: bool = False,
+    db: AsyncSession = Depends(get_db_local),
+    current_user: UsersGlobal = Depends(employee_required),
+):
+    """
+    Schedule many shows at once.
+
+    - **Input**: Individual shows and recurrence rules (movie, hall, price,
+      date range, daily start times and optional weekdays), and `dry_run` to
+      validate without adding.
+    - **Validation**: All shows are checked against each other and against
+      the existing shows of their halls in one sorted sweep per hall. Of two
+      overlapping requested shows, the one starting earlier wins, whatever
+      its position in the request; request order only breaks ties between
+      shows starting at the same time. Conflicting shows, shows of unknown
+      movies or halls and shows blocking their hall for longer than
+      `SHOW_MAX_SPAN_HOURS` are reported and skipped, the others are added
+      together.
+    - **Returns**: One result per show: individual shows first, then the
+      expanded recurrences, in order.
+    - **Raises**: HTTP 400 error if the request is empty or expands to more
+      than the maximum number of shows, HTTP 409 error if shows were added
+      concurrently in the same halls, in which case nothing is added.
+    """
+    # Oversized rules are rejected before they are expanded
+    requested = len(schedule.shows) + sum(
+        recurrence_count(rule.start_date, rule.end_date, rule.times, rule.weekdays)
+        for rule in schedule.recurrences
+    )
+    if requested > settings.SHOW_SCHEDULE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.SHOW_SCHEDULE_MAX_ITEMS} shows can be scheduled at once.",
+        )
+
+    shows = list(schedule.shows)
+    for rule in schedule.recurrences:
+        shows.extend(
+            ShowBase(
+                movie_id=rule.movie_id,
+                hall_id=rule.hall_id,
+                start_time=start_time,
+                price=rule.price,
+            )
+            for start_time in recurrence_starts(
+                rule.start_date, rule.end_date, rule.times, rule.weekdays
+            )
+        )
+    if not shows:
+        raise HTTPException(status_code=400, detail="No shows to schedule")
+
+    outcomes = await resolve_schedule(db, shows)
+    if dry_run:
+        return outcomes
+
+    try:
+        await insert_accepted_shows(db, outcomes)
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if not is_overlap_violation(e):
+            raise
+        raise HTTPException(
+            status_code=409,
+            detail="Shows were added concurrently in the same halls. Nothing was added, retry the request.",
+        )
+    show_calendar_cache.invalidate(region)
+    single_flight.invalidate(region)
+    now_showing.add_shows(
+        region,
+        (
+            (o["show_id"], o["movie_id"], o["hall_id"], o["start_time"])
+            for o in outcomes
+            if o["status"] == "added"
+        ),
+    )
+    return outcomes
+
+
+@router.post(
+    "/timetable",
+    response_model=TimetablePlan,
+    response_description="Generated timetable",
+    summary="Generate Timetable",
+    description="Plans shows of the requested movies in the free time of the halls over a date range, without adding them. Post the planned shows to `/show/bulk-add` to add them.",
+)
+async def generate_timetable(
+    request: TimetableRequest,
+    region: Region,
+    db: AsyncSession = Depends(get_db_local),
+    current_user: UsersGlobal = Depends(employee_required),
+):
+    """
+    Generate a conflict-free timetable for preview.
+
+    - **Input**: Date range, daily opening and closing times, halls, movies
+      with their number of screenings, price and allowed halls, and the
+      start time granularity.
+    - **Validation**: Shows start within opening hours and end by closing
+      time, each show blocks its hall for the movie runtime plus the
+      cleaning gap, and existing shows are left untouched.
+    - **Returns**: The planned shows and, per movie, how many could be
+      placed. Nothing is added.
+    - **Raises**: HTTP 400 error if the date range is invalid or too long, if
+      a movie is requested twice, or if more shows are requested than can be
+      added at once.
+    """
+    days = (request.end_date - request.start_date).days + 1
+    if days < 1 or days > settings.TIMETABLE_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"The timetable must cover 1 to {settings.TIMETABLE_MAX_DAYS} days.",
+        )
+    if len({m.movie_id for m in request.movies}) < len(request.movies):
+        raise HTTPException(status_code=400, detail="Each movie can be requested once.")
+    if sum(m.screenings for m in request.movies) > settings.SHOW_SCHEDULE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.SHOW_SCHEDULE_MAX_ITEMS} shows can be planned at once.",
+        )
+
+    movies = await load_movie_demands(db, request.movies)
+    hall_days = await load_hall_days(
+        db,
+        request.start_date,
+        request.end_date,
+        request.opening_time,
+        request.closing_time,
+        request.hall_ids,
+    )
+    plan = plan_timetable(hall_days, movies, timedelta(minutes=request.slot_minutes))
+
+    scheduled = {}
+    for movie, _, _, _ in plan:
+        scheduled[movie.movie_id] = scheduled.get(movie.movie_id, 0) + 1
+    found = {movie.movie_id for movie in movies}
+    return {
+        "shows": sorted(
+            (
+                {
+                    "movie_id": movie.movie_id,
+                    "hall_id": hall_day.hall_id,
+                    "start_time": start,
+                    "end_time": end,
+                    "price": movie.price,
+                }
+                for movie, hall_day, start, end in plan
+            ),
+            key=lambda show: (show["hall_id"], show["start_time"]),
+        ),
+        "movies": [
+            {
+                "movie_id": m.movie_id,
+                "screenings": m.screenings,
+                "scheduled": scheduled.get(m.movie_id, 0),
+                "detail": None if m.movie_id in found else "Movie not found",
+            }
+            for m in request.movies
+        ],
+    }
+
+
 @router.get(
     "/get/{show_id}",
     response_model=ShowModel,
@@ -83,7 +403,9 @@ async def add_show(
     summary="Fetch Show Details",
     description="Fetch details of a specific show by ID.",
 )
-async def get_show(show_id: int, region: str, db: AsyncSession = Depends(get_db_local)):
+async def get_show(
+    show_id: int, region: Region, db: AsyncSession = Depends(get_db_read)
+):
     """
     Retrieve details of a specific show by ID.
 
@@ -104,13 +426,10 @@ async def get_show(show_id: int, region: str, db: AsyncSession = Depends(get_db_
 @router.delete("/delete/{show_id}", status_code=204)
 async def delete_show(
     show_id: int,
-    region: str,
+    region: Region,
     db: AsyncSession = Depends(get_db_local),
     current_user: UsersGlobal = Depends(employee_required),
 ):
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(status_code=400, detail="Invalid region.")
-
     show = await db.get(Show, show_id)
     if not show:
         raise HTTPException(status_code=404, detail="Show not found.")
@@ -118,6 +437,10 @@ async def delete_show(
     # Delete the show itself
     await db.delete(show)
     await db.commit()
+    occupancy_cache.invalidate(region, show_id)
+    show_calendar_cache.invalidate(region)
+    single_flight.invalidate(region)
+    now_showing.remove_show(region, show_id)
 
     # Reset sequence if no shows remain
     result = await db.execute(select(func.count()).select_from(Show))
@@ -130,27 +453,76 @@ async def delete_show(
 
 
 @router.get("/get_details")
-async def get_shows(region: str, db: AsyncSession = Depends(get_db_local)):
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(status_code=400, detail="Invalid region")
+async def get_shows(
+    request: Request,
+    region: Region,
+    page: PageParams = Depends(),
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    hall_id: Optional[int] = None,
+    movie_id: Optional[int] = None,
+):
+    """
+    Retrieve a page of shows with their movie title and hall name.
 
-    query = select(Show, Movie.title, Hall.name).join(Movie).join(Hall)
-    result = await db.execute(query)
-    shows = result.all()
+    - **Input**: Region, page parameters, and optional start time range, hall and movie filters.
+    - **Returns**: The shows in start order. Identical concurrent requests share one query.
+    """
 
-    shows_data = [
-        {
-            "id": show.id,
-            "movie_title": title,
-            "start_time": show.start_time,
-            "hall_name": hall,
-            "price": f"{show.price:.2f}",
-            "region": region,
-        }
-        for show, title, hall in shows
-    ]
+    async def fetch() -> FlightResult:
+        query = filter_shows(
+            select(Show, Movie.title, Hall.name).join(Movie).join(Hall),
+            start_from,
+            start_to,
+            hall_id,
+            movie_id,
+        )
+        async with read_session(request, region) as db:
+            result = await db.execute(
+                paginate(query, page, Show.start_time, Show.id, descending=False)
+            )
+            rows = result.all()
+        response = Response()
+        shows = page_items(
+            rows, page, response, lambda row: (row.Show.start_time, row.Show.id)
+        )
+
+        shows_data = [
+            {
+                "id": show.id,
+                "movie_title": title,
+                "start_time": show.start_time,
+                "hall_name": hall,
+                "price": f"{show.price:.2f}",
+                "region": region,
+            }
+            for show, title, hall in shows
+        ]
+        next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        return FlightResult(
+            json.dumps(
+                jsonable_encoder(shows_data), ensure_ascii=False, separators=(",", ":")
+            ).encode(),
+            {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None,
+        )
 
-    return shows_data
+    result = await single_flight.run(
+        request,
+        "show.get_details",
+        region,
+        {
+            "limit": page.limit,
+            "cursor": page.cursor,
+            "start_from": start_from,
+            "start_to": start_to,
+            "hall_id": hall_id,
+            "movie_id": movie_id,
+        },
+        fetch,
+    )
+    return Response(
+        content=result.body, media_type="application/json", headers=result.headers
+    )
 
 
 @router.get("/check_conflict")
@@ -158,97 +530,70 @@ async def check_show_conflict(
     hall_id: int,
     movie_id: int,
     start_time: datetime,
-    region: str,
+    region: Region,
     db: AsyncSession = Depends(get_db_local),
 ):
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(status_code=400, detail="Invalid region")
-
-    movie_stmt = select(Movie.runtime).where(Movie.id == movie_id)
-    result = await db.execute(movie_stmt)
-    movie_runtime = result.scalar()
-
-    if movie_runtime is None:
-        raise HTTPException(status_code=404, detail="Movie not found")
-
-    new_start = start_time
-    new_end = new_start + timedelta(minutes=movie_runtime)
+    """
+    Check whether a show of a movie would conflict with the shows of a hall.
 
-    stmt = (
-        select(Show, Movie.title, Movie.runtime)
-        .join(Movie)
-        .where(Show.hall_id == hall_id)
+    - **Input**: Hall ID, movie ID, start time and region.
+    - **Returns**: Whether there is a conflict, and the conflicting shows with
+      their end times including the cleaning gap. The new show occupies the
+      hall until its movie ends plus the cleaning gap, as enforced by `/show/add`.
+    - **Raises**: HTTP 404 error if the movie is not found.
+    """
+    result = await db.execute(
+        select(Movie.id, Movie.runtime).where(Movie.id == movie_id)
     )
+    movie = result.first()
+    if movie is None:
+        raise HTTPException(status_code=404, detail="Movie not found")
 
-    result = await db.execute(stmt)
-    rows = result.all()
-
-    conflicts = []
-
-    for show, title, runtime in rows:
-        existing_start = show.start_time
-        existing_end = (
-            existing_start + timedelta(minutes=runtime) + timedelta(minutes=15)
-        )  # add 15 minutes after movie
-
-        if (
-            (new_start >= existing_start and new_start < existing_end)
-            or (new_end > existing_start and new_end <= existing_end)
-            or (new_start <= existing_start and new_end >= existing_end)
-        ):
-            conflicts.append(
-                {
-                    "show_id": show.id,
-                    "movie_title": title,
-                    "start_time": show.start_time,
-                    "end_time": existing_end,
-                }
-            )
+    end_time = show_end_time(start_time, movie.runtime)
+    conflicts = await find_conflicts(db, hall_id, start_time, end_time)
 
     return {"conflict": len(conflicts) > 0, "conflicts": conflicts}
 
 
 @router.get("/movies_with_shows")
-async def get_movies_with_shows(region: str, db: AsyncSession = Depends(get_db_local)):
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(status_code=400, detail="Invalid region")
-
-    current_time = datetime.now(timezone.utc).replace(tzinfo=None)
+async def get_movies_with_shows(
+    request: Request,
+    region: Region,
+    include_seats: bool = False,
+):
+    """
+    Retrieve the movies with upcoming shows, for the homepage.
+
+    - **Input**: Region, and `include_seats` to add the number of remaining
+      seats of each show.
+    - **Returns**: The movies (ID, title, poster) with upcoming shows, by
+      movie ID, each with its upcoming shows (ID, start time, hall) in start
+      order. Served from an in-memory index kept up to date by the show
+      endpoints and reloaded every minute; seat counts are refreshed every
+      few seconds. Identical concurrent requests share one reload.
+    """
 
-    stmt = (
-        select(Movie, Show)
-        .join(Show, Movie.id == Show.movie_id)
-        .where(Show.start_time > current_time)  # Use timezone-naive datetime
+    async def fetch() -> FlightResult:
+        async with sessions[region]() as db:
+            body = await now_showing.get(region, db, with_seats=include_seats)
+        return FlightResult(body)
+
+    result = await single_flight.run(
+        request,
+        "show.movies_with_shows",
+        region,
+        {"include_seats": include_seats},
+        fetch,
     )
-    result = await db.execute(stmt)
-    rows = result.all()
-
-    movie_map = {}
-    for movie, show in rows:
-        if movie.id not in movie_map:
-            movie_map[movie.id] = {
-                "id": movie.id,
-                "title": movie.title,
-                "poster_path": movie.poster_path,
-                "shows": [],
-            }
-        movie_map[movie.id]["shows"].append(
-            {
-                "id": show.id,
-                "start_time": show.start_time.isoformat(),
-                "hall_id": show.hall_id,
-            }
-        )
-
-    return list(movie_map.values())
+    return Response(content=result.body, media_type="application/json")
 
 
 @router.get("/get_by_hall_and_date/{hall_id}")
 async def get_shows_by_hall_and_date(
     hall_id: int,
     date: date,
-    region: str,
-    db: AsyncSession = Depends(get_db_local),
+    region: Region,
+    db: AsyncSession = Depends(get_db_read),
 ):
     """
     Retrieve shows for a specific hall and date.
@@ -257,9 +602,6 @@ async def get_shows_by_hall_and_date(
     - **Returns**: List of shows with their start times and durations.
     - **Raises**: HTTP 404 error if no shows are found.
     """
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(status_code=400, detail="Invalid region.")
-
     # Convert date to datetime objects for start and end of the day
     start_of_day = datetime.combine(date, datetime.min.time())
     end_of_day = start_of_day + timedelta(days=1) - timedelta(seconds=1)
@@ -286,10 +628,59 @@ async def get_shows_by_hall_and_date(
     ]
 
 
+@router.get(
+    "/calendar",
+    response_model=ShowCalendar,
+    response_description="Shows per day",
+    summary="Show Calendar",
+    description="Returns the shows of a set of halls, or of every hall, for each day of a date range. Supports conditional requests with If-None-Match.",
+)
+async def get_show_calendar(
+    request: Request,
+    start_date: date,
+    end_date: date,
+    region: Region,
+    hall_ids: Optional[List[int]] = Query(
+        None, description="The halls to include, every hall if omitted."
+    ),
+    db: AsyncSession = Depends(get_db_local),
+):
+    """
+    Retrieve the show calendar of a date range, e.g. a month.
+
+    - **Input**: First and last day (inclusive), region, and optionally the
+      halls to include.
+    - **Returns**: One bucket per day of the range, empty days included, with
+      the shows starting that day in start order. The calendar is read with
+      one query and cached per worker until a show is added or deleted, or
+      for a few seconds at most. Its ETag is derived from its content, so it
+      is the same on every worker: send it back in If-None-Match to get a
+      304 response while the calendar is unchanged.
+    - **Raises**: HTTP 400 error if the date range is invalid or too long.
+    """
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=400, detail="The end date must not be before the start date."
+        )
+    if (end_date - start_date).days + 1 > settings.CALENDAR_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A calendar covers at most {settings.CALENDAR_MAX_DAYS} days.",
+        )
+
+    calendar = await show_calendar_cache.get(
+        region, start_date, end_date, hall_ids, db
+    )
+    headers = {"ETag": f'"{calendar.version}"', "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=calendar.body, media_type="application/json", headers=headers)
+
+
 @router.get("/get-for-reservation/{show_id}", response_model=ShowDetailsReservation)
 async def get_show_for_reservation(
     show_id: int,
-    region: str,
+    region: Region,
     db: AsyncSession = Depends(get_db_local),
 ):
     """
@@ -299,66 +690,91 @@ async def get_show_for_reservation(
     - **Returns**: Show object with its details, movie details, and hall details.
     - **Raises**: HTTP 404 error if the show is not found.
     """
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(status_code=400, detail="Invalid region.")
+    details = await fetch_show_for_reservation(show_id, db)
+    if not details:
+        raise HTTPException(status_code=404, detail="Show not found")
 
-    query = (
-        select(Show, Movie, Hall)
-        .join(Movie, Show.movie_id == Movie.id)
-        .join(Hall, Show.hall_id == Hall.id)
-        .where(Show.id == show_id)
-    )
-    result = await db.execute(query)
-    row = result.first()
+    return details
 
-    if not row:
-        raise HTTPException(status_code=404, detail="Show not found")
 
-    show, movie, hall = row
+@router.get("/booking/{show_id}")
+async def get_booking_page(
+    show_id: int,
+    region: Region,
+    request: Request,
+    db: AsyncSession = Depends(get_db_local),
+):
+    """
+    Retrieve everything the booking page needs in a single request.
 
-    return ShowDetailsReservation(
-        show=ShowDetailsShow(
-            id=show.id,
-            start_time=show.start_time,
-            price=show.price,
-        ),
-        movie=ShowDetailsMovie(
-            id=movie.id,
-            title=movie.title,
-            runtime=movie.runtime,
-            poster_path=movie.poster_path,
-        ),
-        hall=ShowDetailsHall(
-            id=hall.id,
-            name=hall.name,
-        ),
+    The show details and the seat occupancy are looked up concurrently, the
+    hall layout and occupancy come from their in-memory caches. The ETag
+    combines the layout and occupancy versions.
+
+    - **Input**: Show ID (path parameter) and region.
+    - **Returns**: Show, movie and hall details, the hall layout (rows with
+      seats), the reserved seat IDs and both versions, or HTTP 304 if the
+      client's `If-None-Match` is still current.
+    - **Raises**: HTTP 404 error if the show is not found.
+    """
+    async with sessions[region]() as occupancy_db:
+        loading = asyncio.ensure_future(
+            occupancy_cache.get(region, show_id, occupancy_db)
+        )
+        try:
+            details = await fetch_show_for_reservation(show_id, db)
+        except BaseException:
+            # The load must be done with its session before the session closes
+            loading.cancel()
+            await asyncio.wait([loading])
+            raise
+        occupancy = await loading
+    if not details:
+        raise HTTPException(status_code=404, detail="Show not found")
+
+    layout = await hall_layout_cache.get(region, details.hall.id, db)
+    layout_body = layout.body if layout else b"[]"
+    layout_version = layout.version if layout else ""
+
+    headers = {
+        "ETag": f'"{layout_version}-{occupancy.version}"',
+        "Cache-Control": "no-cache",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    body = b"".join(
+        [
+            details.model_dump_json().encode()[:-1],
+            b',"layout":',
+            layout_body,
+            b',"reserved_seat_ids":',
+            json.dumps(occupancy.reserved_seat_ids(), separators=(",", ":")).encode(),
+            f',"layout_version":"{layout_version}"'.encode(),
+            f',"occupancy_version":"{occupancy.version}"}}'.encode(),
+        ]
     )
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/get_reserved_seats/{show_id}")
 async def get_reserved_seats(
     show_id: int,
-    region: str,
+    region: Region,
     db: AsyncSession = Depends(get_db_local),
 ):
     """
     Retrieve reserved seats for a specific show.
 
+    Served from the in-memory occupancy cache; the database is only queried
+    the first time a show is requested.
+
     - **Input**: Show ID (path parameter) and region.
     - **Returns**: List of reserved seat IDs.
     - **Raises**: HTTP 404 error if the show is not found.
     """
-    if region not in ["krakow", "warsaw"]:
-        raise HTTPException(status_code=400, detail="Invalid region.")
-
-    query = (
-        select(Seat.id)
-        .join(ReservationSeat, Seat.id == ReservationSeat.seat_id)
-        .join(Reservation, Reservation.id == ReservationSeat.reservation_id)
-        .where(Reservation.show_id == show_id)
-    )
-    result = await db.execute(query)
-    reserved_seats = result.scalars().all()
+    occupancy = await occupancy_cache.get(region, show_id, db)
+    reserved_seats = occupancy.reserved_seat_ids()
 
     if not reserved_seats:
         raise HTTPException(
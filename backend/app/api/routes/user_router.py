@@ -1,15 +1,19 @@
-from typing import List
+from typing import List, Optional
 
 from core import (
     admin_required,
     get_current_user,
     get_db_global,
-    hash_password,
+    hash_password_async,
     logger,
+    page_items,
+    paginate,
+    PageParams,
+    principal_cache,
     settings,
-    verify_password,
+    verify_and_update_password,
 )
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from models_global import UsersGlobal
 from pydantic import ValidationError
 from schemas import (
@@ -26,6 +30,7 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 ROLE_ADMIN = settings.ROLE_ADMIN
 ROLE_USER = settings.ROLE_USER
+ROLES = (settings.ROLE_ADMIN, settings.ROLE_EMPLOYEE, settings.ROLE_USER)
 
 
 @router.post(
@@ -59,7 +64,7 @@ async def create_user(
             raise HTTPException(status_code=400, detail="Username already exists")
 
         # Hash the password
-        hashed_password = hash_password(validated_data.password)
+        hashed_password = await hash_password_async(validated_data.password)
 
         # Create new user
         new_user = UsersGlobal(
@@ -118,7 +123,7 @@ async def create_admin_user(
             raise HTTPException(status_code=400, detail="Username already exists")
 
         # Hash the password
-        hashed_password = hash_password(validated_data.password)
+        hashed_password = await hash_password_async(validated_data.password)
 
         # Create new admin user
         new_user = UsersGlobal(
@@ -144,20 +149,48 @@ async def create_admin_user(
     response_model=List[UserGlobalModel],
     response_description="List of all users",
     summary="Fetch All Users",
-    description="Retrieve a list of all users in the system. Accessible only by admin users.",
+    description="Retrieve users in the system ordered by ID, optionally only those with the given IDs. Paginated with `limit` and `cursor`; the next cursor is returned in the X-Next-Cursor header. Accessible only by admin users.",
 )
 async def get_users(
+    response: Response,
+    page: PageParams = Depends(),
+    role: Optional[str] = Query(
+        None, description="Only return the users with this role."
+    ),
+    ids: Optional[List[int]] = Query(
+        None, description="Only return the users with these IDs."
+    ),
     db: AsyncSession = Depends(get_db_global),
     current_user: UsersGlobal = Depends(admin_required),
 ):
     """
-    Retrieve all users.
+    Retrieve users.
 
+    - **Input**: Page parameters, an optional role filter and optional user
+      IDs, e.g. to look up the owners of a list of reservations.
     - **Access**: Only accessible by admin users.
-    - **Returns**: A list of all users in the system.
+    - **Returns**: A page of users in the system.
+    - **Raises**: HTTP 400 error if the role is unknown or more IDs are given
+      than fit on a page.
     """
-    result = await db.execute(select(UsersGlobal))
-    return result.scalars().all()
+    query = select(UsersGlobal)
+    if role is not None:
+        if role not in ROLES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid role: {role}. Supported roles are {', '.join(ROLES)}.",
+            )
+        query = query.where(UsersGlobal.role == role)
+    if ids is not None:
+        if len(ids) > settings.PAGE_SIZE_MAX:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.PAGE_SIZE_MAX} user IDs can be requested at once.",
+            )
+        query = query.where(UsersGlobal.id.in_(ids))
+
+    result = await db.execute(paginate(query, page, UsersGlobal.id, descending=False))
+    return page_items(result.scalars().all(), page, response, lambda user: (user.id,))
 
 
 @router.get(
@@ -237,6 +270,7 @@ async def update_user(
             setattr(user_to_update, key, value)
         await db.commit()
         await db.refresh(user_to_update)
+        principal_cache.invalidate(current_user.username)
         return UserGlobalModel.model_validate(user_to_update).model_dump()
     except ValidationError as e:
         # Log validation errors for debugging
@@ -269,11 +303,15 @@ async def change_password(
     user_to_update = user_to_update.scalar_one_or_none()
     if not user_to_update:
         raise HTTPException(status_code=404, detail="User not found")
-    if verify_password(password_data.old_password, user_to_update.hashed_password):
-        new_hashed_password = hash_password(password_data.new_password)
+    valid, _ = await verify_and_update_password(
+        password_data.old_password, user_to_update.hashed_password
+    )
+    if valid:
+        new_hashed_password = await hash_password_async(password_data.new_password)
         user_to_update.hashed_password = new_hashed_password
         await db.commit()
         await db.refresh(user_to_update)
+        principal_cache.invalidate(current_user.username)
         return {"status": "ok", "message": "Password updated successfully"}
     else:
         raise HTTPException(status_code=400, detail="Incorrect old password")
@@ -304,4 +342,5 @@ async def delete_user(
         raise HTTPException(status_code=404, detail="User not found")
     await db.delete(user)
     await db.commit()
+    principal_cache.invalidate(user.username)
     return {"status": "ok", "message": f"User {user_id} deleted"}
@@ -1,5 +1,23 @@
 from .config import logger, settings
-from .database import GlobalBase, LocalBase, engines, get_db_global, get_db_local
+from .database import (
+    GlobalBase,
+    LocalBase,
+    databases,
+    engines,
+    get_db_global,
+    get_db_local,
+    get_db_read,
+    get_pool_status,
+    get_replica_status,
+    get_region,
+    read_session,
+    Region,
+    regions,
+    sessions,
+)
+from .principal_cache import principal_cache
+from .password_pool import password_pool
+from .login_throttle import login_throttle
 from .auth import (
     admin_required,
     create_access_token,
@@ -9,9 +27,59 @@ from .auth import (
     get_admin_emails,
     get_current_user,
     hash_password,
+    hash_password_async,
     oauth2_scheme,
     user_required,
+    verify_and_update_password,
     verify_password,
 )
 from .init_db import init_db_on_startup
+from .pagination import (
+    NEXT_CURSOR_HEADER,
+    PageParams,
+    page_items,
+    paginate,
+    where_range,
+)
+from .seat_occupancy import occupancy_cache
+from .seat_holds import (
+    confirm_hold,
+    hold_deadline,
+    hold_queue,
+    release_expired_seat_holds,
+    utc_now,
+)
 from .reservation_check import delete_unpaid_reservations
+from .seat_booking import claim_seats, classify_unclaimed_seats
+from .hall_layout_cache import hall_layout_cache
+from .show_schedule import (
+    CLEANING_GAP,
+    exceeds_max_span,
+    find_conflicts,
+    insert_accepted_shows,
+    is_overlap_violation,
+    recurrence_count,
+    recurrence_starts,
+    resolve_schedule,
+    show_end_time,
+    sweep_conflicts,
+)
+from .show_calendar import show_calendar_cache
+from .now_showing import now_showing
+from .single_flight import FlightResult, single_flight
+from .timetable import (
+    HallDay,
+    MovieDemand,
+    load_hall_days,
+    load_movie_demands,
+    opening_hours,
+    plan_timetable,
+)
+from .export import EXPORT_MEDIA_TYPES, stream_export
+from .tmdb import (
+    TmdbClient,
+    TmdbError,
+    get_many_movie_details,
+    get_movie_details,
+    tmdb_client,
+)
@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
@@ -11,7 +12,9 @@ from sqlalchemy.future import select
 from sqlalchemy.orm import Session
 
 from .config import settings, logger
-from .database import get_db_global
+from .database import sessions
+from .password_pool import password_pool
+from .principal_cache import principal_cache
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
@@ -22,7 +25,9 @@ ROLE_USER = settings.ROLE_USER
 ROLE_EMPLOYEE = settings.ROLE_EMPLOYEE
 ADMIN_PASSWORD = settings.ADMIN_PASSWORD
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login/")
 
 
@@ -53,6 +58,38 @@ def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    """
+    Hashes a plain text password on the password worker pool.
+
+    Args:
+        password (str): The plain text password to hash.
+
+    Returns:
+        str: The hashed password.
+    """
+    return await password_pool.run(hash_password, password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies a password on the password worker pool.
+
+    Args:
+        plain_password (str): The plain text password.
+        hashed_password (str): The hashed password.
+
+    Returns:
+        tuple[bool, str | None]: Whether the password matches, and a new hash
+        to store if the stored one does not use the configured cost factor.
+    """
+    return await password_pool.run(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     """
     Creates a JWT access token.
@@ -93,15 +130,15 @@ def decode_access_token(token: str):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db_global)
-) -> UserGlobalModel:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserGlobalModel:
     """
     Retrieves the current user based on the provided JWT token.
 
+    The user is served from the principal cache when possible, so most
+    requests do not touch the global database.
+
     Args:
         token (str): The JWT token.
-        db (AsyncSession): The database session.
 
     Returns:
         UserGlobalModel: The current user as a Pydantic model.
@@ -113,16 +150,23 @@ async def get_current_user(
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    # Use select with AsyncSession
-    user = await db.execute(
-        select(UsersGlobal).where(UsersGlobal.username == payload.get("sub"))
-    )
-    user = user.scalars().first()  # Extract the first result
+    username = payload.get("sub")
+    current_user = principal_cache.get(username)
+    if current_user is not None:
+        return current_user
+
+    async with sessions["global"]() as db:
+        user = await db.execute(
+            select(UsersGlobal).where(UsersGlobal.username == username)
+        )
+        user = user.scalars().first()  # Extract the first result
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
     # Convert SQLAlchemy User object to Pydantic UserModel
-    return UserGlobalModel.model_validate(user)
+    current_user = UserGlobalModel.model_validate(user)
+    principal_cache.put(current_user)
+    return current_user
 
 
 async def admin_required(current_user: UsersGlobal = Depends(get_current_user)):
@@ -203,7 +247,7 @@ async def create_default_user(db: AsyncSession):
             first_name="Admin",
             last_name="User",
             email="admin@admin.com",
-            hashed_password=hash_password(ADMIN_PASSWORD),
+            hashed_password=await hash_password_async(ADMIN_PASSWORD),
             role="admin",
         )
         db.add(admin_user)
@@ -1,4 +1,6 @@
 import logging
+from typing import Any, Dict, List, Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 # Configure logger
@@ -26,8 +28,11 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file="../../../.env")
 
     DATABASE_URL_GLOBAL: str
-    DATABASE_URL_KRAKOW: str
-    DATABASE_URL_WARSAW: str
+    # Region name -> database URL, as JSON, e.g. {"krakow": "postgresql+asyncpg://..."}
+    REGION_DATABASE_URLS: Dict[str, str] = {}
+    # Legacy per-region URLs, used when REGION_DATABASE_URLS is empty
+    DATABASE_URL_KRAKOW: Optional[str] = None
+    DATABASE_URL_WARSAW: Optional[str] = None
     ADMIN_PASSWORD: str
     FRONTEND_URL: str
     SECRET_KEY: str
@@ -40,6 +45,98 @@ class Settings(BaseSettings):
     ROLE_ADMIN: str
     ROLE_USER: str
     ROLE_EMPLOYEE: str
+    # Memory cap (bytes) of the seat occupancy cache in each region
+    OCCUPANCY_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    # Seconds after which a cached occupancy bitmap is reloaded
+    OCCUPANCY_CACHE_TTL_SECONDS: float = 30
+    # Seconds after which a cached hall layout is rebuilt
+    HALL_LAYOUT_CACHE_TTL_SECONDS: float = 300
+    # Minutes an unpaid reservation holds its seats
+    RESERVATION_HOLD_MINUTES: int = 15
+    # Minutes between backstop sweeps for holds missed by the hold queue
+    RESERVATION_SWEEP_INTERVAL_MINUTES: int = 10
+    # Maximum number of reservations deleted per sweep transaction
+    RESERVATION_SWEEP_BATCH_SIZE: int = 500
+    # Minutes a hall needs for cleaning between two shows
+    SHOW_CLEANING_MINUTES: int = 15
+    # Upper bound (hours) of a show's runtime plus cleaning, bounding conflict lookups
+    SHOW_MAX_SPAN_HOURS: int = 8
+    # Maximum number of shows scheduled by one bulk request
+    SHOW_SCHEDULE_MAX_ITEMS: int = 2000
+    # Maximum number of days of a generated timetable
+    TIMETABLE_MAX_DAYS: int = 31
+    # Maximum number of days of a show calendar request
+    CALENDAR_MAX_DAYS: int = 62
+    # Seconds after which a cached show calendar is rebuilt
+    CALENDAR_CACHE_TTL_SECONDS: float = 30
+    # Maximum number of cached show calendars per region
+    CALENDAR_CACHE_MAX_ENTRIES: int = 256
+    # Seconds after which the index of upcoming showtimes is reloaded
+    NOW_SHOWING_TTL_SECONDS: float = 60
+    # Seconds after which the remaining seat counts of upcoming shows are reloaded
+    NOW_SHOWING_SEATS_TTL_SECONDS: float = 10
+    # Stale-while-revalidate window in seconds of coalesced catalogue reads, by route
+    # ("movies.get", "show.get_details", "show.movies_with_shows"); none by default
+    COALESCE_STALE_SECONDS: Dict[str, float] = {}
+    # Seconds a kept result is served without refreshing it, before its stale window
+    COALESCE_FRESH_SECONDS: float = 5
+    # Maximum number of results kept for stale-while-revalidate
+    COALESCE_MAX_RESULTS: int = 1024
+    # Default and maximum page size of paginated list endpoints
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+    # Rows fetched from the server-side cursor per chunk of a streaming export
+    EXPORT_BATCH_SIZE: int = 1000
+    # Timeout (seconds) of a single TMDB request attempt
+    TMDB_TIMEOUT_SECONDS: float = 5
+    # Retries of a TMDB request on connection errors, 429 and 5xx responses
+    TMDB_MAX_RETRIES: int = 3
+    # Seconds after which fetching one movie from TMDB, retries included, is given up
+    TMDB_DEADLINE_SECONDS: float = 10
+    # Maximum number of TMDB requests in flight per worker
+    TMDB_MAX_CONCURRENCY: int = 8
+    # Language in which movie details are fetched from TMDB
+    TMDB_LANGUAGE: str = "en-US"
+    # Seconds an authenticated user is served from the principal cache
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+    # Maximum number of users kept in the principal cache of each worker
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    # bcrypt cost factor of new hashes, older hashes are upgraded on login
+    BCRYPT_ROUNDS: int = 12
+    # Threads hashing and verifying passwords off the event loop
+    PASSWORD_HASH_WORKERS: int = 4
+    # Where failed logins are counted: "memory" (per worker) or "postgres" (shared)
+    LOGIN_THROTTLE_BACKEND: Literal["memory", "postgres"] = "memory"
+    # Sliding window (seconds) in which failed logins are counted
+    LOGIN_THROTTLE_WINDOW_SECONDS: float = 900
+    # Failed logins allowed per username and per client address within the window
+    LOGIN_THROTTLE_MAX_FAILURES_PER_USER: int = 5
+    LOGIN_THROTTLE_MAX_FAILURES_PER_CLIENT: int = 50
+    # First and maximum block (seconds) once the limit is reached, doubling per failure
+    LOGIN_THROTTLE_BASE_BACKOFF_SECONDS: float = 1
+    LOGIN_THROTTLE_MAX_BACKOFF_SECONDS: float = 300
+    # Connection pool of each database engine
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Per-database overrides of the pool settings above, as JSON, e.g.
+    # {"global": {"pool_size": 20, "max_overflow": 20}}
+    DB_POOL_OVERRIDES: Dict[str, Dict[str, Any]] = {}
+    # Seconds without use after which a region's connections are closed
+    REGION_ENGINE_IDLE_SECONDS: float = 600
+    # Apply pending schema migrations at startup instead of refusing to start.
+    # Off by default: migrations are a deploy step (`python migrate.py upgrade`)
+    DB_MIGRATE_ON_STARTUP: bool = False
+    # Region name -> read replica URLs, as JSON, e.g. {"krakow": ["postgresql+asyncpg://..."]}
+    REGION_REPLICA_URLS: Dict[str, List[str]] = {}
+    # Seconds during which a reader that wrote to a region reads from its primary
+    READ_AFTER_WRITE_SECONDS: float = 5
+    # Maximum number of recent writers remembered for read-after-write routing
+    READ_AFTER_WRITE_MAX_READERS: int = 100000
+    # Seconds a read replica that failed to connect is skipped
+    REPLICA_RETRY_SECONDS: float = 30
 
 
 settings = Settings()
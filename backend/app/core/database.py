@@ -1,61 +1,284 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import time
+from collections.abc import Mapping
+from contextlib import asynccontextmanager
+from typing import Annotated, Dict, List
+
+from fastapi import Depends, HTTPException, Query, Request
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-from .config import settings
+from .config import logger, settings
+from .pool_metrics import PoolMetrics, pool_status, timed_pool_class
+from .replicas import SAFE_METHODS, reader_key, replica_router
 
 # Separate Base objects for global and local models
 GlobalBase = declarative_base()
 LocalBase = declarative_base()
 
-# Database URLs
+
+def region_database_urls() -> Dict[str, str]:
+    """
+    Returns the database URL of each configured region.
+
+    Regions come from `REGION_DATABASE_URLS`; deployments that only set the
+    legacy `DATABASE_URL_KRAKOW` / `DATABASE_URL_WARSAW` keep working.
+    """
+    if settings.REGION_DATABASE_URLS:
+        return dict(settings.REGION_DATABASE_URLS)
+    legacy = {
+        "krakow": settings.DATABASE_URL_KRAKOW,
+        "warsaw": settings.DATABASE_URL_WARSAW,
+    }
+    return {region: url for region, url in legacy.items() if url}
+
+
+REGION_URLS = region_database_urls()
+
+
+def regions() -> List[str]:
+    """Returns the names of the configured regions."""
+    return list(REGION_URLS)
+
+
+def replica_names(region: str) -> List[str]:
+    """Returns the database names of a region's read replicas."""
+    return [
+        f"{region}:replica{index}"
+        for index in range(len(settings.REGION_REPLICA_URLS.get(region, [])))
+    ]
+
+
+# Database URLs: the global database, the regional primaries and their replicas
 DATABASE_URLS = {
     "global": settings.DATABASE_URL_GLOBAL,
-    "krakow": settings.DATABASE_URL_KRAKOW,
-    "warsaw": settings.DATABASE_URL_WARSAW,
+    **REGION_URLS,
+    **{
+        name: url
+        for region in REGION_URLS
+        for name, url in zip(
+            replica_names(region), settings.REGION_REPLICA_URLS.get(region, [])
+        )
+    },
 }
 
-# Engines for global and local databases
-engines = {
-    "global": create_async_engine(DATABASE_URLS["global"], echo=False),
-    "krakow": create_async_engine(DATABASE_URLS["krakow"], echo=False),
-    "warsaw": create_async_engine(DATABASE_URLS["warsaw"], echo=False),
-}
 
-# Session makers for global and local databases
-sessions = {
-    "global": sessionmaker(
-        autocommit=False,
-        autoflush=False,
-        bind=engines["global"],
-        class_=AsyncSession,
-        expire_on_commit=False,
-    ),
-    "krakow": sessionmaker(
-        autocommit=False,
-        autoflush=False,
-        bind=engines["krakow"],
-        class_=AsyncSession,
-        expire_on_commit=False,
-    ),
-    "warsaw": sessionmaker(
-        autocommit=False,
-        autoflush=False,
-        bind=engines["warsaw"],
-        class_=AsyncSession,
-        expire_on_commit=False,
-    ),
-}
+def pool_options(name: str) -> dict:
+    """
+    Returns the pool settings of a database, with its overrides applied.
+    """
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    options.update(settings.DB_POOL_OVERRIDES.get(name, {}))
+    return options
+
+
+class DatabaseRegistry:
+    """
+    Engines and session makers of the configured databases.
+
+    An engine is created on first use of its database. Engines of regions
+    that have not been used for `idle_timeout` seconds get their pool
+    disposed, closing their connections; the engine itself stays registered
+    and reconnects on its next use.
+    """
+
+    def __init__(self, urls: Dict[str, str], idle_timeout: float):
+        self.urls = urls
+        self.idle_timeout = idle_timeout
+        self.pool_metrics: Dict[str, PoolMetrics] = {}
+        self._engines: Dict[str, AsyncEngine] = {}
+        self._session_makers: Dict[str, sessionmaker] = {}
+        self._last_used: Dict[str, float] = {}
+
+    def _create(self, name: str):
+        metrics = self.pool_metrics.setdefault(name, PoolMetrics())
+        engine = create_async_engine(
+            self.urls[name],
+            echo=False,
+            poolclass=timed_pool_class(metrics),
+            **pool_options(name),
+        )
+        self._engines[name] = engine
+        self._session_makers[name] = sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+
+    def _touch(self, name: str):
+        if name not in self._engines:
+            if name not in self.urls:
+                raise KeyError(name)
+            self._create(name)
+        self._last_used[name] = time.monotonic()
+
+    def engine(self, name: str) -> AsyncEngine:
+        """Returns the engine of a database, creating it on first use."""
+        self._touch(name)
+        return self._engines[name]
+
+    def session_maker(self, name: str) -> sessionmaker:
+        """Returns the session maker of a database, creating its engine on first use."""
+        self._touch(name)
+        return self._session_makers[name]
+
+    def pool_status(self) -> dict:
+        """
+        Returns the pool occupancy and checkout metrics of every database in use.
+        """
+        return {
+            name: pool_status(engine, self.pool_metrics[name])
+            for name, engine in self._engines.items()
+        }
+
+    async def dispose_idle(self) -> List[str]:
+        """
+        Disposes the pools of region engines that are idle and have no checked-out connection.
+
+        Returns:
+            list[str]: The names of the disposed databases.
+        """
+        now = time.monotonic()
+        disposed = []
+        # Requests may create region engines while a pool is being disposed
+        for name, engine in list(self._engines.items()):
+            if name == "global" or now - self._last_used[name] < self.idle_timeout:
+                continue
+            pool = engine.sync_engine.pool
+            if pool.checkedout() or not pool.checkedin():
+                continue
+            await engine.dispose()
+            disposed.append(name)
+        if disposed:
+            logger.info(f"Disposed idle database pools: {', '.join(disposed)}")
+        return disposed
+
+
+class _LazyMapping(Mapping):
+    """Read-only mapping over the registry's databases, resolved on access."""
 
+    def __init__(self, registry: DatabaseRegistry, getter):
+        self._registry = registry
+        self._getter = getter
+
+    def __getitem__(self, name: str):
+        return self._getter(name)
+
+    def __iter__(self):
+        return iter(self._registry.urls)
+
+    def __len__(self):
+        return len(self._registry.urls)
+
+    def __contains__(self, name):
+        return name in self._registry.urls
+
+
+databases = DatabaseRegistry(DATABASE_URLS, settings.REGION_ENGINE_IDLE_SECONDS)
+
+# Engines and session makers for global and local databases, created lazily
+engines = _LazyMapping(databases, databases.engine)
+sessions = _LazyMapping(databases, databases.session_maker)
+
+
+def get_region(
+    region: str = Query(..., description="Name of the region (cinema city)."),
+) -> str:
+    """
+    Validates the `region` query parameter against the configured regions.
+
+    Raises:
+        HTTPException: 400 if the region is not configured.
+    """
+    if region not in REGION_URLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid region: {region}. Supported regions are: {', '.join(regions())}.",
+        )
+    return region
+
+
+# Validated `region` query parameter, for use in endpoint signatures
+Region = Annotated[str, Depends(get_region)]
+
+
+async def get_db_local(request: Request, region: Region):
+    """
+    Returns an async database session on the primary of the specified region.
+
+    Readers making a write request are routed to the primary by `get_db_read`
+    for a while afterwards, so they read their own writes.
+    """
+    try:
+        async with sessions[region]() as session:
+            yield session
+    finally:
+        if request.method not in SAFE_METHODS:
+            replica_router.record_write(region, reader_key(request))
+
+
+@asynccontextmanager
+async def read_session(request: Request, region: str):
+    """
+    Opens an async database session for a read-only request in the specified region.
+
+    The session is bound to one of the region's healthy read replicas, chosen
+    round-robin, or to the primary when there is none or the reader wrote
+    recently. A replica failing to connect is skipped for a while.
+    """
+    replicas = replica_names(region)
+    for name in replica_router.candidates(region, reader_key(request), replicas):
+        session = sessions[name]()
+        try:
+            await session.connection()
+        except (DBAPIError, OSError) as e:
+            await session.close()
+            replica_router.mark_down(name, e)
+            continue
+        try:
+            yield session
+        finally:
+            await session.close()
+        return
 
-async def get_db_local(region: str):
-    """Returns an async database session for the specified region."""
-    if region not in sessions:  # Fix region validation logic
-        raise ValueError(f"Invalid region: {region}")
     async with sessions[region]() as session:
         yield session
 
 
+async def get_db_read(request: Request, region: Region):
+    """
+    Returns an async database session for a read-only request in the specified
+    region, see `read_session`.
+    """
+    async with read_session(request, region) as session:
+        yield session
+
+
 async def get_db_global():
     """Returns an async database session for the global database."""
     async with sessions["global"]() as session:
         yield session
+
+
+def get_pool_status() -> dict:
+    """
+    Returns the pool occupancy and checkout metrics of every database in use.
+    """
+    return databases.pool_status()
+
+
+def get_replica_status() -> dict:
+    """
+    Returns the health of the read replicas of every region.
+    """
+    return replica_router.status(
+        [name for region in regions() for name in replica_names(region)]
+    )
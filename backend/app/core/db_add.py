@@ -19,16 +19,6 @@ def get_now_playing_movies(page: int = 1):
         raise ValueError(f"Błąd pobierania danych z API: {response.status_code}")
 
 
-def get_movie_details(movie_id: int):
-    url = f"{TMDB_API_BASE_URL}/movie/{movie_id}"
-    params = {"api_key": TMDB_API_KEY, "language": "pl-PL"}
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        return {}
-
-
 def login():
     """Authenticate and retrieve a token."""
     credentials = {
@@ -47,38 +37,26 @@ def populate_db():
 
     movies = get_now_playing_movies(1)
     movies += get_now_playing_movies(2)
-    movie_data = []
-    for movie in movies:
-        movie_details = get_movie_details(movie["id"])
-        movie_data.append(
-            {
-                "tmdbID": movie_details.get("id"),
-            }
-        )
-    movies_krakow = movie_data[0:20]
-    movies_warsaw = movie_data[20:40]
+    tmdb_ids = [movie["id"] for movie in movies]
+    imports = {"krakow": tmdb_ids[0:20], "warsaw": tmdb_ids[20:40]}
 
-    print(movies_krakow)
-    print(movies_warsaw)
-
-    # Add movies for Krakow
-    for movie in movies_krakow:
-        response = requests.post(
-            f"{BASE_URL}/movies/add?region=krakow", json=movie, headers=headers
-        )
-        if response.status_code == 200:
-            print(f"Added movie {movie['tmdbID']} to Krakow")
-        else:
-            print(f"Failed to add movie {movie['tmdbID']} to Krakow: {response.text}")
-    # Add movies for Warszawa
-    for movie in movies_warsaw:
+    # One bulk import per region, metadata is fetched concurrently by the API
+    for region, region_ids in imports.items():
         response = requests.post(
-            f"{BASE_URL}/movies/add?region=warsaw", json=movie, headers=headers
+            f"{BASE_URL}/movies/bulk-add",
+            json={"tmdbIDs": region_ids, "regions": [region]},
+            headers=headers,
         )
-        if response.status_code == 200:
-            print(f"Added movie {movie['tmdbID']} to Warszawa")
-        else:
-            print(f"Failed to add movie {movie['tmdbID']} to Warszawa: {response.text}")
+        if response.status_code != 200:
+            print(f"Failed to import movies to {region}: {response.text}")
+            continue
+        for result in response.json():
+            if result["status"] == "failed":
+                print(
+                    f"Failed to add movie {result['tmdbID']} to {region}: {result['detail']}"
+                )
+            else:
+                print(f"Movie {result['tmdbID']} {result['status']} in {region}")
 
     print("Database populated successfully.")
 
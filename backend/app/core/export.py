@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import AsyncIterator, Iterable, Sequence
+
+from .config import settings
+from .database import sessions
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(rows: Iterable[Sequence], header: Sequence[str] = None) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header is not None:
+        writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _encode_ndjson(rows: Iterable[Sequence], columns: Sequence[str]) -> bytes:
+    return "".join(
+        json.dumps(
+            {column: _json_value(value) for column, value in zip(columns, row)},
+            separators=(",", ":"),
+        )
+        + "\n"
+        for row in rows
+    ).encode()
+
+
+async def stream_export(
+    region: str, query, fmt: str = "csv", compress: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    Streams the rows of a query as CSV or NDJSON chunks.
+
+    The query runs on a server-side cursor in its own session, so the export
+    outlives the request's dependencies and memory stays bounded by
+    `EXPORT_BATCH_SIZE` rows whatever the size of the table. Each batch is
+    encoded into one chunk and handed to the server before the next one is
+    fetched, letting other requests on the worker run in between.
+
+    Args:
+        region (str): The region whose database is queried.
+        query: A select statement of plain columns; their labels become the
+            CSV header and the NDJSON keys.
+        fmt (str): Either "csv" or "ndjson".
+        compress (bool): Whether to gzip the output.
+
+    Yields:
+        bytes: The encoded (and optionally compressed) chunks.
+    """
+    columns = [column.name for column in query.selected_columns]
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    header = True
+
+    async with sessions[region]() as db:
+        result = await db.stream(
+            query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            if fmt == "csv":
+                chunk = _encode_csv(rows, columns if header else None)
+            else:
+                chunk = _encode_ndjson(rows, columns)
+            header = False
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    if header and fmt == "csv":
+        chunk = _encode_csv([], columns)
+        yield compressor.compress(chunk) if compressor is not None else chunk
+    if compressor is not None:
+        yield compressor.flush()
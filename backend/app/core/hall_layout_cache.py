@@ -0,0 +1,100 @@
+import hashlib
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models_local import HallRow, Seat
+from schemas import HallRowWithSeatsModel, SeatHallModel
+from .config import settings
+
+
+class HallLayout:
+    """
+    Pre-serialized layout of a hall.
+
+    Attributes:
+        body (bytes): JSON list of rows with their seats.
+        version (str): Content hash of `body`, identical on every worker.
+        loaded_at (float): Monotonic time at which the layout was built.
+    """
+
+    __slots__ = ("body", "version", "loaded_at")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.version = hashlib.sha1(body).hexdigest()[:16]
+        self.loaded_at = time.monotonic()
+
+
+class HallLayoutCache:
+    """
+    Per-region cache of hall layouts (rows and seats).
+
+    Layouts are built with a single query on first use and kept until one of
+    the hall, row or seat mutation endpoints of this worker invalidates them,
+    or for at most `ttl` seconds so that changes made through other workers
+    or directly in the database show up.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._layouts: Dict[str, Dict[int, HallLayout]] = {}
+        self._generations: Dict[str, int] = {}
+
+    async def _build(self, hall_id: int, db: AsyncSession) -> Optional[HallLayout]:
+        result = await db.execute(
+            select(HallRow, Seat.id, Seat.seat_number)
+            .outerjoin(Seat, Seat.row_id == HallRow.id)
+            .where(HallRow.hall_id == hall_id)
+            .order_by(HallRow.row_number, HallRow.id, Seat.seat_number)
+        )
+        rows: Dict[int, HallRowWithSeatsModel] = {}
+        for row, seat_id, seat_number in result.all():
+            if row.id not in rows:
+                rows[row.id] = HallRowWithSeatsModel(
+                    id=row.id,
+                    row_number=row.row_number,
+                    hall_id=row.hall_id,
+                    seat_count=0,
+                    seats=[],
+                )
+            if seat_id is not None:
+                rows[row.id].seats.append(
+                    SeatHallModel(id=seat_id, seat_number=seat_number)
+                )
+                rows[row.id].seat_count += 1
+        if not rows:
+            return None
+
+        body = b",".join(row.model_dump_json().encode() for row in rows.values())
+        return HallLayout(b"[" + body + b"]")
+
+    async def get(
+        self, region: str, hall_id: int, db: AsyncSession
+    ) -> Optional[HallLayout]:
+        """
+        Returns the layout of a hall, or None if the hall has no rows.
+        """
+        layout = self._layouts.get(region, {}).get(hall_id)
+        if layout is None or time.monotonic() - layout.loaded_at >= self.ttl:
+            generation = self._generations.get(region, 0)
+            layout = await self._build(hall_id, db)
+            # Skip caching if the region was invalidated while building
+            if layout is not None and generation == self._generations.get(region, 0):
+                self._layouts.setdefault(region, {})[hall_id] = layout
+        return layout
+
+    def invalidate(self, region: str, hall_id: Optional[int] = None):
+        """
+        Drops the layout of a hall, or of every hall of a region when `hall_id` is None.
+        """
+        self._generations[region] = self._generations.get(region, 0) + 1
+        if hall_id is None:
+            self._layouts.pop(region, None)
+        else:
+            self._layouts.get(region, {}).pop(hall_id, None)
+
+
+hall_layout_cache = HallLayoutCache(settings.HALL_LAYOUT_CACHE_TTL_SECONDS)
@@ -0,0 +1,235 @@
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+
+from models_global import LoginFailure
+from .config import logger, settings
+from .database import sessions
+
+
+class MemoryThrottleBackend:
+    """
+    Keeps failed login timestamps in the memory of the current worker.
+
+    Attributes:
+        max_keys (int): Number of keys tracked before the least recently
+            failed ones are forgotten.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._failures: "OrderedDict[str, Deque[float]]" = OrderedDict()
+
+    async def failures(self, key: str, since: float) -> Tuple[int, Optional[float]]:
+        """
+        Returns the number of failures of a key after `since` and the time of the last one.
+        """
+        timestamps = self._failures.get(key)
+        if not timestamps:
+            return 0, None
+        while timestamps and timestamps[0] < since:
+            timestamps.popleft()
+        if not timestamps:
+            del self._failures[key]
+            return 0, None
+        return len(timestamps), timestamps[-1]
+
+    async def record_failure(self, key: str, at: float):
+        """
+        Records a failed attempt of a key.
+        """
+        self._failures.setdefault(key, deque()).append(at)
+        self._failures.move_to_end(key)
+        while len(self._failures) > self.max_keys:
+            self._failures.popitem(last=False)
+
+    async def reset(self, key: str):
+        """
+        Forgets the failures of a key.
+        """
+        self._failures.pop(key, None)
+
+
+class PostgresThrottleBackend:
+    """
+    Keeps failed login timestamps in the global database, shared by all workers.
+    """
+
+    @staticmethod
+    def _datetime(timestamp: float) -> datetime:
+        return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+    async def failures(self, key: str, since: float) -> Tuple[int, Optional[float]]:
+        """
+        Returns the number of failures of a key after `since` and the time of the last one.
+        """
+        async with sessions["global"]() as db:
+            result = await db.execute(
+                select(func.count(), func.max(LoginFailure.failed_at)).where(
+                    LoginFailure.key == key,
+                    LoginFailure.failed_at >= self._datetime(since),
+                )
+            )
+            count, last = result.one()
+        if not count:
+            return 0, None
+        return count, last.replace(tzinfo=timezone.utc).timestamp()
+
+    async def record_failure(self, key: str, at: float):
+        """
+        Records a failed attempt of a key and prunes its expired failures.
+        """
+        async with sessions["global"]() as db:
+            db.add(LoginFailure(key=key, failed_at=self._datetime(at)))
+            await db.execute(
+                delete(LoginFailure).where(
+                    LoginFailure.key == key,
+                    LoginFailure.failed_at
+                    < self._datetime(at - settings.LOGIN_THROTTLE_WINDOW_SECONDS),
+                )
+            )
+            await db.commit()
+
+    async def reset(self, key: str):
+        """
+        Forgets the failures of a key.
+        """
+        async with sessions["global"]() as db:
+            await db.execute(delete(LoginFailure).where(LoginFailure.key == key))
+            await db.commit()
+
+
+class LoginThrottle:
+    """
+    Sliding-window limiter of failed logins, keyed by username and by client address.
+
+    Once a key reaches its failure limit within the window, further attempts
+    are rejected for a backoff that doubles with every additional failure, up
+    to `max_backoff`. Blocks are remembered in memory, so rejected attempts
+    are answered without touching the backend or verifying a password.
+    """
+
+    def __init__(
+        self,
+        backend,
+        window: float,
+        max_user_failures: int,
+        max_client_failures: int,
+        base_backoff: float,
+        max_backoff: float,
+    ):
+        self.backend = backend
+        self.window = window
+        self.max_user_failures = max_user_failures
+        self.max_client_failures = max_client_failures
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.checks = 0
+        self.rejected = 0
+        self.failures_recorded = 0
+        self.resets = 0
+        self._blocked: Dict[str, float] = {}
+
+    @staticmethod
+    def _user_key(username: str) -> str:
+        return f"user:{username.lower()}"
+
+    def _keys(self, username: str, client: str):
+        return (
+            (self._user_key(username), self.max_user_failures),
+            (f"client:{client}", self.max_client_failures),
+        )
+
+    def _backoff(self, failures: int, limit: int) -> float:
+        return min(self.base_backoff * 2 ** (failures - limit), self.max_backoff)
+
+    def _reject(self, until: float, now: float):
+        self.rejected += 1
+        retry_after = max(1, int(until - now + 0.999))
+        raise HTTPException(
+            status_code=429,
+            detail="Too many failed login attempts. Try again later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    async def check(self, username: str, client: str):
+        """
+        Rejects the attempt if the username or the client is blocked.
+
+        Raises:
+            HTTPException: 429 with a Retry-After header while blocked.
+        """
+        self.checks += 1
+        now = time.time()
+        keys = self._keys(username, client)
+        for key, _ in keys:
+            until = self._blocked.get(key)
+            if until is not None:
+                if until > now:
+                    self._reject(until, now)
+                del self._blocked[key]
+
+        for key, limit in keys:
+            failures, last = await self.backend.failures(key, now - self.window)
+            if failures >= limit:
+                until = last + self._backoff(failures, limit)
+                if until > now:
+                    self._blocked[key] = until
+                    self._reject(until, now)
+
+    async def record_failure(self, username: str, client: str):
+        """
+        Records a failed attempt for the username and the client.
+        """
+        now = time.time()
+        self.failures_recorded += 1
+        if len(self._blocked) > 10_000:
+            self._blocked = {k: t for k, t in self._blocked.items() if t > now}
+        for key, limit in self._keys(username, client):
+            await self.backend.record_failure(key, now)
+            failures, _ = await self.backend.failures(key, now - self.window)
+            if failures >= limit:
+                self._blocked[key] = now + self._backoff(failures, limit)
+                logger.warning(f"Login throttled for {key} after {failures} failures.")
+
+    async def record_success(self, username: str):
+        """
+        Clears the failures of a username after a successful login.
+        """
+        self.resets += 1
+        key = self._user_key(username)
+        self._blocked.pop(key, None)
+        await self.backend.reset(key)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the throttle counters and the number of keys blocked on this worker.
+        """
+        now = time.time()
+        return {
+            "backend": type(self.backend).__name__,
+            "checks": self.checks,
+            "rejected": self.rejected,
+            "failures_recorded": self.failures_recorded,
+            "resets": self.resets,
+            "blocked_keys": sum(1 for until in self._blocked.values() if until > now),
+        }
+
+
+THROTTLE_BACKENDS = {
+    "memory": MemoryThrottleBackend,
+    "postgres": PostgresThrottleBackend,
+}
+
+login_throttle = LoginThrottle(
+    THROTTLE_BACKENDS[settings.LOGIN_THROTTLE_BACKEND](),
+    window=settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+    max_user_failures=settings.LOGIN_THROTTLE_MAX_FAILURES_PER_USER,
+    max_client_failures=settings.LOGIN_THROTTLE_MAX_FAILURES_PER_CLIENT,
+    base_backoff=settings.LOGIN_THROTTLE_BASE_BACKOFF_SECONDS,
+    max_backoff=settings.LOGIN_THROTTLE_MAX_BACKOFF_SECONDS,
+)
@@ -0,0 +1,530 @@
+"""
+Versioned schema migrations of the global and regional databases.
+
+Each database records the migrations applied to it in `schema_migrations`.
+Migrations of the global database upgrade `GlobalBase` tables, migrations of
+the regional databases upgrade `LocalBase` tables and are applied to every
+region concurrently. Every database, including an empty one, is built by
+applying the migrations in order, so a change to the models needs a new
+migration.
+
+Apply pending migrations from `backend/app` with:
+
+    python migrate.py upgrade
+
+and show the version of each database with `python migrate.py status`.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    inspect,
+    select,
+    text,
+)
+
+from .config import logger, settings
+from .database import engines, regions
+
+# Arbitrary key of the advisory lock serializing migrations of a database
+MIGRATION_LOCK_KEY = 72_431_901
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    A schema change of the global database or of every regional database.
+
+    Attributes:
+        version (int): Position of the migration, unique per scope.
+        description (str): What the migration changes.
+        scope (str): "global" or "local".
+        upgrade (callable): Applies the change on a synchronous connection,
+            inside the migration transaction.
+    """
+
+    version: int
+    description: str
+    scope: str
+    upgrade: Callable[[Connection], None]
+
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+
+def _has_constraint(conn: Connection, table: str, constraint: str) -> bool:
+    result = conn.execute(
+        text(
+            "SELECT 1 FROM pg_constraint "
+            "WHERE conrelid = CAST(:table AS regclass) AND conname = :constraint"
+        ),
+        {"table": table, "constraint": constraint},
+    )
+    return result.first() is not None
+
+
+def _execute(statements: List[str]) -> Callable[[Connection], None]:
+    """Returns a migration step executing the given statements in order."""
+
+    def upgrade(conn: Connection):
+        for statement in statements:
+            conn.execute(text(statement))
+
+    return upgrade
+
+
+# The schema `create_all` built before migrations, frozen as it was then.
+# Later changes of the models belong in new migrations, never in these.
+GLOBAL_BASELINE_DDL = [
+    "CREATE TABLE IF NOT EXISTS users_global ("
+    "id SERIAL NOT NULL, "
+    "username VARCHAR, "
+    "first_name VARCHAR, "
+    "last_name VARCHAR, "
+    "email VARCHAR, "
+    "hashed_password VARCHAR, "
+    "role VARCHAR, "
+    "PRIMARY KEY (id), "
+    "UNIQUE (username))",
+    "CREATE INDEX IF NOT EXISTS ix_users_global_id ON users_global (id)",
+]
+
+TMDB_MOVIE_CACHE_DDL = [
+    "CREATE TABLE IF NOT EXISTS tmdb_movie_cache ("
+    "tmdb_id INTEGER NOT NULL, "
+    "language VARCHAR NOT NULL, "
+    "data JSON NOT NULL, "
+    "fetched_at TIMESTAMP WITHOUT TIME ZONE, "
+    "PRIMARY KEY (tmdb_id, language))",
+]
+
+LOGIN_FAILURES_DDL = [
+    "CREATE TABLE IF NOT EXISTS login_failures ("
+    "id SERIAL NOT NULL, "
+    "key VARCHAR NOT NULL, "
+    "failed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+    "PRIMARY KEY (id))",
+    "CREATE INDEX IF NOT EXISTS ix_login_failures_key_failed_at "
+    "ON login_failures (key, failed_at)",
+]
+
+LOCAL_BASELINE_DDL = [
+    "CREATE TABLE IF NOT EXISTS halls ("
+    "id SERIAL NOT NULL, "
+    "name VARCHAR, "
+    "PRIMARY KEY (id))",
+    "CREATE INDEX IF NOT EXISTS ix_halls_id ON halls (id)",
+    "CREATE TABLE IF NOT EXISTS movies ("
+    "id SERIAL NOT NULL, "
+    '"tmdbID" INTEGER, '
+    "title VARCHAR, "
+    "release_date DATE, "
+    "poster_path VARCHAR, "
+    "runtime INTEGER, "
+    "genres JSON, "
+    "description VARCHAR, "
+    "PRIMARY KEY (id))",
+    "CREATE INDEX IF NOT EXISTS ix_movies_id ON movies (id)",
+    'CREATE UNIQUE INDEX IF NOT EXISTS "ix_movies_tmdbID" ON movies ("tmdbID")',
+    "CREATE TABLE IF NOT EXISTS hall_rows ("
+    "id SERIAL NOT NULL, "
+    "hall_id INTEGER, "
+    "row_number INTEGER, "
+    "seat_count INTEGER, "
+    "PRIMARY KEY (id), "
+    "FOREIGN KEY (hall_id) REFERENCES halls (id))",
+    "CREATE INDEX IF NOT EXISTS ix_hall_rows_hall_id ON hall_rows (hall_id)",
+    "CREATE INDEX IF NOT EXISTS ix_hall_rows_id ON hall_rows (id)",
+    "CREATE INDEX IF NOT EXISTS ix_hall_rows_row_number ON hall_rows (row_number)",
+    "CREATE INDEX IF NOT EXISTS ix_hall_rows_seat_count ON hall_rows (seat_count)",
+    "CREATE TABLE IF NOT EXISTS shows ("
+    "id SERIAL NOT NULL, "
+    "movie_id INTEGER, "
+    "hall_id INTEGER, "
+    "start_time TIMESTAMP WITHOUT TIME ZONE, "
+    "price FLOAT, "
+    "PRIMARY KEY (id), "
+    "FOREIGN KEY (movie_id) REFERENCES movies (id), "
+    "FOREIGN KEY (hall_id) REFERENCES halls (id))",
+    "CREATE INDEX IF NOT EXISTS ix_shows_hall_id ON shows (hall_id)",
+    "CREATE INDEX IF NOT EXISTS ix_shows_id ON shows (id)",
+    "CREATE INDEX IF NOT EXISTS ix_shows_movie_id ON shows (movie_id)",
+    "CREATE TABLE IF NOT EXISTS reservations ("
+    "id SERIAL NOT NULL, "
+    "user_id INTEGER, "
+    "show_id INTEGER, "
+    "status VARCHAR, "
+    "created_at TIMESTAMP WITHOUT TIME ZONE, "
+    "PRIMARY KEY (id), "
+    "FOREIGN KEY (show_id) REFERENCES shows (id))",
+    "CREATE INDEX IF NOT EXISTS ix_reservations_id ON reservations (id)",
+    "CREATE INDEX IF NOT EXISTS ix_reservations_show_id ON reservations (show_id)",
+    "CREATE INDEX IF NOT EXISTS ix_reservations_user_id ON reservations (user_id)",
+    "CREATE TABLE IF NOT EXISTS seats ("
+    "id SERIAL NOT NULL, "
+    "row_id INTEGER, "
+    "seat_number INTEGER, "
+    "seat_type VARCHAR, "
+    "PRIMARY KEY (id), "
+    "FOREIGN KEY (row_id) REFERENCES hall_rows (id))",
+    "CREATE INDEX IF NOT EXISTS ix_seats_id ON seats (id)",
+    "CREATE INDEX IF NOT EXISTS ix_seats_row_id ON seats (row_id)",
+    "CREATE INDEX IF NOT EXISTS ix_seats_seat_number ON seats (seat_number)",
+    "CREATE TABLE IF NOT EXISTS payments ("
+    "id SERIAL NOT NULL, "
+    "reservation_id INTEGER, "
+    "amount FLOAT, "
+    "payment_method VARCHAR, "
+    "status VARCHAR, "
+    "created_at TIMESTAMP WITHOUT TIME ZONE, "
+    "PRIMARY KEY (id), "
+    "FOREIGN KEY (reservation_id) REFERENCES reservations (id))",
+    "CREATE INDEX IF NOT EXISTS ix_payments_id ON payments (id)",
+    "CREATE INDEX IF NOT EXISTS ix_payments_reservation_id "
+    "ON payments (reservation_id)",
+    "CREATE TABLE IF NOT EXISTS reservation_seats ("
+    "id SERIAL NOT NULL, "
+    "seat_id INTEGER, "
+    "reservation_id INTEGER, "
+    "PRIMARY KEY (id), "
+    "FOREIGN KEY (seat_id) REFERENCES seats (id), "
+    "FOREIGN KEY (reservation_id) REFERENCES reservations (id))",
+    "CREATE INDEX IF NOT EXISTS ix_reservation_seats_id ON reservation_seats (id)",
+    "CREATE INDEX IF NOT EXISTS ix_reservation_seats_reservation_id "
+    "ON reservation_seats (reservation_id)",
+    "CREATE INDEX IF NOT EXISTS ix_reservation_seats_seat_id "
+    "ON reservation_seats (seat_id)",
+]
+
+
+def _reservation_seats_show_id(conn: Connection):
+    if not _has_column(conn, "reservation_seats", "show_id"):
+        conn.execute(text("ALTER TABLE reservation_seats ADD COLUMN show_id INTEGER"))
+    conn.execute(
+        text(
+            "UPDATE reservation_seats SET show_id = reservations.show_id "
+            "FROM reservations "
+            "WHERE reservations.id = reservation_seats.reservation_id "
+            "AND reservation_seats.show_id IS NULL"
+        )
+    )
+    conn.execute(text("ALTER TABLE reservation_seats ALTER COLUMN show_id SET NOT NULL"))
+    constraints = {
+        "reservation_seats_show_id_fkey": "FOREIGN KEY (show_id) REFERENCES shows (id)",
+        "uq_reservation_seats_show_seat": "UNIQUE (show_id, seat_id)",
+    }
+    for name, definition in constraints.items():
+        if not _has_constraint(conn, "reservation_seats", name):
+            conn.execute(
+                text(f"ALTER TABLE reservation_seats ADD CONSTRAINT {name} {definition}")
+            )
+
+
+def _reservations_expires_at(conn: Connection):
+    if not _has_column(conn, "reservations", "expires_at"):
+        conn.execute(text("ALTER TABLE reservations ADD COLUMN expires_at TIMESTAMP"))
+        # Unpaid reservations made before deadlines existed expire a hold after creation
+        conn.execute(
+            text(
+                "UPDATE reservations "
+                "SET expires_at = created_at + make_interval(mins => :minutes) "
+                "WHERE status != 'paid'"
+            ),
+            {"minutes": settings.RESERVATION_HOLD_MINUTES},
+        )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_reservations_hold_expires_at "
+            "ON reservations (expires_at) WHERE expires_at IS NOT NULL"
+        )
+    )
+
+
+# Single-column indexes made redundant by primary keys or composite indexes
+REDUNDANT_LOCAL_INDEXES = [
+    "ix_halls_id",
+    "ix_hall_rows_id",
+    "ix_hall_rows_row_number",
+    "ix_hall_rows_seat_count",
+    "ix_seats_id",
+    "ix_seats_row_id",
+    "ix_seats_seat_number",
+    "ix_movies_id",
+    "ix_shows_id",
+    "ix_shows_hall_id",
+    "ix_reservations_id",
+    "ix_reservations_user_id",
+    "ix_reservation_seats_id",
+    "ix_reservation_seats_reservation_id",
+    "ix_payments_id",
+]
+
+QUERY_INDEXES = {
+    "ix_shows_hall_id_start_time": "shows (hall_id, start_time)",
+    "ix_shows_start_time_id": "shows (start_time, id)",
+    "ix_reservations_user_id_created_at": "reservations (user_id, created_at, id)",
+    "ix_reservations_status_created_at": "reservations (status, created_at, id)",
+    "ix_reservation_seats_reservation_id_seat_id": "reservation_seats (reservation_id, seat_id)",
+}
+
+
+def _query_indexes(conn: Connection):
+    for name, definition in QUERY_INDEXES.items():
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}"))
+    if not _has_constraint(conn, "seats", "uq_seats_row_seat"):
+        conn.execute(
+            text(
+                "ALTER TABLE seats ADD CONSTRAINT uq_seats_row_seat "
+                "UNIQUE (row_id, seat_number)"
+            )
+        )
+    for name in REDUNDANT_LOCAL_INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def _shows_overlap_constraint(conn: Connection):
+    if not _has_column(conn, "shows", "end_time"):
+        conn.execute(text("ALTER TABLE shows ADD COLUMN end_time TIMESTAMP"))
+    gap = {"gap": settings.SHOW_CLEANING_MINUTES}
+    conn.execute(
+        text(
+            "UPDATE shows SET end_time = shows.start_time "
+            "+ make_interval(mins => COALESCE(movies.runtime, 0) + :gap) "
+            "FROM movies WHERE movies.id = shows.movie_id AND shows.end_time IS NULL"
+        ),
+        gap,
+    )
+    conn.execute(
+        text(
+            "UPDATE shows SET end_time = start_time + make_interval(mins => :gap) "
+            "WHERE end_time IS NULL"
+        ),
+        gap,
+    )
+    conn.execute(text("ALTER TABLE shows ALTER COLUMN end_time SET NOT NULL"))
+
+    overlaps = conn.execute(
+        text(
+            "SELECT a.id, b.id FROM shows a JOIN shows b "
+            "ON a.hall_id = b.hall_id AND a.id < b.id "
+            "AND a.start_time < b.end_time AND b.start_time < a.end_time "
+            "LIMIT 20"
+        )
+    ).all()
+    if overlaps:
+        raise RuntimeError(
+            "Overlapping shows must be rescheduled or deleted before migrating: "
+            + ", ".join(f"{a} and {b}" for a, b in overlaps)
+        )
+
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+    if not _has_constraint(conn, "shows", "ex_shows_hall_overlap"):
+        conn.execute(
+            text(
+                "ALTER TABLE shows ADD CONSTRAINT ex_shows_hall_overlap "
+                "EXCLUDE USING gist (hall_id WITH =, tsrange(start_time, end_time) WITH &&)"
+            )
+        )
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "Baseline users table",
+        "global",
+        _execute(GLOBAL_BASELINE_DDL),
+    ),
+    Migration(
+        2,
+        "TMDB movie details cache",
+        "global",
+        _execute(TMDB_MOVIE_CACHE_DDL),
+    ),
+    Migration(
+        3,
+        "Failed login attempts",
+        "global",
+        _execute(LOGIN_FAILURES_DDL),
+    ),
+    Migration(
+        4,
+        "Drop the index duplicating the users primary key",
+        "global",
+        lambda conn: conn.execute(text("DROP INDEX IF EXISTS ix_users_global_id")),
+    ),
+    Migration(
+        1,
+        "Baseline cinema tables",
+        "local",
+        _execute(LOCAL_BASELINE_DDL),
+    ),
+    Migration(
+        2,
+        "Show of reserved seats, unique per show and seat",
+        "local",
+        _reservation_seats_show_id,
+    ),
+    Migration(
+        3,
+        "Hold deadline of reservations with a partial index",
+        "local",
+        _reservations_expires_at,
+    ),
+    Migration(
+        4,
+        "Composite indexes of the hot queries, unique seats per row",
+        "local",
+        _query_indexes,
+    ),
+    Migration(
+        5,
+        "End time of shows, overlapping shows in a hall excluded",
+        "local",
+        _shows_overlap_constraint,
+    ),
+]
+
+
+def migrations_for(database: str) -> List[Migration]:
+    """Returns the migrations of a database, in order."""
+    scope = "global" if database == "global" else "local"
+    return sorted(
+        (m for m in MIGRATIONS if m.scope == scope), key=lambda m: m.version
+    )
+
+
+def head_version(database: str) -> int:
+    """Returns the version a database has once every migration is applied."""
+    return max((m.version for m in migrations_for(database)), default=0)
+
+
+def _current_version(conn: Connection) -> int:
+    if not inspect(conn).has_table(schema_migrations.name):
+        return 0
+    return conn.execute(select(func.max(schema_migrations.c.version))).scalar() or 0
+
+
+def _upgrade(conn: Connection, database: str) -> List[int]:
+    if conn.dialect.name == "postgresql":
+        conn.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY}
+        )
+    current = _current_version(conn)
+    migrations = migrations_for(database)
+    pending = [m for m in migrations if m.version > current]
+    if not pending:
+        return []
+
+    # An empty database replays every migration from the frozen baseline
+    schema_migrations.create(conn, checkfirst=True)
+    for migration in pending:
+        logger.info(
+            f"Migrating {database} to version {migration.version}: {migration.description}"
+        )
+        migration.upgrade(conn)
+
+    applied_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    conn.execute(
+        schema_migrations.insert(),
+        [
+            {
+                "version": m.version,
+                "description": m.description,
+                "applied_at": applied_at,
+            }
+            for m in pending
+        ],
+    )
+    return [m.version for m in pending]
+
+
+async def current_version(database: str) -> int:
+    """Returns the version of a database, 0 if it has never been migrated."""
+    async with engines[database].connect() as conn:
+        return await conn.run_sync(_current_version)
+
+
+async def upgrade(database: str) -> List[int]:
+    """
+    Applies the pending migrations of a database in one transaction.
+
+    Concurrent upgrades of the same database wait for each other on an
+    advisory lock, so only one of them applies the migrations. An empty
+    database is built by applying every migration from the baseline.
+
+    Returns:
+        list[int]: The versions that were applied.
+    """
+    async with engines[database].begin() as conn:
+        return await conn.run_sync(_upgrade, database)
+
+
+def databases_to_migrate() -> List[str]:
+    """Returns the global database followed by every region."""
+    return ["global", *regions()]
+
+
+async def pending_migrations() -> Dict[str, List[int]]:
+    """
+    Returns the versions not yet applied to each database, checking all databases concurrently.
+    """
+    names = databases_to_migrate()
+    versions = await asyncio.gather(*(current_version(name) for name in names))
+    return {
+        name: [m.version for m in migrations_for(name) if m.version > version]
+        for name, version in zip(names, versions)
+        if version < head_version(name)
+    }
+
+
+async def upgrade_all(names: List[str] = None) -> Dict[str, List[int]]:
+    """
+    Applies the pending migrations of the given databases, all of them by default, concurrently.
+
+    Returns:
+        dict[str, list[int]]: The versions applied to each database.
+    """
+    names = names or databases_to_migrate()
+    applied = await asyncio.gather(*(upgrade(name) for name in names))
+    return dict(zip(names, applied))
+
+
+async def ensure_schema_current():
+    """
+    Checks at startup that every database is at the latest version.
+
+    Pending migrations are applied when `DB_MIGRATE_ON_STARTUP` is set.
+
+    Raises:
+        RuntimeError: If migrations are pending and may not be applied at startup.
+    """
+    pending = await pending_migrations()
+    if not pending:
+        return
+    if not settings.DB_MIGRATE_ON_STARTUP:
+        raise RuntimeError(
+            f"Database migrations pending: {pending}. "
+            "Run `python migrate.py upgrade`."
+        )
+    for name, versions in (await upgrade_all(list(pending))).items():
+        logger.info(f"Applied migrations {versions} to the {name} database.")
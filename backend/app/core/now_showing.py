@@ -0,0 +1,294 @@
+import heapq
+import json
+import time
+from bisect import insort
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models_local import HallRow, Movie, ReservationSeat, Seat, Show
+from .config import settings
+
+# (start time, show ID, hall ID) of an upcoming show
+UpcomingShow = Tuple[datetime, int, int]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class MovieShowtimes:
+    """
+    A movie and its upcoming shows in start order.
+
+    Attributes:
+        fragment (bytes): The serialized movie without seat counts, None
+            after a change until it is serialized again.
+    """
+
+    __slots__ = ("id", "title", "poster_path", "shows", "fragment")
+
+    def __init__(self, movie_id: int, title: Optional[str], poster_path: Optional[str]):
+        self.id = movie_id
+        self.title = title
+        self.poster_path = poster_path
+        self.shows: List[UpcomingShow] = []
+        self.fragment: Optional[bytes] = None
+
+    def serialize(
+        self, remaining_seats: Optional[Callable[[int, int], int]] = None
+    ) -> bytes:
+        shows = []
+        for start_time, show_id, hall_id in self.shows:
+            show = {
+                "id": show_id,
+                "start_time": start_time.isoformat(),
+                "hall_id": hall_id,
+            }
+            if remaining_seats is not None:
+                show["remaining_seats"] = remaining_seats(show_id, hall_id)
+            shows.append(show)
+        return _dumps(
+            {
+                "id": self.id,
+                "title": self.title,
+                "poster_path": self.poster_path,
+                "shows": shows,
+            }
+        )
+
+
+class RegionShowtimes:
+    """
+    The upcoming showtimes of a region, grouped by movie.
+
+    Attributes:
+        movies (dict): The movies with upcoming shows, by ID.
+        shows (dict): (movie ID, start time, hall ID) of each upcoming show, by ID.
+        starts (list): Heap of (start time, show ID), to drop shows once they start.
+        unknown_movies (set): Movies with shows whose title and poster are not loaded yet.
+        body (bytes): The serialized index without seat counts, None after a change.
+        capacities (dict): The number of seats of each hall.
+        reserved (dict): The number of reserved seats of each upcoming show.
+        seats_body (bytes): The serialized index with seat counts, None after a change.
+    """
+
+    def __init__(self):
+        self.movies: Dict[int, MovieShowtimes] = {}
+        self.shows: Dict[int, Tuple[int, datetime, int]] = {}
+        self.starts: List[Tuple[datetime, int]] = []
+        self.unknown_movies: Set[int] = set()
+        self.loaded_at = time.monotonic()
+        self.body: Optional[bytes] = None
+        self.capacities: Dict[int, int] = {}
+        self.reserved: Dict[int, int] = {}
+        self.seats_loaded_at: Optional[float] = None
+        self.seats_body: Optional[bytes] = None
+
+    def add(self, show_id: int, movie_id: int, hall_id: int, start_time: datetime):
+        self.remove(show_id)
+        movie = self.movies.get(movie_id)
+        if movie is None:
+            movie = self.movies[movie_id] = MovieShowtimes(movie_id, None, None)
+            self.unknown_movies.add(movie_id)
+        insort(movie.shows, (start_time, show_id, hall_id))
+        self.shows[show_id] = (movie_id, start_time, hall_id)
+        heapq.heappush(self.starts, (start_time, show_id))
+        self._changed(movie)
+
+    def remove(self, show_id: int):
+        entry = self.shows.pop(show_id, None)
+        if entry is None:
+            return
+        movie_id, start_time, hall_id = entry
+        movie = self.movies[movie_id]
+        movie.shows.remove((start_time, show_id, hall_id))
+        if not movie.shows:
+            del self.movies[movie_id]
+            self.unknown_movies.discard(movie_id)
+        self._changed(movie)
+
+    def roll_forward(self, now: datetime):
+        """
+        Drops the shows that have started. Entries of shows removed or moved
+        since they were pushed are skipped.
+        """
+        while self.starts and self.starts[0][0] <= now:
+            start_time, show_id = heapq.heappop(self.starts)
+            entry = self.shows.get(show_id)
+            if entry is not None and entry[1] == start_time:
+                self.remove(show_id)
+
+    def _changed(self, movie: MovieShowtimes):
+        movie.fragment = None
+        self.body = None
+        self.seats_body = None
+
+    def remaining_seats(self, show_id: int, hall_id: int) -> int:
+        return self.capacities.get(hall_id, 0) - self.reserved.get(show_id, 0)
+
+    def serialize(self, with_seats: bool) -> bytes:
+        fragments = []
+        for movie_id in sorted(self.movies):
+            movie = self.movies[movie_id]
+            if with_seats:
+                fragments.append(movie.serialize(self.remaining_seats))
+            else:
+                if movie.fragment is None:
+                    movie.fragment = movie.serialize()
+                fragments.append(movie.fragment)
+        return b"[" + b",".join(fragments) + b"]"
+
+
+class NowShowingIndex:
+    """
+    Per-region, in-memory index of the upcoming showtimes of every movie.
+
+    The index is loaded with one query on first use, then kept up to date
+    by the show endpoints of this worker adding and removing shows, and
+    rolled forward on every read as shows start. It is reloaded after `ttl`
+    seconds so that shows changed through other workers become visible.
+    The serialized homepage payload is kept between reads and rebuilt only
+    for the movies that changed.
+
+    Remaining seat counts are loaded for all upcoming shows at once, with
+    one query for the hall capacities and one for the reserved seats, and
+    refreshed after `seats_ttl` seconds.
+    """
+
+    def __init__(self, ttl: float, seats_ttl: float):
+        self.ttl = ttl
+        self.seats_ttl = seats_ttl
+        self._regions: Dict[str, RegionShowtimes] = {}
+        self._changes: Dict[str, int] = {}
+
+    @staticmethod
+    async def _load(db: AsyncSession, now: datetime) -> RegionShowtimes:
+        result = await db.execute(
+            select(
+                Show.id,
+                Show.movie_id,
+                Show.hall_id,
+                Show.start_time,
+                Movie.title,
+                Movie.poster_path,
+            )
+            .join(Movie)
+            .where(Show.start_time > now)
+        )
+        index = RegionShowtimes()
+        for show_id, movie_id, hall_id, start_time, title, poster_path in result.all():
+            if movie_id not in index.movies:
+                index.movies[movie_id] = MovieShowtimes(movie_id, title, poster_path)
+            index.movies[movie_id].shows.append((start_time, show_id, hall_id))
+            index.shows[show_id] = (movie_id, start_time, hall_id)
+            index.starts.append((start_time, show_id))
+        for movie in index.movies.values():
+            movie.shows.sort()
+        heapq.heapify(index.starts)
+        return index
+
+    @staticmethod
+    async def _load_movies(db: AsyncSession, index: RegionShowtimes):
+        result = await db.execute(
+            select(Movie.id, Movie.title, Movie.poster_path).where(
+                Movie.id.in_(index.unknown_movies)
+            )
+        )
+        for movie_id, title, poster_path in result.all():
+            movie = index.movies.get(movie_id)
+            if movie is not None:
+                movie.title, movie.poster_path = title, poster_path
+                index._changed(movie)
+        index.unknown_movies.clear()
+
+    @staticmethod
+    async def _load_seats(db: AsyncSession, index: RegionShowtimes, now: datetime):
+        capacities = await db.execute(
+            select(HallRow.hall_id, func.count(Seat.id))
+            .join(Seat, Seat.row_id == HallRow.id)
+            .group_by(HallRow.hall_id)
+        )
+        index.capacities = dict(capacities.all())
+        reserved = await db.execute(
+            select(ReservationSeat.show_id, func.count())
+            .join(Show, Show.id == ReservationSeat.show_id)
+            .where(Show.start_time > now)
+            .group_by(ReservationSeat.show_id)
+        )
+        index.reserved = dict(reserved.all())
+        index.seats_loaded_at = time.monotonic()
+        index.seats_body = None
+
+    async def get(
+        self, region: str, db: AsyncSession, with_seats: bool = False
+    ) -> bytes:
+        """
+        Returns the serialized list of movies with upcoming shows, by movie ID,
+        each with its shows in start order and optionally their remaining seats.
+        """
+        now = _now()
+        index = self._regions.get(region)
+        if index is None or time.monotonic() - index.loaded_at >= self.ttl:
+            changes = self._changes.get(region, 0)
+            index = await self._load(db, now)
+            # A load overlapping a show change may miss it; serve it without keeping it
+            if changes == self._changes.get(region, 0):
+                self._regions[region] = index
+
+        index.roll_forward(now)
+        if index.unknown_movies:
+            await self._load_movies(db, index)
+        if not with_seats:
+            if index.body is None:
+                index.body = index.serialize(False)
+            return index.body
+
+        if (
+            index.seats_loaded_at is None
+            or time.monotonic() - index.seats_loaded_at >= self.seats_ttl
+        ):
+            await self._load_seats(db, index, now)
+        if index.seats_body is None:
+            index.seats_body = index.serialize(True)
+        return index.seats_body
+
+    def add_shows(self, region: str, shows: Iterable[Tuple[int, int, int, datetime]]):
+        """
+        Records (show ID, movie ID, hall ID, start time) of added shows.
+        """
+        self._changes[region] = self._changes.get(region, 0) + 1
+        index = self._regions.get(region)
+        if index is None:
+            return
+        now = _now()
+        for show_id, movie_id, hall_id, start_time in shows:
+            if start_time > now:
+                index.add(show_id, movie_id, hall_id, start_time)
+
+    def remove_show(self, region: str, show_id: int):
+        """
+        Records a deleted show.
+        """
+        self._changes[region] = self._changes.get(region, 0) + 1
+        index = self._regions.get(region)
+        if index is not None:
+            index.remove(show_id)
+
+    def invalidate(self, region: str):
+        """
+        Drops the index of a region, to be reloaded on the next read.
+        """
+        self._changes[region] = self._changes.get(region, 0) + 1
+        self._regions.pop(region, None)
+
+
+now_showing = NowShowingIndex(
+    settings.NOW_SHOWING_TTL_SECONDS, settings.NOW_SHOWING_SEATS_TTL_SECONDS
+)
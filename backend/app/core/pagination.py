@@ -0,0 +1,146 @@
+import base64
+import json
+from datetime import date, datetime, timezone
+from typing import Any, Callable, List, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import literal, tuple_
+
+from .config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """
+    Query parameters of a keyset-paginated list endpoint.
+
+    Attributes:
+        limit (int): The maximum number of items to return.
+        cursor (str): Opaque position returned in the `X-Next-Cursor` header of
+            the previous page. Empty for the first page.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(
+            settings.PAGE_SIZE_DEFAULT,
+            ge=1,
+            le=settings.PAGE_SIZE_MAX,
+            description="Maximum number of items to return.",
+        ),
+        cursor: Optional[str] = Query(
+            None,
+            description="Cursor from the X-Next-Cursor header of the previous page.",
+        ),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def _to_json(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _from_json(value: Any, column):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encodes the sort key of the last item of a page as an opaque cursor.
+    """
+    raw = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    """
+    Decodes a cursor into values typed like the sort columns.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("Cursor does not match the sort key")
+        return [_from_json(value, column) for value, column in zip(values, columns)]
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def paginate(query, page: PageParams, *columns, descending: bool = True):
+    """
+    Orders a query by a unique sort key and restricts it to one page.
+
+    The sort key must end with a unique column (usually the primary key) so
+    the order is stable. One extra row is fetched to detect the next page.
+
+    Args:
+        query: The select statement.
+        page (PageParams): The requested page.
+        *columns: The sort key columns.
+        descending (bool): Whether to sort newest/largest first.
+
+    Returns:
+        The paginated select statement.
+    """
+    if page.cursor:
+        values = decode_cursor(page.cursor, columns)
+        key = tuple_(*columns)
+        bound = tuple_(
+            *[literal(value, column.type) for value, column in zip(values, columns)]
+        )
+        query = query.where(key < bound if descending else key > bound)
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order).limit(page.limit + 1)
+
+
+def page_items(
+    items: Sequence, page: PageParams, response: Response, key: Callable
+) -> List:
+    """
+    Trims the extra row fetched by `paginate` and sets the next cursor header.
+
+    Args:
+        items (list): The rows returned by the paginated query.
+        page (PageParams): The requested page.
+        response (Response): The response receiving the `X-Next-Cursor` header.
+        key (callable): Returns the sort key values of an item.
+
+    Returns:
+        list: The items of the current page.
+    """
+    items = list(items)
+    if len(items) > page.limit:
+        items = items[: page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(items[-1]))
+    return items
+
+
+def where_range(query, column, start=None, end=None):
+    """
+    Restricts a query to `start <= column < end`, skipping missing bounds.
+    Timezone-aware bounds are converted to naive UTC, as stored in the database.
+    """
+    start, end = (
+        bound.astimezone(timezone.utc).replace(tzinfo=None)
+        if isinstance(bound, datetime) and bound.tzinfo is not None
+        else bound
+        for bound in (start, end)
+    )
+    if start is not None:
+        query = query.where(column >= start)
+    if end is not None:
+        query = query.where(column < end)
+    return query
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from .config import settings
+
+
+class PasswordWorkerPool:
+    """
+    Bounded thread pool for password hashing and verification.
+
+    bcrypt releases the GIL while hashing, so running it on a few threads keeps
+    the event loop responsive while still using multiple cores. Jobs beyond
+    `max_workers` wait in the executor queue; its depth is tracked so bursts of
+    logins are visible in the metrics.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password"
+        )
+
+    def _call(self, func: Callable, *args):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def run(self, func: Callable, *args):
+        """
+        Runs `func(*args)` on the pool and waits for its result.
+        """
+        with self._lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._call, func, *args
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the queue depth, running and completed job counters.
+        """
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "max_queue_depth": self.max_queue_depth,
+            }
+
+
+password_pool = PasswordWorkerPool(settings.PASSWORD_HASH_WORKERS)
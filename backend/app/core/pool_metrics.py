@@ -0,0 +1,102 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Upper bounds (milliseconds) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    """
+    Checkout counters and wait time histogram of one connection pool.
+
+    The wait of a checkout is the time spent obtaining a connection from the
+    pool, including opening a new one when the pool grows into its overflow.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.buckets: List[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+
+    def observe(self, wait: float, timed_out: bool = False):
+        """
+        Records the wait (seconds) of one checkout.
+        """
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.buckets[bisect_left(WAIT_BUCKETS_MS, wait * 1000)] += 1
+
+    def snapshot(self) -> Dict:
+        """
+        Returns the counters, with the histogram as cumulative `le` buckets.
+        """
+        with self._lock:
+            histogram, total = {}, 0
+            for bound, count in zip(WAIT_BUCKETS_MS + ("+Inf",), self.buckets):
+                total += count
+                histogram[str(bound)] = total
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": self.total_wait * 1000 / attempts if attempts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+                "wait_histogram_ms": histogram,
+            }
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records checkout waits into `metrics`.
+
+    Use `timed_pool_class` to get a subclass bound to a `PoolMetrics`, so the
+    metrics survive the pool being recreated after `engine.dispose()`.
+    """
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.observe(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - start)
+        return connection
+
+
+def timed_pool_class(metrics: PoolMetrics) -> type:
+    """
+    Returns a `TimedQueuePool` subclass recording into `metrics`.
+    """
+    return type("TimedQueuePool", (TimedQueuePool,), {"metrics": metrics})
+
+
+def pool_status(engine, metrics: PoolMetrics) -> Dict:
+    """
+    Returns the current occupancy of an engine's pool together with its metrics.
+    """
+    pool = engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "timeout_seconds": pool.timeout(),
+        **metrics.snapshot(),
+    }
@@ -0,0 +1,69 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from schemas import UserGlobalModel
+from .config import settings
+
+
+class PrincipalCache:
+    """
+    In-memory cache of authenticated users, keyed by the token subject.
+
+    Entries expire after `ttl` seconds and the least recently used ones are
+    evicted beyond `max_entries`. The user endpoints invalidate entries they
+    change; other workers see such changes once their entry expires.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[UserGlobalModel, float]]" = OrderedDict()
+
+    def get(self, username: str) -> Optional[UserGlobalModel]:
+        """
+        Returns the cached user, or None if it is missing or expired.
+        """
+        entry = self._entries.get(username)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            self._entries.move_to_end(username)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        return None
+
+    def put(self, user: UserGlobalModel):
+        """
+        Caches a user loaded from the database.
+        """
+        self._entries[user.username] = (user, time.monotonic())
+        self._entries.move_to_end(user.username)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, username: str):
+        """
+        Drops a user, e.g. after it was updated or deleted.
+        """
+        self._entries.pop(username, None)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the hit/miss counters and the current size.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+        }
+
+
+principal_cache = PrincipalCache(
+    settings.PRINCIPAL_CACHE_MAX_ENTRIES, settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
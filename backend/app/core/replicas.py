@@ -0,0 +1,99 @@
+import time
+from collections import OrderedDict
+from itertools import count
+from typing import Dict, Iterator, List, Optional
+
+from fastapi import Request
+from jose import JWTError, jwt
+
+from .config import logger, settings
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def reader_key(request: Request) -> str:
+    """
+    Identifies the reader of a request: the token subject, or the client address.
+
+    The token is not verified, it only decides where a read is routed.
+    """
+    authorization = request.headers.get("Authorization", "")
+    if authorization.lower().startswith("bearer "):
+        try:
+            subject = jwt.get_unverified_claims(authorization[7:]).get("sub")
+            if subject:
+                return f"user:{subject}"
+        except JWTError:
+            pass
+    return f"client:{request.client.host if request.client else 'unknown'}"
+
+
+class ReplicaRouter:
+    """
+    Chooses the database serving a read-only request.
+
+    Reads are spread over a region's healthy replicas in round-robin order.
+    A replica that fails to connect is skipped for `retry_after` seconds.
+    Readers that wrote to the region within `read_after_write` seconds are
+    sent to the primary, so they see their own changes despite replica lag.
+    """
+
+    def __init__(self, read_after_write: float, retry_after: float, max_writers: int):
+        self.read_after_write = read_after_write
+        self.retry_after = retry_after
+        self.max_writers = max_writers
+        self._counters: Dict[str, Iterator[int]] = {}
+        self._down_until: Dict[str, float] = {}
+        self._writes: "OrderedDict[tuple, float]" = OrderedDict()
+
+    def record_write(self, region: str, key: str):
+        """Records that a reader wrote to the primary of a region."""
+        self._writes[(region, key)] = time.monotonic()
+        self._writes.move_to_end((region, key))
+        while len(self._writes) > self.max_writers:
+            self._writes.popitem(last=False)
+
+    def wrote_recently(self, region: str, key: str) -> bool:
+        """Tells whether a reader wrote to the primary of a region within `read_after_write` seconds."""
+        written_at = self._writes.get((region, key))
+        return (
+            written_at is not None
+            and time.monotonic() - written_at < self.read_after_write
+        )
+
+    def candidates(self, region: str, key: str, replicas: List[str]) -> List[str]:
+        """
+        Returns the healthy replicas to try in order, starting at the next
+        round-robin position, or an empty list if the primary must be used.
+        """
+        if not replicas or self.wrote_recently(region, key):
+            return []
+        now = time.monotonic()
+        healthy = [name for name in replicas if self._down_until.get(name, 0) <= now]
+        if not healthy:
+            return []
+        start = next(self._counters.setdefault(region, count())) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def mark_down(self, name: str, error: Optional[Exception] = None):
+        """Skips a replica for `retry_after` seconds."""
+        self._down_until[name] = time.monotonic() + self.retry_after
+        logger.warning(f"Read replica {name} unavailable, skipping it: {error}")
+
+    def status(self, replicas: List[str]) -> Dict[str, Dict]:
+        """Returns the health of the given replicas."""
+        now = time.monotonic()
+        return {
+            name: {
+                "healthy": self._down_until.get(name, 0) <= now,
+                "retry_in_seconds": max(self._down_until.get(name, 0) - now, 0),
+            }
+            for name in replicas
+        }
+
+
+replica_router = ReplicaRouter(
+    settings.READ_AFTER_WRITE_SECONDS,
+    settings.REPLICA_RETRY_SECONDS,
+    settings.READ_AFTER_WRITE_MAX_READERS,
+)
@@ -1,35 +1,53 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from sqlalchemy.future import select  # Import select for SQLAlchemy 2.0
+import time
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import delete  # add this import
-from datetime import datetime, timedelta
-from models_local import Reservation, ReservationSeat
-from .config import logger
+from .config import logger, settings
+from .seat_holds import delete_expired_holds
+from .seat_occupancy import occupancy_cache
 
 
-async def delete_unpaid_reservations(db: AsyncSession):
-    try:
-        timeout = datetime.now(tz=None) - timedelta(minutes=15)
-        stmt = select(Reservation).where(
-            Reservation.status != "paid", Reservation.created_at < timeout
-        )
-        result = await db.execute(stmt)
-        unpaid_reservations = result.scalars().all()
-        count = len(unpaid_reservations)
+async def delete_unpaid_reservations(db: AsyncSession, region: str):
+    """
+    Backstop sweep for expired holds the hold queue did not release,
+    e.g. holds placed by another worker process.
+
+    Holds are deleted in batches of RESERVATION_SWEEP_BATCH_SIZE, each in its
+    own short transaction, so row locks never outlive a single batch.
 
-        for reservation in unpaid_reservations:
-            # Delete associated ReservationSeat entries
-            await db.execute(
-                delete(ReservationSeat).where(
-                    ReservationSeat.reservation_id == reservation.id
-                )
+    Returns:
+        list[dict]: Per-batch reservation and seat counts with timings.
+    """
+    batches = []
+    try:
+        while True:
+            started = time.perf_counter()
+            reservation_ids, released_seats = await delete_expired_holds(
+                db, limit=settings.RESERVATION_SWEEP_BATCH_SIZE
             )
-            await db.delete(reservation)
+            await db.commit()
+            if not reservation_ids:
+                break
 
-        await db.commit()
-        logger.info(
-            f"[{datetime.now(tz=None)}] Deleted {count} unpaid reservations.")
+            occupancy_cache.release_rows(region, released_seats)
+            batch = {
+                "reservations": len(reservation_ids),
+                "seats": len(released_seats),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+            batches.append(batch)
+            logger.info(
+                f"Deleted {batch['reservations']} unpaid reservations "
+                f"({batch['seats']} seats) in {region} in {batch['duration_ms']} ms."
+            )
+            if len(reservation_ids) < settings.RESERVATION_SWEEP_BATCH_SIZE:
+                break
     except Exception as e:
         logger.error(f"Error deleting unpaid reservations: {e}")
     finally:
         await db.close()  # Properly await the close method
+
+    logger.info(
+        f"Deleted {sum(b['reservations'] for b in batches)} unpaid reservations "
+        f"in {region} in {len(batches)} batches."
+    )
+    return batches
@@ -0,0 +1,83 @@
+from typing import List, Tuple
+
+from sqlalchemy import literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models_local import HallRow, ReservationSeat, Seat, Show
+
+
+async def claim_seats(
+    reservation_id: int, show_id: int, seat_ids: List[int], db: AsyncSession
+) -> List[int]:
+    """
+    Claims seats of a show for a reservation in a single statement.
+
+    Only seats that belong to the show's hall are inserted. Rows already taken
+    for the show are skipped through the (show_id, seat_id) unique constraint,
+    so concurrent bookings only wait on each other when they compete for the
+    same seat of the same show. Seats are inserted in ID order to keep lock
+    acquisition consistent between overlapping requests.
+
+    Args:
+        reservation_id (int): The ID of the reservation claiming the seats.
+        show_id (int): The ID of the show.
+        seat_ids (list[int]): The IDs of the requested seats.
+        db (AsyncSession): The database session. The caller commits or rolls back.
+
+    Returns:
+        list[int]: The requested seat IDs that could not be claimed, sorted.
+        An empty list means every seat was claimed.
+    """
+    requested = sorted(set(seat_ids))
+    if not requested:
+        return []
+
+    seats_in_hall = (
+        select(
+            literal(show_id).label("show_id"),
+            Seat.id.label("seat_id"),
+            literal(reservation_id).label("reservation_id"),
+        )
+        .join(HallRow, Seat.row_id == HallRow.id)
+        .join(Show, Show.hall_id == HallRow.hall_id)
+        .where(Show.id == show_id, Seat.id.in_(requested))
+        .order_by(Seat.id)
+    )
+    stmt = (
+        insert(ReservationSeat)
+        .from_select(["show_id", "seat_id", "reservation_id"], seats_in_hall)
+        .on_conflict_do_nothing(index_elements=["show_id", "seat_id"])
+        .returning(ReservationSeat.seat_id)
+    )
+    result = await db.execute(stmt)
+    claimed = set(result.scalars().all())
+    return [seat_id for seat_id in requested if seat_id not in claimed]
+
+
+async def classify_unclaimed_seats(
+    show_id: int, seat_ids: List[int], db: AsyncSession
+) -> Tuple[List[int], List[int]]:
+    """
+    Splits seats that could not be claimed into reserved and invalid ones.
+
+    Args:
+        show_id (int): The ID of the show.
+        seat_ids (list[int]): The seat IDs returned by `claim_seats`.
+        db (AsyncSession): The database session.
+
+    Returns:
+        tuple[list[int], list[int]]: Seat IDs already reserved for the show,
+        and seat IDs that do not exist in the show's hall.
+    """
+    result = await db.execute(
+        select(ReservationSeat.seat_id).where(
+            ReservationSeat.show_id == show_id,
+            ReservationSeat.seat_id.in_(seat_ids),
+        )
+    )
+    reserved = set(result.scalars().all())
+    return (
+        [seat_id for seat_id in seat_ids if seat_id in reserved],
+        [seat_id for seat_id in seat_ids if seat_id not in reserved],
+    )
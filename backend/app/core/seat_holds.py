@@ -0,0 +1,215 @@
+import asyncio
+import heapq
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models_local import Reservation, ReservationSeat
+from .config import logger, settings
+from .database import sessions
+from .seat_occupancy import occupancy_cache
+
+HOLD_DURATION = timedelta(minutes=settings.RESERVATION_HOLD_MINUTES)
+
+
+def utc_now() -> datetime:
+    """Returns the current UTC time as a naive datetime, as stored in the database."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def hold_deadline() -> datetime:
+    """Returns the expiry time of a hold placed now."""
+    return utc_now() + HOLD_DURATION
+
+
+async def delete_expired_holds(
+    db: AsyncSession, *criteria, limit: Optional[int] = None
+) -> Tuple[List[int], List[Tuple[int, int]]]:
+    """
+    Deletes unpaid reservations whose hold has expired, together with their seats.
+
+    Expired holds are found through the partial index on `expires_at`, which
+    only covers unpaid reservations, oldest first. Rows locked by a
+    concurrent payment are skipped. The caller commits.
+
+    Args:
+        db (AsyncSession): The database session.
+        *criteria: Extra conditions narrowing down the reservations to delete.
+        limit (int, optional): Maximum number of reservations to delete.
+
+    Returns:
+        tuple[list[int], list[tuple[int, int]]]: The deleted reservation IDs and
+        the (show_id, seat_id) pairs that were released.
+    """
+    result = await db.execute(
+        select(Reservation.id)
+        .where(
+            Reservation.status != "paid",
+            Reservation.expires_at <= utc_now(),
+            *criteria,
+        )
+        .order_by(Reservation.expires_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    reservation_ids = result.scalars().all()
+    if not reservation_ids:
+        return [], []
+
+    released = await db.execute(
+        delete(ReservationSeat)
+        .where(ReservationSeat.reservation_id.in_(reservation_ids))
+        .returning(ReservationSeat.show_id, ReservationSeat.seat_id)
+    )
+    released_seats = released.all()
+    await db.execute(delete(Reservation).where(Reservation.id.in_(reservation_ids)))
+    return reservation_ids, released_seats
+
+
+async def release_expired_seat_holds(
+    show_id: int, seat_ids: List[int], db: AsyncSession
+) -> List[Tuple[int, int]]:
+    """
+    Releases expired holds on specific seats of a show within the caller's transaction.
+    """
+    holding = (
+        select(ReservationSeat.reservation_id)
+        .where(
+            ReservationSeat.show_id == show_id,
+            ReservationSeat.seat_id.in_(seat_ids),
+        )
+        .scalar_subquery()
+    )
+    _, released_seats = await delete_expired_holds(db, Reservation.id.in_(holding))
+    return released_seats
+
+
+async def confirm_hold(reservation_id: int, db: AsyncSession) -> bool:
+    """
+    Converts a hold into a paid reservation if it has not expired yet.
+
+    The check and the status change are a single conditional UPDATE, so a
+    payment cannot race with the release of the same hold. The caller commits.
+
+    Returns:
+        bool: True if the hold was converted, False if it expired or is already paid.
+    """
+    result = await db.execute(
+        update(Reservation)
+        .where(
+            Reservation.id == reservation_id,
+            Reservation.status != "paid",
+            or_(Reservation.expires_at.is_(None), Reservation.expires_at > utc_now()),
+        )
+        .values(status="paid", expires_at=None)
+        .returning(Reservation.id)
+    )
+    return result.scalar() is not None
+
+
+class HoldQueue:
+    """
+    Deadline-ordered queue of seat holds.
+
+    A background task sleeps until the earliest deadline and releases every
+    hold that is due, so seats become free as soon as their hold expires.
+    Cancelled holds are dropped lazily when they reach the top of the heap.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, str, int]] = []
+        self._deadlines: Dict[Tuple[str, int], datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def schedule(self, region: str, reservation_id: int, expires_at: datetime):
+        """
+        Schedules the release of a hold at `expires_at`.
+        """
+        self._deadlines[(region, reservation_id)] = expires_at
+        heapq.heappush(self._heap, (expires_at, region, reservation_id))
+        if self._heap[0][0] == expires_at:
+            self._wakeup.set()
+
+    def cancel(self, region: str, reservation_id: int):
+        """
+        Cancels a scheduled release, e.g. after the hold was paid.
+        """
+        self._deadlines.pop((region, reservation_id), None)
+
+    async def load(self, region: str):
+        """
+        Schedules every pending hold of a region, used at startup.
+        """
+        async with sessions[region]() as db:
+            result = await db.execute(
+                select(Reservation.id, Reservation.expires_at).where(
+                    Reservation.expires_at.is_not(None),
+                    Reservation.status != "paid",
+                )
+            )
+            for reservation_id, expires_at in result.all():
+                self.schedule(region, reservation_id, expires_at)
+
+    def _pop_due(self, now: datetime) -> Dict[str, List[int]]:
+        due: Dict[str, List[int]] = {}
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, region, reservation_id = heapq.heappop(self._heap)
+            if self._deadlines.get((region, reservation_id)) != expires_at:
+                continue  # Cancelled or rescheduled
+            del self._deadlines[(region, reservation_id)]
+            due.setdefault(region, []).append(reservation_id)
+        return due
+
+    async def _release(self, region: str, reservation_ids: List[int]):
+        async with sessions[region]() as db:
+            _, released_seats = await delete_expired_holds(
+                db, Reservation.id.in_(reservation_ids)
+            )
+            await db.commit()
+        occupancy_cache.release_rows(region, released_seats)
+        logger.info(
+            f"Released {len(reservation_ids)} expired holds in {region} "
+            f"({len(released_seats)} seats)."
+        )
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = utc_now()
+            for region, reservation_ids in self._pop_due(now).items():
+                try:
+                    await self._release(region, reservation_ids)
+                except Exception as e:
+                    logger.error(f"Error releasing expired holds in {region}: {e}")
+
+            timeout = (
+                (self._heap[0][0] - utc_now()).total_seconds() if self._heap else None
+            )
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """Starts the background release task on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stops the background release task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+hold_queue = HoldQueue()
@@ -0,0 +1,229 @@
+import asyncio
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models_local import HallRow, ReservationSeat, Seat, Show
+from .config import settings
+
+
+class ShowOccupancy:
+    """
+    Occupancy bitmap of a single show.
+
+    Seats are indexed by their position in the hall, i.e. by the rank of the
+    seat ID among all seat IDs of the hall. Bit `i` is set when the seat at
+    position `i` is reserved.
+
+    Attributes:
+        seat_ids (array): Sorted IDs of all seats in the show's hall.
+        bits (bytearray): The occupancy bitmap.
+        loaded_at (float): Monotonic time at which the entry was loaded.
+    """
+
+    __slots__ = ("seat_ids", "bits", "loaded_at")
+
+    def __init__(self, seat_ids: Iterable[int], reserved_seat_ids: Iterable[int]):
+        self.seat_ids = array("q", sorted(seat_ids))
+        self.bits = bytearray((len(self.seat_ids) + 7) // 8)
+        self.loaded_at = time.monotonic()
+        self.update(reserved_seat_ids, True)
+
+    def _position(self, seat_id: int) -> Optional[int]:
+        index = bisect_left(self.seat_ids, seat_id)
+        if index < len(self.seat_ids) and self.seat_ids[index] == seat_id:
+            return index
+        return None
+
+    def update(self, seat_ids: Iterable[int], reserved: bool):
+        """
+        Marks seats as reserved or free. Seats outside the hall are ignored.
+        """
+        for seat_id in seat_ids:
+            index = self._position(seat_id)
+            if index is None:
+                continue
+            if reserved:
+                self.bits[index >> 3] |= 1 << (index & 7)
+            else:
+                self.bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    def reserved_seat_ids(self) -> List[int]:
+        """
+        Returns the IDs of all reserved seats in ascending order.
+        """
+        reserved = []
+        for byte_index, byte in enumerate(self.bits):
+            while byte:
+                low_bit = byte & -byte
+                reserved.append(
+                    self.seat_ids[(byte_index << 3) + low_bit.bit_length() - 1]
+                )
+                byte ^= low_bit
+        return reserved
+
+    @property
+    def version(self) -> str:
+        """
+        A checksum of the bitmap, equal for equal occupancy on every worker.
+        """
+        return f"{zlib.crc32(self.bits):08x}"
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Approximate memory used by the entry.
+        """
+        return (
+            self.seat_ids.itemsize * len(self.seat_ids) + len(self.bits) + 200
+        )
+
+
+class LoadAbandoned(Exception):
+    """
+    The request loading an occupancy was cancelled; the requests waiting for
+    it load the occupancy themselves.
+    """
+
+
+class OccupancyCache:
+    """
+    Per-region, in-memory cache of show occupancy bitmaps.
+
+    Entries are loaded lazily on first read, updated in place by the code
+    paths that reserve or release seats and evicted in least recently used
+    order once a region exceeds `max_bytes`. Entries older than `ttl` seconds
+    are reloaded so that changes made by other workers become visible.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: Dict[str, "OrderedDict[int, ShowOccupancy]"] = {}
+        self._sizes: Dict[str, int] = {}
+        self._loading: Dict[Tuple[str, int], asyncio.Future] = {}
+        self._stale_loads: set = set()
+
+    def _region(self, region: str) -> "OrderedDict[int, ShowOccupancy]":
+        return self._entries.setdefault(region, OrderedDict())
+
+    def _store(self, region: str, show_id: int, entry: ShowOccupancy):
+        entries = self._region(region)
+        self._discard(region, show_id)
+        entries[show_id] = entry
+        self._sizes[region] = self._sizes.get(region, 0) + entry.nbytes
+        while self._sizes[region] > self.max_bytes and len(entries) > 1:
+            evicted_id = next(iter(entries))
+            self._discard(region, evicted_id)
+
+    def _discard(self, region: str, show_id: int):
+        entry = self._region(region).pop(show_id, None)
+        if entry is not None:
+            self._sizes[region] -= entry.nbytes
+
+    async def _load(self, show_id: int, db: AsyncSession) -> ShowOccupancy:
+        seats = await db.execute(
+            select(Seat.id)
+            .join(HallRow, Seat.row_id == HallRow.id)
+            .join(Show, Show.hall_id == HallRow.hall_id)
+            .where(Show.id == show_id)
+        )
+        reserved = await db.execute(
+            select(ReservationSeat.seat_id).where(ReservationSeat.show_id == show_id)
+        )
+        return ShowOccupancy(seats.scalars().all(), reserved.scalars().all())
+
+    async def get(self, region: str, show_id: int, db: AsyncSession) -> ShowOccupancy:
+        """
+        Returns the occupancy of a show, loading it from the database if needed.
+
+        Concurrent loads of the same show share a single query. A load that
+        overlapped with a seat change is returned but not cached. If the
+        request running the shared load is cancelled, the waiting requests
+        start a new one.
+        """
+        entries = self._region(region)
+        entry = entries.get(show_id)
+        if entry is not None and time.monotonic() - entry.loaded_at < self.ttl:
+            entries.move_to_end(show_id)
+            return entry
+
+        key = (region, show_id)
+        pending = self._loading.get(key)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except LoadAbandoned:
+                return await self.get(region, show_id, db)
+
+        pending = asyncio.get_running_loop().create_future()
+        self._loading[key] = pending
+        try:
+            entry = await self._load(show_id, db)
+        except BaseException as e:
+            # Cancellation must not leave the waiters hanging on `pending`
+            pending.set_exception(e if isinstance(e, Exception) else LoadAbandoned())
+            pending.exception()  # Mark as retrieved when nobody is waiting
+            raise
+        finally:
+            self._loading.pop(key, None)
+            stale = key in self._stale_loads
+            self._stale_loads.discard(key)
+
+        if not stale and entry.seat_ids:
+            self._store(region, show_id, entry)
+        pending.set_result(entry)
+        return entry
+
+    def _apply(self, region: str, show_id: int, seat_ids: Iterable[int], reserved: bool):
+        if (region, show_id) in self._loading:
+            self._stale_loads.add((region, show_id))
+        entry = self._region(region).get(show_id)
+        if entry is not None:
+            entry.update(seat_ids, reserved)
+
+    def mark_reserved(self, region: str, show_id: int, seat_ids: Iterable[int]):
+        """
+        Records seats of a show as reserved.
+        """
+        self._apply(region, show_id, seat_ids, True)
+
+    def mark_released(self, region: str, show_id: int, seat_ids: Iterable[int]):
+        """
+        Records seats of a show as free again.
+        """
+        self._apply(region, show_id, seat_ids, False)
+
+    def release_rows(self, region: str, rows: Iterable[Tuple[int, int]]):
+        """
+        Records (show_id, seat_id) pairs returned by a delete as free again.
+        """
+        by_show: Dict[int, List[int]] = {}
+        for show_id, seat_id in rows:
+            by_show.setdefault(show_id, []).append(seat_id)
+        for show_id, seat_ids in by_show.items():
+            self.mark_released(region, show_id, seat_ids)
+
+    def invalidate(self, region: str, show_id: Optional[int] = None):
+        """
+        Drops a single show, or every show of a region when `show_id` is None.
+        """
+        if show_id is not None:
+            keys = [(region, show_id)]
+            self._discard(region, show_id)
+        else:
+            keys = [key for key in self._loading if key[0] == region]
+            self._entries.pop(region, None)
+            self._sizes.pop(region, None)
+        self._stale_loads.update(key for key in keys if key in self._loading)
+
+
+occupancy_cache = OccupancyCache(
+    settings.OCCUPANCY_CACHE_MAX_BYTES, settings.OCCUPANCY_CACHE_TTL_SECONDS
+)
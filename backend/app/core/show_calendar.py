@@ -0,0 +1,139 @@
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models_local import Movie, Show
+from schemas import CalendarDay, CalendarShow, ShowCalendar
+from .config import settings
+
+CalendarKey = Tuple[date, date, Optional[Tuple[int, ...]]]
+
+
+class CalendarEntry:
+    """
+    Pre-serialized show calendar of a date range.
+
+    Attributes:
+        body (bytes): The JSON calendar.
+        version (str): Content hash of `body`, identical on every worker.
+        loaded_at (float): Monotonic time at which the calendar was built.
+    """
+
+    __slots__ = ("body", "version", "loaded_at")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.version = hashlib.sha1(body).hexdigest()[:16]
+        self.loaded_at = time.monotonic()
+
+
+class ShowCalendarCache:
+    """
+    Per-region cache of show calendars, keyed by date range and halls.
+
+    A calendar is built with one query over the (hall_id, start_time) or
+    (start_time, id) index and kept until a show endpoint of this worker
+    invalidates the region, or for at most `ttl` seconds so that changes
+    made through other workers show up. At most `max_entries` calendars are
+    kept per region, the least recently used are dropped first.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, "OrderedDict[CalendarKey, CalendarEntry]"] = {}
+        self._generations: Dict[str, int] = {}
+
+    @staticmethod
+    async def _build(
+        db: AsyncSession,
+        start_date: date,
+        end_date: date,
+        hall_ids: Optional[Tuple[int, ...]],
+    ) -> CalendarEntry:
+        start = datetime.combine(start_date, datetime.min.time())
+        end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        query = (
+            select(
+                Show.id,
+                Show.hall_id,
+                Show.movie_id,
+                Movie.title,
+                Show.start_time,
+                Show.end_time,
+            )
+            .join(Movie)
+            .where(Show.start_time >= start, Show.start_time < end)
+            .order_by(Show.start_time, Show.id)
+        )
+        if hall_ids is not None:
+            query = query.where(Show.hall_id.in_(hall_ids))
+        result = await db.execute(query)
+
+        days = {
+            start_date + timedelta(days=offset): []
+            for offset in range((end_date - start_date).days + 1)
+        }
+        for show_id, hall_id, movie_id, title, start_time, end_time in result.all():
+            days[start_time.date()].append(
+                CalendarShow(
+                    id=show_id,
+                    hall_id=hall_id,
+                    movie_id=movie_id,
+                    movie_title=title,
+                    start_time=start_time,
+                    end_time=end_time,
+                )
+            )
+        calendar = ShowCalendar(
+            start_date=start_date,
+            end_date=end_date,
+            hall_ids=list(hall_ids) if hall_ids is not None else None,
+            days=[CalendarDay(day=day, shows=shows) for day, shows in days.items()],
+        )
+        return CalendarEntry(calendar.model_dump_json().encode())
+
+    async def get(
+        self,
+        region: str,
+        start_date: date,
+        end_date: date,
+        hall_ids: Optional[Sequence[int]],
+        db: AsyncSession,
+    ) -> CalendarEntry:
+        """
+        Returns the calendar of the given halls, all halls if None, from `start_date` to `end_date`.
+        """
+        key = (start_date, end_date, tuple(sorted(set(hall_ids))) if hall_ids else None)
+        entries = self._entries.setdefault(region, OrderedDict())
+        entry = entries.get(key)
+        if entry is not None and time.monotonic() - entry.loaded_at < self.ttl:
+            entries.move_to_end(key)
+            return entry
+
+        generation = self._generations.get(region, 0)
+        entry = await self._build(db, *key)
+        # Skip caching if the region was invalidated while building
+        if generation == self._generations.get(region, 0):
+            entries[key] = entry
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, region: str):
+        """
+        Drops every calendar of a region.
+        """
+        self._generations[region] = self._generations.get(region, 0) + 1
+        self._entries.pop(region, None)
+
+
+show_calendar_cache = ShowCalendarCache(
+    settings.CALENDAR_CACHE_TTL_SECONDS, settings.CALENDAR_CACHE_MAX_ENTRIES
+)
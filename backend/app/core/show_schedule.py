@@ -0,0 +1,287 @@
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models_local import Hall, Movie, Show
+from .config import settings
+
+# Time needed to clean a hall after a show, before the next one may start
+CLEANING_GAP = timedelta(minutes=settings.SHOW_CLEANING_MINUTES)
+
+# Longest time a hall can be blocked by one show, bounding conflict lookups
+MAX_SHOW_SPAN = timedelta(hours=settings.SHOW_MAX_SPAN_HOURS)
+
+# Constraint rejecting overlapping shows in a hall, see `Show`
+SHOW_OVERLAP_CONSTRAINT = "ex_shows_hall_overlap"
+
+
+def show_end_time(start_time: datetime, runtime: Optional[int]) -> datetime:
+    """Returns the time the hall is free again after a show: its end plus the cleaning gap."""
+    return start_time + timedelta(minutes=runtime or 0) + CLEANING_GAP
+
+
+def exceeds_max_span(start_time: datetime, end_time: datetime) -> bool:
+    """
+    Tells whether a show would block its hall for longer than `MAX_SHOW_SPAN`.
+
+    Conflict lookups only look back `MAX_SHOW_SPAN` from a period, so such a
+    show could not be found by them and must not be scheduled.
+    """
+    return end_time - start_time > MAX_SHOW_SPAN
+
+
+def is_overlap_violation(error: IntegrityError) -> bool:
+    """Tells whether an insert failed because it overlaps another show in the hall."""
+    return SHOW_OVERLAP_CONSTRAINT in str(error.orig)
+
+
+async def find_conflicts(
+    db: AsyncSession,
+    hall_id: int,
+    start_time: datetime,
+    end_time: datetime,
+    exclude_show_id: Optional[int] = None,
+) -> List[dict]:
+    """
+    Returns the shows of a hall overlapping the period from `start_time` to `end_time`.
+
+    Only shows starting less than `MAX_SHOW_SPAN` before the period can
+    overlap it, so the lookup is a bounded range scan of the
+    (hall_id, start_time) index whatever the size of the hall's history.
+
+    Returns:
+        list[dict]: The show ID, movie title, start time and end time
+        (including the cleaning gap) of each conflicting show.
+    """
+    query = (
+        select(Show.id, Show.start_time, Show.end_time, Movie.title)
+        .join(Movie)
+        .where(
+            Show.hall_id == hall_id,
+            Show.start_time >= start_time - MAX_SHOW_SPAN,
+            Show.start_time < end_time,
+            Show.end_time > start_time,
+        )
+        .order_by(Show.start_time)
+    )
+    if exclude_show_id is not None:
+        query = query.where(Show.id != exclude_show_id)
+    result = await db.execute(query)
+    return [
+        {
+            "show_id": show_id,
+            "movie_title": title,
+            "start_time": show_start,
+            "end_time": show_end,
+        }
+        for show_id, show_start, show_end, title in result.all()
+    ]
+
+
+def recurrence_starts(
+    start_date: date,
+    end_date: date,
+    times: Sequence[time],
+    weekdays: Optional[Sequence[int]] = None,
+) -> List[datetime]:
+    """
+    Returns the start times of a recurring show, in order.
+
+    Args:
+        start_date (date): The first day, inclusive.
+        end_date (date): The last day, inclusive.
+        times (list[time]): The start times on each day.
+        weekdays (list[int], optional): The days of the week (0 is Monday) the
+            show runs on, every day if omitted.
+    """
+    starts = []
+    day = start_date
+    while day <= end_date:
+        if weekdays is None or day.weekday() in weekdays:
+            starts.extend(datetime.combine(day, t) for t in sorted(times))
+        day += timedelta(days=1)
+    return starts
+
+
+def recurrence_count(
+    start_date: date,
+    end_date: date,
+    times: Sequence[time],
+    weekdays: Optional[Sequence[int]] = None,
+) -> int:
+    """
+    Returns the number of start times `recurrence_starts` yields for the same
+    arguments, without expanding them.
+    """
+    days = (end_date - start_date).days + 1
+    if days < 1:
+        return 0
+    if weekdays is None:
+        return days * len(times)
+    weekdays = set(weekdays)
+    weeks, rest = divmod(days, 7)
+    first = start_date.weekday()
+    matching = weeks * len(weekdays) + sum(
+        1 for offset in range(rest) if (first + offset) % 7 in weekdays
+    )
+    return matching * len(times)
+
+
+def sweep_conflicts(
+    candidates: Sequence[Tuple[int, datetime, datetime]],
+    existing: Sequence[Tuple[int, datetime, datetime]],
+) -> Dict[int, List[dict]]:
+    """
+    Resolves the candidate shows of one hall against each other and the existing shows.
+
+    Candidates are swept in start order, so of two overlapping candidates the
+    one starting earlier wins; request order only breaks ties between equal
+    starts. A candidate is accepted unless it overlaps an existing show or a
+    candidate accepted before it. Existing shows never overlap each other, so
+    sorted by start they are also sorted by end, and the shows overlapping a
+    candidate are found by bisection.
+
+    Args:
+        candidates: (item index, start, end) of each requested show.
+        existing: (show ID, start, end) of the hall's shows around the candidates.
+
+    Returns:
+        dict[int, list[dict]]: The conflicts of each rejected item, as
+        {"show_id": ...} for existing shows and {"item": ...} for other items.
+    """
+    existing = sorted(existing, key=lambda show: show[1])
+    existing_starts = [start for _, start, _ in existing]
+    rejected: Dict[int, List[dict]] = {}
+    last_accepted: Optional[Tuple[int, datetime]] = None
+
+    for index, start, end in sorted(candidates, key=lambda c: (c[1], c[0])):
+        conflicts = []
+        position = bisect_left(existing_starts, end) - 1
+        while position >= 0 and existing[position][2] > start:
+            conflicts.append({"show_id": existing[position][0]})
+            position -= 1
+        if last_accepted is not None and last_accepted[1] > start:
+            conflicts.append({"item": last_accepted[0]})
+        if conflicts:
+            rejected[index] = conflicts[::-1]
+        else:
+            last_accepted = (index, end)
+    return rejected
+
+
+async def resolve_schedule(db: AsyncSession, shows: Sequence) -> List[dict]:
+    """
+    Validates requested shows against each other and the existing shows with a fixed number of queries.
+
+    The runtimes of all movies are read with one query, the halls with
+    another, and so are the existing shows of every hall within the requested period (widened by
+    `MAX_SHOW_SPAN`). Conflicts are then resolved per hall with `sweep_conflicts`.
+
+    Args:
+        db (AsyncSession): The database session.
+        shows: Objects with movie_id, hall_id, start_time and price.
+
+    Returns:
+        list[dict]: Per show, in request order: its item index, fields and
+        end time, and a status of "accepted", "conflict" or "failed" with the
+        conflicts or the failure detail.
+    """
+    result = await db.execute(
+        select(Movie.id, Movie.runtime).where(
+            Movie.id.in_({show.movie_id for show in shows})
+        )
+    )
+    runtimes = dict(result.all())
+    result = await db.execute(
+        select(Hall.id).where(Hall.id.in_({show.hall_id for show in shows}))
+    )
+    hall_ids = set(result.scalars().all())
+
+    outcomes = []
+    halls: Dict[int, List[Tuple[int, datetime, datetime]]] = defaultdict(list)
+    for index, show in enumerate(shows):
+        outcome = {
+            "item": index,
+            "movie_id": show.movie_id,
+            "hall_id": show.hall_id,
+            "start_time": show.start_time,
+            "price": show.price,
+            "end_time": None,
+            "status": "accepted",
+            "show_id": None,
+            "conflicts": [],
+            "detail": None,
+        }
+        if show.movie_id not in runtimes:
+            outcome.update(status="failed", detail="Movie not found")
+        elif show.hall_id not in hall_ids:
+            outcome.update(status="failed", detail="Hall not found")
+        else:
+            outcome["end_time"] = show_end_time(
+                show.start_time, runtimes[show.movie_id]
+            )
+            if exceeds_max_span(show.start_time, outcome["end_time"]):
+                outcome.update(
+                    status="failed",
+                    detail=f"The movie and cleaning take longer than {settings.SHOW_MAX_SPAN_HOURS} hours",
+                )
+            else:
+                halls[show.hall_id].append(
+                    (index, show.start_time, outcome["end_time"])
+                )
+        outcomes.append(outcome)
+    if not halls:
+        return outcomes
+
+    windows = [
+        and_(
+            Show.hall_id == hall_id,
+            Show.start_time >= min(c[1] for c in candidates) - MAX_SHOW_SPAN,
+            Show.start_time < max(c[2] for c in candidates),
+        )
+        for hall_id, candidates in halls.items()
+    ]
+    result = await db.execute(
+        select(Show.hall_id, Show.id, Show.start_time, Show.end_time).where(
+            or_(*windows)
+        )
+    )
+    existing: Dict[int, List[Tuple[int, datetime, datetime]]] = defaultdict(list)
+    for hall_id, show_id, start, end in result.all():
+        existing[hall_id].append((show_id, start, end))
+
+    for hall_id, candidates in halls.items():
+        for index, conflicts in sweep_conflicts(
+            candidates, existing[hall_id]
+        ).items():
+            outcomes[index].update(status="conflict", conflicts=conflicts)
+    return outcomes
+
+
+async def insert_accepted_shows(db: AsyncSession, outcomes: Iterable[dict]):
+    """
+    Inserts the accepted shows with one statement and marks them as added. The caller commits.
+    """
+    accepted = [outcome for outcome in outcomes if outcome["status"] == "accepted"]
+    if not accepted:
+        return
+    result = await db.execute(
+        insert(Show).returning(Show.id, sort_by_parameter_order=True),
+        [
+            {
+                "movie_id": outcome["movie_id"],
+                "hall_id": outcome["hall_id"],
+                "start_time": outcome["start_time"],
+                "end_time": outcome["end_time"],
+                "price": outcome["price"],
+            }
+            for outcome in accepted
+        ],
+    )
+    for outcome, show_id in zip(accepted, result.scalars().all()):
+        outcome.update(status="added", show_id=show_id)
@@ -0,0 +1,209 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from .config import logger, settings
+from .replicas import reader_key, replica_router
+
+FlightKey = Tuple[str, str, tuple]
+
+
+class FlightResult:
+    """
+    Serialized result of a read, shared by the requests it was fetched for.
+
+    Attributes:
+        body (bytes): The JSON response body.
+        headers (dict): Response headers, e.g. the next page cursor.
+        fetched_at (float): Monotonic time at which the fetch completed.
+    """
+
+    __slots__ = ("body", "headers", "fetched_at")
+
+    def __init__(self, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.body = body
+        self.headers = headers or {}
+        self.fetched_at = time.monotonic()
+
+
+Fetch = Callable[[], Awaitable[FlightResult]]
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent reads into one database query.
+
+    Requests are keyed by route, region and normalized parameters. The first
+    request of a key starts the fetch, the others arriving while it runs
+    wait for it and share its serialized result. The fetch runs as its own
+    task, so it completes for the waiters even if the request that started
+    it is cancelled.
+
+    A route may be given a stale-while-revalidate window: its last result is
+    then kept and served immediately. For `fresh_seconds` after it was
+    fetched it is served as is; for the window's seconds after that it is
+    served while a single fetch refreshes it in the background. Without a
+    window nothing is kept once the fetch completes.
+
+    Readers that wrote to the region recently bypass coalescing, so they are
+    routed to the primary and read their own writes. Writes to a region
+    invalidate its kept results and detach its running fetches.
+    """
+
+    def __init__(
+        self, fresh_seconds: float, stale_seconds: Dict[str, float], max_results: int
+    ):
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self.max_results = max_results
+        self._flights: Dict[FlightKey, asyncio.Task] = {}
+        self._results: "OrderedDict[FlightKey, FlightResult]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, route: str, counter: str):
+        counters = self._counters.setdefault(
+            route,
+            {
+                "executed": 0,
+                "coalesced": 0,
+                "fresh": 0,
+                "stale": 0,
+                "bypassed": 0,
+                "failed": 0,
+            },
+        )
+        counters[counter] += 1
+
+    async def _fetch(
+        self, key: FlightKey, generation: int, fetch: Fetch
+    ) -> FlightResult:
+        route, region, _ = key
+        try:
+            result = await fetch()
+        except HTTPException:
+            # Answers to bad requests, e.g. an invalid cursor, are not failures
+            raise
+        except Exception:
+            self._count(route, "failed")
+            raise
+        finally:
+            if self._flights.get(key) is asyncio.current_task():
+                del self._flights[key]
+
+        # Results fetched before a write to the region are not kept
+        if (
+            self.stale_seconds.get(route, 0) > 0
+            and generation == self._generations.get(region, 0)
+        ):
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result
+
+    def _start(self, key: FlightKey, fetch: Fetch) -> asyncio.Task:
+        route, region, _ = key
+        self._count(route, "executed")
+        task = asyncio.get_running_loop().create_task(
+            self._fetch(key, self._generations.get(region, 0), fetch)
+        )
+        task.add_done_callback(self._log_failure)
+        self._flights[key] = task
+        return task
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task):
+        if task.cancelled() or isinstance(task.exception(), HTTPException):
+            return
+        if task.exception() is not None:
+            logger.error(f"Coalesced read failed: {task.exception()}")
+
+    async def run(
+        self,
+        request: Request,
+        route: str,
+        region: str,
+        params: dict,
+        fetch: Fetch,
+    ) -> FlightResult:
+        """
+        Returns the result of `fetch`, shared with identical concurrent requests.
+
+        Args:
+            request (Request): The request, identifying its reader.
+            route (str): Name of the endpoint, also selecting its stale window.
+            region (str): The region read.
+            params (dict): The parameters the result depends on. None values are ignored.
+            fetch (callable): Opens its own database session, reads and
+                serializes the result.
+        """
+        if replica_router.wrote_recently(region, reader_key(request)):
+            self._count(route, "bypassed")
+            return await fetch()
+
+        key = (
+            route,
+            region,
+            tuple(
+                sorted(
+                    (name, value) for name, value in params.items() if value is not None
+                )
+            ),
+        )
+        result = self._results.get(key)
+        if result is not None:
+            age = time.monotonic() - result.fetched_at
+            if age < self.fresh_seconds:
+                self._count(route, "fresh")
+                return result
+            if age < self.fresh_seconds + self.stale_seconds.get(route, 0):
+                self._count(route, "stale")
+                if key not in self._flights:
+                    self._start(key, fetch)
+                return result
+            del self._results[key]
+
+        task = self._flights.get(key)
+        if task is not None:
+            self._count(route, "coalesced")
+        else:
+            task = self._start(key, fetch)
+        return await asyncio.shield(task)
+
+    def invalidate(self, region: str):
+        """
+        Drops the kept results of a region after a write. Running fetches are
+        detached, so later requests start a new one.
+        """
+        self._generations[region] = self._generations.get(region, 0) + 1
+        for key in [key for key in self._results if key[1] == region]:
+            del self._results[key]
+        for key in [key for key in self._flights if key[1] == region]:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Returns the counters of each route: fetches executed, requests that
+        joined a running fetch, requests served a fresh or a stale result,
+        requests that bypassed coalescing and failed fetches.
+        """
+        return {
+            "routes": {
+                route: dict(counters) for route, counters in self._counters.items()
+            },
+            "in_flight": len(self._flights),
+            "kept_results": len(self._results),
+            "fresh_seconds": self.fresh_seconds,
+            "stale_seconds": dict(self.stale_seconds),
+        }
+
+
+single_flight = SingleFlight(
+    settings.COALESCE_FRESH_SECONDS,
+    settings.COALESCE_STALE_SECONDS,
+    settings.COALESCE_MAX_RESULTS,
+)
@@ -0,0 +1,212 @@
+from bisect import insort
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models_local import Hall, Movie, Show
+from .show_schedule import CLEANING_GAP, MAX_SHOW_SPAN
+
+Interval = Tuple[datetime, datetime]
+
+
+@dataclass
+class MovieDemand:
+    """
+    A movie to place in the timetable.
+
+    Attributes:
+        movie_id (int): The movie.
+        runtime (int): The runtime of the movie in minutes.
+        screenings (int): The number of shows wanted over the whole period.
+        price (float): The ticket price of its shows.
+        hall_ids (list[int], optional): The halls it may be shown in, any if None.
+    """
+
+    movie_id: int
+    runtime: int
+    screenings: int
+    price: float
+    hall_ids: Optional[List[int]] = None
+
+
+class HallDay:
+    """
+    The opening hours of a hall on one day and the periods already occupied.
+    """
+
+    def __init__(self, hall_id: int, day: date, opens: datetime, closes: datetime):
+        self.hall_id = hall_id
+        self.day = day
+        self.opens = opens
+        # The last show must end by closing time, its cleaning may run later
+        self.limit = closes + CLEANING_GAP
+        self.busy: List[Interval] = []
+
+    def block(self, start: datetime, end: datetime):
+        """Marks a period as occupied."""
+        if start < self.limit and end > self.opens:
+            insort(self.busy, (start, end))
+
+    def earliest_fit(self, duration: timedelta, slot: timedelta) -> Optional[datetime]:
+        """
+        Returns the earliest start, aligned to `slot` from midnight, of a show
+        blocking the hall for `duration`, or None if it does not fit.
+        """
+        midnight = datetime.combine(self.day, time())
+        start = self.opens
+        for busy_start, busy_end in self.busy + [(self.limit, self.limit)]:
+            aligned = midnight + -(-(start - midnight) // slot) * slot
+            if aligned + duration <= busy_start:
+                return aligned
+            start = max(start, busy_end)
+        return None
+
+
+def plan_timetable(
+    hall_days: Sequence[HallDay],
+    movies: Sequence[MovieDemand],
+    slot: timedelta,
+) -> List[Tuple[MovieDemand, HallDay, datetime, datetime]]:
+    """
+    Packs shows of the requested movies into the free time of the halls.
+
+    Shows are placed one at a time, always for the movie furthest behind its
+    target relative to its size. Each show goes to the day on which that
+    movie has the fewest shows so far, which spreads screenings over the
+    period, and there to the hall with the earliest aligned start that fits,
+    which packs each hall's day from opening without fragmenting it. A movie
+    is dropped once it reaches its target or no longer fits anywhere.
+
+    Returns:
+        list: (movie, hall day, start, end including cleaning) of each show,
+        in placement order. The hall days are updated with the new shows.
+    """
+    days: Dict[date, List[HallDay]] = defaultdict(list)
+    halls: Dict[int, List[HallDay]] = defaultdict(list)
+    for hall_day in hall_days:
+        days[hall_day.day].append(hall_day)
+        halls[hall_day.hall_id].append(hall_day)
+
+    placed = {movie.movie_id: 0 for movie in movies}
+    per_day: Dict[Tuple[int, date], int] = defaultdict(int)
+    open_movies = [movie for movie in movies if movie.screenings > 0]
+    plan = []
+
+    while open_movies:
+        movie = max(
+            open_movies,
+            key=lambda m: (
+                1 - placed[m.movie_id] / m.screenings,
+                m.screenings - placed[m.movie_id],
+                -m.movie_id,
+            ),
+        )
+        duration = timedelta(minutes=movie.runtime) + CLEANING_GAP
+        best = None
+        for day in sorted(days, key=lambda d: (per_day[(movie.movie_id, d)], d)):
+            for hall_day in days[day]:
+                if movie.hall_ids is not None and hall_day.hall_id not in movie.hall_ids:
+                    continue
+                start = hall_day.earliest_fit(duration, slot)
+                if start is not None and (best is None or start < best[1]):
+                    best = (hall_day, start)
+            if best is not None:
+                break
+        if best is None:
+            open_movies.remove(movie)
+            continue
+
+        hall_day, start = best
+        # A show running past midnight may also reach into the next opening period
+        for neighbour in halls[hall_day.hall_id]:
+            neighbour.block(start, start + duration)
+        plan.append((movie, hall_day, start, start + duration))
+        placed[movie.movie_id] += 1
+        per_day[(movie.movie_id, hall_day.day)] += 1
+        if placed[movie.movie_id] >= movie.screenings:
+            open_movies.remove(movie)
+    return plan
+
+
+def opening_hours(day: date, opening: time, closing: time) -> Interval:
+    """Returns the opening period of a day; a closing time not after the opening time falls on the next day."""
+    opens = datetime.combine(day, opening)
+    closes = datetime.combine(day, closing)
+    if closes <= opens:
+        closes += timedelta(days=1)
+    return opens, closes
+
+
+async def load_hall_days(
+    db: AsyncSession,
+    start_date: date,
+    end_date: date,
+    opening: time,
+    closing: time,
+    hall_ids: Optional[Sequence[int]] = None,
+) -> List[HallDay]:
+    """
+    Returns the opening hours of every hall and day of the period, with the
+    existing shows blocked, using one query for the halls and one for the shows.
+    """
+    query = select(Hall.id).order_by(Hall.id)
+    if hall_ids is not None:
+        query = query.where(Hall.id.in_(hall_ids))
+    halls = (await db.execute(query)).scalars().all()
+
+    days = [
+        start_date + timedelta(days=offset)
+        for offset in range((end_date - start_date).days + 1)
+    ]
+    hall_days = {
+        (hall_id, day): HallDay(hall_id, day, *opening_hours(day, opening, closing))
+        for hall_id in halls
+        for day in days
+    }
+    if not hall_days:
+        return []
+
+    first_open = min(hall_day.opens for hall_day in hall_days.values())
+    last_limit = max(hall_day.limit for hall_day in hall_days.values())
+    result = await db.execute(
+        select(Show.hall_id, Show.start_time, Show.end_time).where(
+            Show.hall_id.in_(halls),
+            Show.start_time >= first_open - MAX_SHOW_SPAN,
+            Show.start_time < last_limit,
+        )
+    )
+    for hall_id, start, end in result.all():
+        for day in (start.date() - timedelta(days=1), start.date()):
+            if (hall_id, day) in hall_days:
+                hall_days[(hall_id, day)].block(start, end)
+    return list(hall_days.values())
+
+
+async def load_movie_demands(db: AsyncSession, requests: Sequence) -> List[MovieDemand]:
+    """
+    Returns the demands of the requested movies that exist, with their runtimes.
+
+    Args:
+        requests: Objects with movie_id, screenings, price and hall_ids.
+    """
+    result = await db.execute(
+        select(Movie.id, Movie.runtime).where(
+            Movie.id.in_({request.movie_id for request in requests})
+        )
+    )
+    runtimes = dict(result.all())
+    return [
+        MovieDemand(
+            request.movie_id,
+            runtimes[request.movie_id] or 0,
+            request.screenings,
+            request.price,
+            request.hall_ids,
+        )
+        for request in requests
+        if request.movie_id in runtimes
+    ]
@@ -0,0 +1,213 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from urllib3.util.retry import Retry
+
+from models_global import TmdbMovieCache
+from .config import logger, settings
+
+
+class TmdbError(Exception):
+    """
+    Raised when TMDB does not return movie details.
+
+    Attributes:
+        status_code (int): The upstream status code, or 502 if TMDB was unreachable.
+    """
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TmdbClient:
+    """
+    Pooled TMDB client usable from async code.
+
+    Requests go through a shared `requests.Session` with keep-alive connections
+    and run in worker threads, so the event loop is never blocked on the
+    network. A semaphore bounds the number of requests in flight, transient
+    failures (connection errors, 429 and 5xx) are retried with exponential
+    backoff and every attempt is subject to a timeout. A whole fetch,
+    retries and backoff included, is given up after `deadline` seconds, so
+    one slow movie does not hold up a bulk import of many.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        timeout: float,
+        retries: int,
+        max_concurrency: int,
+        backoff_factor: float = 0.5,
+        deadline: Optional[float] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.max_concurrency = max_concurrency
+        self.backoff_factor = backoff_factor
+        self._session: Optional[requests.Session] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_session(self) -> requests.Session:
+        if self._session is None:
+            retry = Retry(
+                total=self.retries,
+                backoff_factor=self.backoff_factor,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                max_retries=retry,
+                pool_connections=1,
+                pool_maxsize=self.max_concurrency,
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    def _get(self, path: str, params: dict) -> dict:
+        try:
+            response = self._get_session().get(
+                f"{self.base_url}{path}",
+                params={"api_key": self.api_key, **params},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            raise TmdbError(502, f"TMDB request failed: {e.__class__.__name__}")
+        if response.status_code != 200:
+            raise TmdbError(response.status_code, "Error fetching data from TMDB API")
+        return response.json()
+
+    async def fetch_movie(self, tmdb_id: int, language: str) -> dict:
+        """
+        Fetches the details of a movie from TMDB.
+
+        Raises:
+            TmdbError: If TMDB answered with an error, could not be reached,
+                or did not answer within the deadline (504).
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        await self._semaphore.acquire()
+        request = asyncio.ensure_future(
+            asyncio.to_thread(self._get, f"/movie/{tmdb_id}", {"language": language})
+        )
+        # The thread cannot be interrupted: it keeps its slot until it is done
+        request.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(request), self.deadline)
+        except asyncio.TimeoutError:
+            raise TmdbError(504, "TMDB did not answer in time")
+
+    def _release(self, request: asyncio.Future):
+        self._semaphore.release()
+        if not request.cancelled():
+            request.exception()  # Mark as retrieved after a deadline
+
+    def close(self):
+        """Closes the pooled connections."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+tmdb_client = TmdbClient(
+    settings.TMDB_API_URL,
+    settings.TMDB_API_KEY,
+    timeout=settings.TMDB_TIMEOUT_SECONDS,
+    retries=settings.TMDB_MAX_RETRIES,
+    max_concurrency=settings.TMDB_MAX_CONCURRENCY,
+    deadline=settings.TMDB_DEADLINE_SECONDS,
+)
+
+
+async def get_many_movie_details(
+    tmdb_ids: Iterable[int],
+    db: AsyncSession,
+    language: str = settings.TMDB_LANGUAGE,
+    client: TmdbClient = tmdb_client,
+) -> Dict[int, Union[dict, TmdbError]]:
+    """
+    Returns TMDB movie details, going to the network only on cache misses.
+
+    Details are cached per (tmdbID, language) in the global database, so adding
+    the same movie to another region or re-seeding does not call TMDB again.
+    Cached details are read with one query and misses are fetched concurrently,
+    within the client's concurrency limit, then stored with one insert. A
+    failed fetch only affects its own movie.
+
+    Args:
+        tmdb_ids (iterable[int]): The TMDB IDs of the movies.
+        db (AsyncSession): A session of the global database.
+        language (str): The TMDB language code.
+        client (TmdbClient): The client used on cache misses.
+
+    Returns:
+        dict[int, dict | TmdbError]: The details, or the error, of each movie.
+    """
+    tmdb_ids = list(dict.fromkeys(tmdb_ids))
+    result = await db.execute(
+        select(TmdbMovieCache.tmdb_id, TmdbMovieCache.data).where(
+            TmdbMovieCache.tmdb_id.in_(tmdb_ids), TmdbMovieCache.language == language
+        )
+    )
+    details: Dict[int, Union[dict, TmdbError]] = dict(result.all())
+
+    missing = [tmdb_id for tmdb_id in tmdb_ids if tmdb_id not in details]
+    fetched = await asyncio.gather(
+        *(client.fetch_movie(tmdb_id, language) for tmdb_id in missing),
+        return_exceptions=True,
+    )
+    rows = []
+    for tmdb_id, data in zip(missing, fetched):
+        if isinstance(data, BaseException) and not isinstance(data, TmdbError):
+            data = TmdbError(502, f"TMDB request failed: {data.__class__.__name__}")
+        details[tmdb_id] = data
+        if not isinstance(data, TmdbError):
+            rows.append({"tmdb_id": tmdb_id, "language": language, "data": data})
+
+    if rows:
+        fetched_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        try:
+            await db.execute(
+                insert(TmdbMovieCache)
+                .values([{**row, "fetched_at": fetched_at} for row in rows])
+                .on_conflict_do_nothing(index_elements=["tmdb_id", "language"])
+            )
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error caching TMDB details of {len(rows)} movies: {e}")
+    return details
+
+
+async def get_movie_details(
+    tmdb_id: int,
+    db: AsyncSession,
+    language: str = settings.TMDB_LANGUAGE,
+    client: TmdbClient = tmdb_client,
+) -> dict:
+    """
+    Returns TMDB details of a single movie, see `get_many_movie_details`.
+
+    Raises:
+        TmdbError: If the details are not cached and TMDB does not return them.
+    """
+    details = (await get_many_movie_details([tmdb_id], db, language, client))[tmdb_id]
+    if isinstance(details, TmdbError):
+        raise details
+    return details
@@ -9,10 +9,15 @@ from core import (
     create_default_user,
     delete_unpaid_reservations,
     get_db_global,
-    get_db_local,
+    hold_queue,
     init_db_on_startup,
     logger,
+    regions,
+    databases,
+    sessions,
     settings,
+    tmdb_client,
+    NEXT_CURSOR_HEADER,
 )
 
 
@@ -34,14 +39,13 @@ scheduler = AsyncIOScheduler()  # Single scheduler instance
 
 
 async def check_reservations_paid():
-    """Check if reservations have been paid and delete unpaid ones."""
+    """Release expired holds missed by the hold queue."""
     async with task_lock:
         try:
-            for db_getter in [get_db_local("krakow"), get_db_local("warsaw")]:
-                async for db in db_getter:
+            for region in regions():
+                async with sessions[region]() as db:
                     logger.info("Checking for unpaid reservations...")
-                    await delete_unpaid_reservations(db)
-                    break
+                    await delete_unpaid_reservations(db, region)
         except Exception as e:
             logger.error(f"Error while checking reservations: {e}")
 
@@ -65,16 +69,27 @@ async def on_startup():
         logger.error(f"Error creating default user: {e}")
         raise
 
+    # Release holds at their deadline, starting with the ones already pending
+    for region in regions():
+        await hold_queue.load(region)
+    hold_queue.start()
+
     # Schedule the job only if it doesn't exist
     if not scheduler.get_job("check_reservations_paid"):
-        loop = asyncio.get_running_loop()
         scheduler.add_job(
-            lambda: asyncio.run_coroutine_threadsafe(check_reservations_paid(), loop),
+            check_reservations_paid,
             "interval",
-            minutes=1,
+            minutes=settings.RESERVATION_SWEEP_INTERVAL_MINUTES,
             id="check_reservations_paid",
             replace_existing=True,
         )
+        scheduler.add_job(
+            databases.dispose_idle,
+            "interval",
+            seconds=max(settings.REGION_ENGINE_IDLE_SECONDS / 2, 30),
+            id="dispose_idle_databases",
+            replace_existing=True,
+        )
         scheduler.add_listener(job_error_listener, EVENT_JOB_ERROR)
         scheduler.start()
 
@@ -82,6 +97,8 @@ async def on_startup():
 async def on_shutdown():
     logger.info("Shutting down the application...")
     scheduler.shutdown(wait=False)
+    await hold_queue.stop()
+    tmdb_client.close()
 
 
 app = FastAPI(on_startup=[on_startup], on_shutdown=[on_shutdown])
@@ -104,6 +121,7 @@ app.add_middleware(
     ],  # Restrict to necessary methods
     # Restrict to necessary headers
     allow_headers=["Authorization", "Content-Type"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(api_router)
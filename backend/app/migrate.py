@@ -0,0 +1,35 @@
+"""
+Applies or shows the schema migrations of the global and regional databases.
+
+Usage, from `backend/app`:
+
+    python migrate.py upgrade   # apply pending migrations to every database
+    python migrate.py status    # show the version of every database
+"""
+
+import asyncio
+import sys
+
+from core.migrations import (
+    current_version,
+    databases_to_migrate,
+    head_version,
+    upgrade_all,
+)
+import models_global  # noqa: F401
+import models_local  # noqa: F401
+
+
+async def main(command: str):
+    if command == "upgrade":
+        for name, versions in (await upgrade_all()).items():
+            print(f"{name}: applied {versions}" if versions else f"{name}: up to date")
+    elif command == "status":
+        for name in databases_to_migrate():
+            print(f"{name}: version {await current_version(name)}/{head_version(name)}")
+    else:
+        raise SystemExit(__doc__)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "status"))
@@ -1 +1,3 @@
 from .user_global_model import UsersGlobal
+from .tmdb_cache_model import TmdbMovieCache
+from .login_failure_model import LoginFailure
@@ -0,0 +1,20 @@
+from core import GlobalBase
+from sqlalchemy import Column, DateTime, Index, Integer, String
+
+
+class LoginFailure(GlobalBase):
+    """
+    Represents a failed login attempt, used to throttle logins across workers.
+
+    Attributes:
+        id (int): The unique identifier for the failed attempt.
+        key (str): The throttled key, "user:<username>" or "client:<address>".
+        failed_at (datetime): The time (UTC) of the failed attempt.
+    """
+
+    __tablename__ = "login_failures"
+    __table_args__ = (Index("ix_login_failures_key_failed_at", "key", "failed_at"),)
+
+    id = Column(Integer, primary_key=True)
+    key = Column(String, nullable=False)
+    failed_at = Column(DateTime, nullable=False)
@@ -0,0 +1,21 @@
+from core import GlobalBase
+from sqlalchemy import JSON, Column, DateTime, Integer, String
+
+
+class TmdbMovieCache(GlobalBase):
+    """
+    Represents cached TMDB details of a movie, shared by all regions.
+
+    Attributes:
+        tmdb_id (int): The TMDB (The Movie Database) ID of the movie.
+        language (str): The TMDB language code the details were fetched in.
+        data (dict): The movie details as returned by TMDB.
+        fetched_at (datetime): The time (UTC) at which the details were fetched.
+    """
+
+    __tablename__ = "tmdb_movie_cache"
+
+    tmdb_id = Column(Integer, primary_key=True)
+    language = Column(String, primary_key=True)
+    data = Column(JSON, nullable=False)
+    fetched_at = Column(DateTime)
@@ -17,7 +17,7 @@ class UsersGlobal(GlobalBase):
     """
 
     __tablename__ = "users_global"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     username = Column(String, unique=True)
     first_name = Column(String)
     last_name = Column(String)
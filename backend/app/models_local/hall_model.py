@@ -16,7 +16,7 @@ class Hall(LocalBase):
 
     __tablename__ = "halls"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String)
 
     shows = relationship("Show", back_populates="hall")
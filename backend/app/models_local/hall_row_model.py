@@ -18,10 +18,10 @@ class HallRow(LocalBase):
 
     __tablename__ = "hall_rows"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     hall_id = Column(Integer, ForeignKey("halls.id"), index=True)
-    row_number = Column(Integer, index=True)
-    seat_count = Column(Integer, index=True)
+    row_number = Column(Integer)
+    seat_count = Column(Integer)
 
     hall = relationship("Hall", back_populates="hall_rows")
     seats = relationship("Seat", back_populates="hall_row")
@@ -19,7 +19,7 @@ class Payment(LocalBase):
 
     __tablename__ = "payments"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     reservation_id = Column(Integer, ForeignKey("reservations.id"), index=True)
     amount = Column(Float)
     payment_method = Column(String)
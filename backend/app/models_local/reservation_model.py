@@ -1,5 +1,5 @@
 from core import LocalBase
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import relationship
 
 
@@ -13,17 +13,32 @@ class Reservation(LocalBase):
         show_id (int): The ID of the associated show.
         status (str): The status of the reservation (e.g., confirmed, canceled).
         created_at (datetime): The timestamp when the reservation was created.
+        expires_at (datetime): The time (UTC) at which an unpaid reservation
+            releases its seats. None once the reservation is paid.
         payment (Payment): The payment associated with this reservation.
         reservation_seat (list): A list of seats reserved in this reservation.
     """
 
     __tablename__ = "reservations"
+    __table_args__ = (
+        # Only unpaid holds have a deadline, paid reservations stay out of the index
+        Index(
+            "ix_reservations_hold_expires_at",
+            "expires_at",
+            postgresql_where=text("expires_at IS NOT NULL"),
+        ),
+        # A user's reservations, newest first, keyset-paginated by (created_at, id)
+        Index("ix_reservations_user_id_created_at", "user_id", "created_at", "id"),
+        # Reservations by status, newest first, for the staff listing
+        Index("ix_reservations_status_created_at", "status", "created_at", "id"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, index=True)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer)
     show_id = Column(Integer, ForeignKey("shows.id"), index=True)
     status = Column(String)
     created_at = Column(DateTime)
+    expires_at = Column(DateTime)
 
     payment = relationship("Payment", back_populates="reservation")
     reservation_seat = relationship("ReservationSeat", back_populates="reservation")
@@ -1,5 +1,5 @@
 from core import LocalBase
-from sqlalchemy import Column, ForeignKey, Integer
+from sqlalchemy import Column, ForeignKey, Index, Integer, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 
@@ -11,15 +11,25 @@ class ReservationSeat(LocalBase):
         id (int): The unique identifier for the reserved seat.
         seat_id (int): The ID of the seat being reserved.
         reservation_id (int): The ID of the associated reservation.
+        show_id (int): The ID of the show the seat is reserved for. Copied from
+            the reservation so that (show_id, seat_id) can be kept unique.
         reservation (Reservation): The reservation associated with this seat.
         seat (Seat): The seat associated with this reservation.
     """
 
     __tablename__ = "reservation_seats"
+    __table_args__ = (
+        UniqueConstraint("show_id", "seat_id", name="uq_reservation_seats_show_seat"),
+        # Seats of a set of reservations, read as an index-only scan
+        Index(
+            "ix_reservation_seats_reservation_id_seat_id", "reservation_id", "seat_id"
+        ),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     seat_id = Column(Integer, ForeignKey("seats.id"), index=True)
-    reservation_id = Column(Integer, ForeignKey("reservations.id"), index=True)
+    reservation_id = Column(Integer, ForeignKey("reservations.id"))
+    show_id = Column(Integer, ForeignKey("shows.id"), nullable=False)
 
     reservation = relationship("Reservation", back_populates="reservation_seat")
     seat = relationship("Seat", back_populates="reservation_seat")
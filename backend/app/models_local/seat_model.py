@@ -1,5 +1,5 @@
 from core import LocalBase
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Integer, String, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 
@@ -17,10 +17,14 @@ class Seat(LocalBase):
     """
 
     __tablename__ = "seats"
+    __table_args__ = (
+        # Also serves the lookups of a row's seats
+        UniqueConstraint("row_id", "seat_number", name="uq_seats_row_seat"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    row_id = Column(Integer, ForeignKey("hall_rows.id"), index=True)
-    seat_number = Column(Integer, index=True)
+    id = Column(Integer, primary_key=True)
+    row_id = Column(Integer, ForeignKey("hall_rows.id"))
+    seat_number = Column(Integer)
     seat_type = Column(String)
 
     hall_row = relationship("HallRow", back_populates="seats")
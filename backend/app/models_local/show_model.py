@@ -1,5 +1,17 @@
 from core import LocalBase
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer
+from sqlalchemy import (
+    DDL,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    column,
+    event,
+    func,
+)
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
 
 
@@ -12,19 +24,43 @@ class Show(LocalBase):
         movie_id (int): The ID of the movie being shown.
         hall_id (int): The ID of the hall where the show is taking place.
         start_time (datetime): The start time of the show.
+        end_time (datetime): The time the hall is free again: the end of the
+            movie plus the cleaning gap.
         price (float): The ticket price for the show.
         movie (Movie): The movie associated with this show.
         hall (Hall): The hall where the show is being held.
     """
 
     __tablename__ = "shows"
+    __table_args__ = (
+        # Shows of a hall in a time range: day listings and conflict checks
+        Index("ix_shows_hall_id_start_time", "hall_id", "start_time"),
+        # Upcoming shows and the keyset-paginated show list
+        Index("ix_shows_start_time_id", "start_time", "id"),
+        # Two shows cannot occupy the same hall at the same time
+        ExcludeConstraint(
+            ("hall_id", "="),
+            (func.tsrange(column("start_time"), column("end_time")), "&&"),
+            using="gist",
+            name="ex_shows_hall_overlap",
+        ).ddl_if(dialect="postgresql"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     movie_id = Column(Integer, ForeignKey("movies.id"), index=True)
-    hall_id = Column(Integer, ForeignKey("halls.id"), index=True)
+    hall_id = Column(Integer, ForeignKey("halls.id"))
     start_time = Column(DateTime)
+    end_time = Column(DateTime, nullable=False)
     price = Column(Float)
 
     movie = relationship("Movie", back_populates="shows")
     hall = relationship("Hall", back_populates="shows")
     reservation = relationship("Reservation", back_populates="show")
+
+
+# The exclusion constraint compares hall IDs with a GiST index
+event.listen(
+    LocalBase.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
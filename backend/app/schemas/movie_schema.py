@@ -1,5 +1,5 @@
 from datetime import date
-from typing import List
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -93,3 +93,47 @@ class MovieTitle(BaseModel):
         Configuration for the Pydantic model:
         - `from_attributes`: Allows population of the model from ORM objects.
         """
+
+
+class MovieImport(BaseModel):
+    """
+    Pydantic model representing a bulk movie import request.
+    """
+
+    tmdbIDs: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=500,
+        title="TMDB IDs",
+        description="The TMDB IDs of the movies to import.",
+    )
+    regions: List[str] = Field(
+        ...,
+        min_length=1,
+        title="Regions",
+        description="The regions (e.g. 'krakow') to import the movies into.",
+    )
+
+
+class MovieImportResult(BaseModel):
+    """
+    Pydantic model representing the outcome of importing one movie into one region.
+    """
+
+    tmdbID: int = Field(..., title="TMDB ID", description="The TMDB ID of the movie.")
+    region: str = Field(
+        ..., title="Region", description="The region the movie was imported into."
+    )
+    status: Literal["added", "duplicate", "failed"] = Field(
+        ...,
+        title="Import Status",
+        description="'added' if the movie was inserted, 'duplicate' if it already existed in the region, 'failed' otherwise.",
+    )
+    movie_id: Optional[int] = Field(
+        None,
+        title="Movie ID",
+        description="The ID of the movie in the region's database, unless the import failed.",
+    )
+    detail: Optional[str] = Field(
+        None, title="Detail", description="The reason of a failed import."
+    )
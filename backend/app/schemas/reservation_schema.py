@@ -45,6 +45,11 @@ class ReservationModel(ReservationBase):
         title="User ID",
         description="The unique identifier of the user making the reservation. Must be a positive integer.",
     )
+    expires_at: Optional[datetime] = Field(
+        None,
+        title="Expires At",
+        description="The time (UTC) at which an unpaid reservation releases its seats. Empty once the reservation is paid.",
+    )
 
     class Config:
         from_attributes = True
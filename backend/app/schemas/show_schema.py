@@ -1,7 +1,7 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime, time
+from typing import Annotated, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class ShowBase(BaseModel):
@@ -75,3 +75,254 @@ class ShowDetailsReservation(BaseModel):
     show: ShowDetailsShow
     movie: ShowDetailsMovie
     hall: ShowDetailsHall
+
+
+class ShowRecurrence(BaseModel):
+    """
+    Pydantic model representing a show repeated at fixed times over a date range.
+    """
+
+    movie_id: int = Field(
+        ..., ge=1, title="Movie ID", description="The movie being shown."
+    )
+    hall_id: int = Field(
+        ..., ge=1, title="Hall ID", description="The hall of the shows."
+    )
+    price: float = Field(
+        ..., title="Ticket Price", description="The ticket price of every show."
+    )
+    start_date: date = Field(
+        ..., title="Start Date", description="The first day of the shows."
+    )
+    end_date: date = Field(
+        ..., title="End Date", description="The last day of the shows, inclusive."
+    )
+    times: List[time] = Field(
+        ...,
+        min_length=1,
+        title="Start Times",
+        description="The start times of the shows on each day.",
+    )
+    weekdays: Optional[List[Annotated[int, Field(ge=0, le=6)]]] = Field(
+        None,
+        title="Weekdays",
+        description="The days of the week the shows run on, 0 being Monday. Every day if omitted.",
+    )
+
+    @model_validator(mode="after")
+    def check_date_range(self):
+        if self.end_date < self.start_date:
+            raise ValueError("The end date must not be before the start date.")
+        return self
+
+
+class ShowSchedule(BaseModel):
+    """
+    Pydantic model representing a bulk scheduling request: explicit shows and recurrence rules.
+    """
+
+    shows: List[ShowBase] = Field(
+        [], title="Shows", description="Individual shows to schedule."
+    )
+    recurrences: List[ShowRecurrence] = Field(
+        [],
+        title="Recurrences",
+        description="Recurring shows, expanded after the individual shows.",
+    )
+
+
+class ShowConflict(BaseModel):
+    """
+    Pydantic model representing what a requested show conflicts with.
+    """
+
+    show_id: Optional[int] = Field(
+        None, title="Show ID", description="An existing show occupying the hall."
+    )
+    item: Optional[int] = Field(
+        None,
+        title="Item",
+        description="Another item of the same request, accepted before this one.",
+    )
+
+
+class ShowScheduleResult(ShowBase):
+    """
+    Pydantic model representing the outcome of scheduling one show of a bulk request.
+    """
+
+    item: int = Field(
+        ...,
+        title="Item",
+        description="Position of the show in the request, individual shows first, then expanded recurrences.",
+    )
+    end_time: Optional[datetime] = Field(
+        None,
+        title="End Time",
+        description="The time the hall is free again, including the cleaning gap.",
+    )
+    status: Literal["added", "accepted", "conflict", "failed"] = Field(
+        ...,
+        title="Scheduling Status",
+        description="'added' if the show was inserted, 'accepted' if it would be (dry run), 'conflict' if it overlaps other shows, 'failed' otherwise.",
+    )
+    show_id: Optional[int] = Field(
+        None, title="Show ID", description="The ID of the added show."
+    )
+    conflicts: List[ShowConflict] = Field(
+        [], title="Conflicts", description="What the show overlaps."
+    )
+    detail: Optional[str] = Field(
+        None, title="Detail", description="The reason of a failed show."
+    )
+
+
+class TimetableMovie(BaseModel):
+    """
+    Pydantic model representing a movie to place in a generated timetable.
+    """
+
+    movie_id: int = Field(
+        ..., ge=1, title="Movie ID", description="The movie to show."
+    )
+    screenings: int = Field(
+        ...,
+        ge=1,
+        title="Screenings",
+        description="The number of shows wanted over the whole period.",
+    )
+    price: float = Field(
+        ..., title="Ticket Price", description="The ticket price of its shows."
+    )
+    hall_ids: Optional[List[int]] = Field(
+        None,
+        title="Hall IDs",
+        description="The halls the movie may be shown in. Any of the timetable's halls if omitted.",
+    )
+
+
+class TimetableRequest(BaseModel):
+    """
+    Pydantic model representing a request to generate a timetable.
+    """
+
+    start_date: date = Field(
+        ..., title="Start Date", description="The first day to plan."
+    )
+    end_date: date = Field(
+        ..., title="End Date", description="The last day to plan, inclusive."
+    )
+    opening_time: time = Field(
+        ..., title="Opening Time", description="The earliest start of a show each day."
+    )
+    closing_time: time = Field(
+        ...,
+        title="Closing Time",
+        description="The time by which every show has ended. A time not after the opening time is on the next day.",
+    )
+    hall_ids: Optional[List[int]] = Field(
+        None,
+        title="Hall IDs",
+        description="The halls to plan. Every hall of the region if omitted.",
+    )
+    movies: List[TimetableMovie] = Field(
+        ..., min_length=1, title="Movies", description="The movies to place."
+    )
+    slot_minutes: int = Field(
+        5,
+        ge=1,
+        le=60,
+        title="Slot Minutes",
+        description="Show start times are multiples of this many minutes after midnight.",
+    )
+
+
+class TimetableShow(ShowBase):
+    """
+    Pydantic model representing a show of a generated timetable.
+    """
+
+    end_time: datetime = Field(
+        ...,
+        title="End Time",
+        description="The time the hall is free again, including the cleaning gap.",
+    )
+
+
+class TimetableMovieResult(BaseModel):
+    """
+    Pydantic model representing how many shows of a movie a timetable contains.
+    """
+
+    movie_id: int = Field(..., title="Movie ID", description="The movie.")
+    screenings: int = Field(
+        ..., title="Screenings", description="The number of shows requested."
+    )
+    scheduled: int = Field(
+        ..., title="Scheduled", description="The number of shows in the timetable."
+    )
+    detail: Optional[str] = Field(
+        None, title="Detail", description="Why the movie could not be placed at all."
+    )
+
+
+class TimetablePlan(BaseModel):
+    """
+    Pydantic model representing a generated timetable, not yet added.
+    """
+
+    shows: List[TimetableShow] = Field(
+        ...,
+        title="Shows",
+        description="The planned shows, ordered by hall and start time. Post them to `/show/bulk-add` to add them.",
+    )
+    movies: List[TimetableMovieResult] = Field(
+        ..., title="Movies", description="The number of shows planned per movie."
+    )
+
+
+class CalendarShow(BaseModel):
+    """
+    Pydantic model representing a show in a calendar.
+    """
+
+    id: int = Field(..., title="Show ID", description="The show.")
+    hall_id: int = Field(..., title="Hall ID", description="The hall of the show.")
+    movie_id: int = Field(..., title="Movie ID", description="The movie shown.")
+    movie_title: Optional[str] = Field(
+        None, title="Movie Title", description="The title of the movie."
+    )
+    start_time: datetime = Field(
+        ..., title="Start Time", description="The start of the show."
+    )
+    end_time: datetime = Field(
+        ...,
+        title="End Time",
+        description="The time the hall is free again, including the cleaning gap.",
+    )
+
+
+class CalendarDay(BaseModel):
+    """
+    Pydantic model representing the shows starting on one day.
+    """
+
+    day: date = Field(..., title="Day", description="The day.")
+    shows: List[CalendarShow] = Field(
+        ..., title="Shows", description="The shows starting that day, in start order."
+    )
+
+
+class ShowCalendar(BaseModel):
+    """
+    Pydantic model representing the shows of a set of halls over a date range, per day.
+    """
+
+    start_date: date = Field(..., title="Start Date", description="The first day.")
+    end_date: date = Field(..., title="End Date", description="The last day, inclusive.")
+    hall_ids: Optional[List[int]] = Field(
+        None, title="Hall IDs", description="The halls, or None for every hall."
+    )
+    days: List[CalendarDay] = Field(
+        ..., title="Days", description="One bucket per day of the range, empty days included."
+    )
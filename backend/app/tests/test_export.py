@@ -0,0 +1,77 @@
+import asyncio
+import gzip
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import core.export
+from api.routes.export_router import export_reservations
+
+ROWS = [
+    (i, 1, 1, "paid", datetime(2025, 1, 1, 12, i), None) for i in range(1, 4)
+]
+
+
+class StreamingSession:
+    """Stands in for AsyncSession, streaming canned rows in batches of two."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def stream(self, statement):
+        async def partitions():
+            for start in range(0, len(ROWS), 2):
+                yield ROWS[start : start + 2]
+
+        return SimpleNamespace(partitions=partitions)
+
+
+@pytest.fixture(autouse=True)
+def sessions(monkeypatch):
+    monkeypatch.setattr(core.export, "sessions", {"krakow": StreamingSession})
+
+
+def download(**params) -> tuple:
+    """Runs the export and returns its response and body as a client saves it."""
+
+    async def run():
+        response = await export_reservations(
+            region="krakow",
+            created_from=None,
+            created_to=None,
+            show_id=None,
+            current_user=None,
+            **params,
+        )
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        return response, body
+
+    return asyncio.run(run())
+
+
+def test_compressed_export_is_a_gzip_file():
+    response, body = download(format="csv", compress=True)
+
+    # No Content-Encoding: clients would decode it and save plain CSV as .gz
+    assert "content-encoding" not in response.headers
+    assert response.media_type == "application/gzip"
+    assert response.headers["content-disposition"].endswith(
+        'filename="reservations-krakow.csv.gz"'
+    )
+    lines = gzip.decompress(body).decode().splitlines()
+    assert lines[0] == "id,user_id,show_id,status,created_at,expires_at"
+    assert [line.split(",")[0] for line in lines[1:]] == ["1", "2", "3"]
+
+
+def test_plain_export():
+    response, body = download(format="ndjson", compress=False)
+
+    assert response.media_type == "application/x-ndjson"
+    assert response.headers["content-disposition"].endswith(
+        'filename="reservations-krakow.ndjson"'
+    )
+    assert len(body.decode().splitlines()) == 3
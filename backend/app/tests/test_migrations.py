@@ -0,0 +1,96 @@
+"""
+Checks that migrating an empty database yields the schema of the models.
+
+A model changed without a migration, or a migration that does not match its
+model, makes the schemas differ. Set TEST_DATABASE_URL to a PostgreSQL
+database the tests may create scratch schemas in; without it the tests are
+skipped.
+"""
+
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import models_global  # noqa: F401
+import models_local  # noqa: F401
+from core import GlobalBase, LocalBase
+from core.migrations import _upgrade, head_version, schema_migrations
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL, reason="TEST_DATABASE_URL is not set"
+)
+
+
+def describe(conn) -> dict:
+    """Returns the columns, indexes and constraints of each table of the schema."""
+    inspector = inspect(conn)
+    tables = {}
+    for table in inspector.get_table_names():
+        if table == schema_migrations.name:
+            continue
+        tables[table] = {
+            "columns": {
+                (c["name"], str(c["type"]), c["nullable"])
+                for c in inspector.get_columns(table)
+            },
+            "indexes": {
+                (i["name"], tuple(i["column_names"]), i["unique"])
+                for i in inspector.get_indexes(table)
+                if not i.get("duplicates_constraint")
+            },
+            "unique": {
+                tuple(sorted(u["column_names"]))
+                for u in inspector.get_unique_constraints(table)
+            },
+            "foreign_keys": {
+                (tuple(f["constrained_columns"]), f["referred_table"])
+                for f in inspector.get_foreign_keys(table)
+            },
+        }
+    return tables
+
+
+async def build(schema: str, setup) -> tuple:
+    """Runs `setup` in a scratch schema, returning its result and the schema built."""
+    # Extensions the migrations need may already be installed in public
+    engine = create_async_engine(
+        DATABASE_URL,
+        connect_args={"server_settings": {"search_path": f"{schema},public"}},
+    )
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {schema}"))
+        async with engine.begin() as conn:
+            result = await conn.run_sync(setup)
+        async with engine.connect() as conn:
+            return result, await conn.run_sync(describe)
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        await engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "database, metadata",
+    [("global", GlobalBase.metadata), ("krakow", LocalBase.metadata)],
+)
+def test_migrated_schema_matches_models(database, metadata):
+    async def run():
+        applied, migrated = await build(
+            f"migrated_{database}", lambda conn: _upgrade(conn, database)
+        )
+        _, modelled = await build(f"modelled_{database}", metadata.create_all)
+        return applied, migrated, modelled
+
+    applied, migrated, modelled = asyncio.run(run())
+
+    assert applied == list(range(1, head_version(database) + 1))
+    assert migrated.keys() == modelled.keys()
+    for table in modelled:
+        assert migrated[table] == modelled[table], table
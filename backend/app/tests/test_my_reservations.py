@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi import Response
+
+from api.routes.reservation_router import get_my_reservations
+from core import NEXT_CURSOR_HEADER, PageParams
+
+
+class CountingSession:
+    """Stands in for AsyncSession, returning canned results and counting queries."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        rows = self.results.pop(0)
+        return SimpleNamespace(all=lambda: rows)
+
+
+def reservation_rows(count):
+    created = datetime(2025, 1, 1)
+    return [
+        SimpleNamespace(
+            Reservation=SimpleNamespace(
+                id=i,
+                user_id=1,
+                show_id=1,
+                status="paid",
+                created_at=created - timedelta(minutes=i),
+                expires_at=None,
+            ),
+            Payment=None,
+            show_start_time=datetime(2025, 2, 1),
+            show_price=25.0,
+            hall_name="Sala 1",
+            movie_id=1,
+            movie_title="Movie",
+            movie_runtime=120,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def seat_rows(reservation_ids):
+    return [
+        SimpleNamespace(reservation_id=i, seat_number=n, row_number=1)
+        for i in reservation_ids
+        for n in (1, 2)
+    ]
+
+
+def fetch_page(count, limit):
+    rows = reservation_rows(count)
+    db = CountingSession(rows, seat_rows(range(1, min(count, limit) + 1)))
+    response = Response()
+    page = asyncio.run(
+        get_my_reservations(
+            response=response,
+            page=PageParams(limit=limit, cursor=None),
+            when=None,
+            db=db,
+            current_user=SimpleNamespace(id=1),
+        )
+    )
+    return page, db.queries, response
+
+
+def test_query_count_does_not_grow_with_history():
+    for count in (1, 10, 200):
+        page, queries, _ = fetch_page(count, limit=200)
+        assert len(page) == count
+        assert queries == 2
+
+
+def test_empty_history_uses_single_query():
+    page, queries, response = fetch_page(0, limit=10)
+    assert page == []
+    assert queries == 1
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_next_cursor_is_set_when_more_rows_exist():
+    page, _, response = fetch_page(11, limit=10)
+    assert len(page) == 10
+    assert page[0]["seat_details"] == [
+        {"seat_number": 1, "row_number": 1},
+        {"seat_number": 2, "row_number": 1},
+    ]
+    assert NEXT_CURSOR_HEADER in response.headers
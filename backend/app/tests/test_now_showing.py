@@ -0,0 +1,57 @@
+import json
+from datetime import datetime
+
+from core.now_showing import MovieShowtimes, RegionShowtimes
+
+
+def at(day, hour):
+    return datetime(2025, 5, day, hour)
+
+
+def index_with(*shows):
+    index = RegionShowtimes()
+    index.movies[1] = MovieShowtimes(1, "Alien", "/alien.jpg")
+    for show in shows:
+        index.add(*show)
+    return index
+
+
+def test_shows_are_kept_in_start_order_per_movie():
+    index = index_with(
+        (11, 1, 3, at(2, 20)), (10, 1, 2, at(1, 18)), (12, 2, 2, at(1, 21))
+    )
+
+    payload = json.loads(index.serialize(False))
+
+    assert [movie["id"] for movie in payload] == [1, 2]
+    assert [show["id"] for show in payload[0]["shows"]] == [10, 11]
+    assert payload[0]["shows"][0] == {
+        "id": 10,
+        "start_time": "2025-05-01T18:00:00",
+        "hall_id": 2,
+    }
+    assert index.unknown_movies == {2}
+
+
+def test_started_and_removed_shows_are_dropped():
+    index = index_with(
+        (10, 1, 2, at(1, 18)), (11, 1, 2, at(2, 18)), (12, 2, 2, at(1, 20))
+    )
+    index.remove(11)
+    # A show moved later is not dropped by its old start
+    index.add(12, 2, 2, at(3, 20))
+
+    index.roll_forward(at(2, 19))
+
+    assert set(index.shows) == {12}
+    assert list(index.movies) == [2]
+
+
+def test_remaining_seats():
+    index = index_with((10, 1, 2, at(1, 18)), (11, 1, 3, at(1, 20)))
+    index.capacities = {2: 100, 3: 50}
+    index.reserved = {10: 7}
+
+    payload = json.loads(index.serialize(True))
+
+    assert [show["remaining_seats"] for show in payload[0]["shows"]] == [93, 50]
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+import api.routes.show_router as show_router
+from core.seat_occupancy import OccupancyCache, ShowOccupancy
+
+
+class SlowOccupancyCache(OccupancyCache):
+    """Loads a fixed hall of four seats after a delay, counting the loads."""
+
+    def __init__(self):
+        super().__init__(max_bytes=1 << 20, ttl=60)
+        self.loads = 0
+
+    async def _load(self, show_id, db):
+        self.loads += 1
+        await asyncio.sleep(0.01)
+        return ShowOccupancy([1, 2, 3, 4], [2])
+
+
+def test_concurrent_reads_share_one_load():
+    cache = SlowOccupancyCache()
+
+    async def main():
+        return await asyncio.gather(*(cache.get("krakow", 7, None) for _ in range(5)))
+
+    entries = asyncio.run(main())
+
+    assert cache.loads == 1
+    assert all(entry.reserved_seat_ids() == [2] for entry in entries)
+
+
+def test_waiters_reload_when_the_loading_request_is_cancelled():
+    cache = SlowOccupancyCache()
+
+    async def main():
+        loader = asyncio.create_task(cache.get("krakow", 7, None))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get("krakow", 7, None))
+        await asyncio.sleep(0)
+        loader.cancel()
+        return await asyncio.wait_for(waiter, timeout=1)
+
+    entry = asyncio.run(main())
+
+    assert entry.reserved_seat_ids() == [2]
+    assert cache.loads == 2
+
+
+class ClosingSession:
+    """Stands in for AsyncSession, recording when it is closed."""
+
+    def __init__(self):
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+        return False
+
+
+def test_booking_page_stops_the_load_before_closing_its_session(monkeypatch):
+    class SessionCheckingCache(SlowOccupancyCache):
+        async def _load(self, show_id, db):
+            try:
+                return await super()._load(show_id, db)
+            finally:
+                self.closed_during_load = db.closed
+
+    async def failing_fetch(show_id, db):
+        await asyncio.sleep(0.001)
+        raise RuntimeError("show lookup failed")
+
+    cache = SessionCheckingCache()
+    monkeypatch.setattr(show_router, "occupancy_cache", cache)
+    monkeypatch.setattr(show_router, "sessions", {"krakow": ClosingSession})
+    monkeypatch.setattr(show_router, "fetch_show_for_reservation", failing_fetch)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(
+            show_router.get_booking_page(
+                show_id=7, region="krakow", request=None, db=None
+            )
+        )
+
+    assert cache.closed_during_load is False
@@ -0,0 +1,186 @@
+import asyncio
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from api.routes.show_router import add_show, bulk_add_shows
+from core import (
+    HallDay,
+    MovieDemand,
+    opening_hours,
+    plan_timetable,
+    recurrence_count,
+    recurrence_starts,
+    resolve_schedule,
+    sweep_conflicts,
+)
+from schemas import ShowBase
+from schemas.show_schema import ShowRecurrence, ShowSchedule
+
+
+def at(hour, minute=0):
+    return datetime(2025, 5, 1, hour, minute)
+
+
+def test_accepts_back_to_back_shows():
+    candidates = [(0, at(10), at(12)), (1, at(12), at(14))]
+    assert sweep_conflicts(candidates, []) == {}
+
+
+def test_rejects_overlap_with_existing_shows():
+    existing = [(7, at(9), at(11)), (8, at(11), at(13)), (9, at(20), at(22))]
+    candidates = [(0, at(10, 30), at(11, 30)), (1, at(13), at(15))]
+    assert sweep_conflicts(candidates, existing) == {
+        0: [{"show_id": 7}, {"show_id": 8}]
+    }
+
+
+def test_earlier_start_wins_between_requested_shows():
+    # Item 1 starts before item 0, so it wins despite coming later
+    candidates = [(0, at(15), at(17)), (1, at(14), at(16))]
+    assert sweep_conflicts(candidates, []) == {0: [{"item": 1}]}
+
+
+def test_request_order_breaks_ties_between_equal_starts():
+    candidates = [(0, at(15), at(17)), (1, at(14), at(16)), (2, at(14), at(15))]
+    assert sweep_conflicts(candidates, []) == {
+        0: [{"item": 1}],
+        2: [{"item": 1}],
+    }
+
+
+def test_rejected_item_does_not_block_later_items():
+    existing = [(5, at(10), at(12))]
+    candidates = [(0, at(11), at(13, 30)), (1, at(13), at(15))]
+    assert sweep_conflicts(candidates, existing) == {0: [{"show_id": 5}]}
+
+
+def test_recurrence_on_selected_weekdays():
+    starts = recurrence_starts(
+        date(2025, 5, 1), date(2025, 5, 7), [time(20), time(17, 30)], weekdays=[4, 5]
+    )
+    assert starts == [
+        datetime(2025, 5, 2, 17, 30),
+        datetime(2025, 5, 2, 20),
+        datetime(2025, 5, 3, 17, 30),
+        datetime(2025, 5, 3, 20),
+    ]
+
+
+@pytest.mark.parametrize("weekdays", [None, [0], [4, 5], [6, 0, 3]])
+@pytest.mark.parametrize("days", [1, 6, 7, 8, 30])
+def test_recurrence_count_matches_expansion(days, weekdays):
+    start = date(2025, 5, 1)
+    end = start + timedelta(days=days - 1)
+    times = [time(17), time(20)]
+    assert recurrence_count(start, end, times, weekdays) == len(
+        recurrence_starts(start, end, times, weekdays)
+    )
+
+
+def recurrence(**fields) -> dict:
+    return {
+        "movie_id": 1,
+        "hall_id": 1,
+        "price": 20.0,
+        "start_date": date(2025, 5, 1),
+        "end_date": date(2025, 5, 7),
+        "times": [time(20)],
+        **fields,
+    }
+
+
+@pytest.mark.parametrize(
+    "fields", [{"end_date": date(2025, 4, 30)}, {"weekdays": [0, 7]}]
+)
+def test_recurrence_rejects_invalid_rules(fields):
+    with pytest.raises(ValidationError):
+        ShowRecurrence(**recurrence(**fields))
+
+
+def test_oversized_recurrence_is_rejected_before_expansion():
+    hourly_for_a_century = recurrence(
+        end_date=date(2125, 5, 1), times=[time(hour) for hour in range(24)]
+    )
+    schedule = ShowSchedule(recurrences=[hourly_for_a_century])
+
+    # The database is never reached: the rule is sized without expanding it
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(bulk_add_shows(schedule, region="krakow", dry_run=True, db=None))
+
+    assert error.value.status_code == 400
+
+
+class ScriptedSession:
+    """Stands in for AsyncSession, answering each query with the next scripted rows."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+
+    async def execute(self, statement):
+        rows = self.answers.pop(0)
+        return SimpleNamespace(
+            all=lambda: rows,
+            first=lambda: rows[0] if rows else None,
+            scalars=lambda: SimpleNamespace(all=lambda: rows),
+        )
+
+
+def test_show_longer_than_the_max_span_is_rejected():
+    db = ScriptedSession([SimpleNamespace(id=1, runtime=9 * 60)])
+    show = ShowBase(movie_id=1, hall_id=1, start_time=at(10), price=20.0)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(add_show(show, region="krakow", db=db))
+
+    assert error.value.status_code == 400
+
+
+def test_bulk_show_longer_than_the_max_span_fails_alone():
+    db = ScriptedSession([(1, 9 * 60), (2, 120)], [1], [])
+    shows = [
+        ShowBase(movie_id=1, hall_id=1, start_time=at(10), price=20.0),
+        ShowBase(movie_id=2, hall_id=1, start_time=at(10), price=20.0),
+    ]
+
+    outcomes = asyncio.run(resolve_schedule(db, shows))
+
+    assert [o["status"] for o in outcomes] == ["failed", "accepted"]
+
+
+def test_timetable_packs_halls_within_opening_hours():
+    day = date(2025, 5, 1)
+    hall_days = [
+        HallDay(hall_id, day, *opening_hours(day, time(10), time(23)))
+        for hall_id in (1, 2)
+    ]
+    hall_days[0].block(datetime(2025, 5, 1, 10), datetime(2025, 5, 1, 12, 15))
+    movies = [
+        MovieDemand(1, 120, 4, 20.0),
+        MovieDemand(2, 95, 3, 18.0, hall_ids=[2]),
+    ]
+
+    plan = plan_timetable(hall_days, movies, timedelta(minutes=5))
+
+    shows = sorted((hall.hall_id, start, end) for _, hall, start, end in plan)
+    assert [movie.movie_id for movie, _, _, _ in plan].count(1) == 4
+    assert [movie.movie_id for movie, _, _, _ in plan].count(2) == 3
+    for hall_id, start, end in shows:
+        assert start >= datetime(2025, 5, 1, 10)
+        assert end - timedelta(minutes=15) <= datetime(2025, 5, 1, 23)
+        assert start.minute % 5 == 0
+    for first, second in zip(shows, shows[1:]):
+        if first[0] == second[0]:
+            assert first[2] <= second[1]
+    assert (1, datetime(2025, 5, 1, 12, 15), datetime(2025, 5, 1, 14, 30)) in shows
+
+
+def test_timetable_stops_when_halls_are_full():
+    day = date(2025, 5, 1)
+    hall_days = [HallDay(1, day, *opening_hours(day, time(18), time(22)))]
+    movies = [MovieDemand(1, 100, 5, 20.0)]
+    plan = plan_timetable(hall_days, movies, timedelta(minutes=15))
+    assert [start.time() for _, _, start, _ in plan] == [time(18), time(20)]
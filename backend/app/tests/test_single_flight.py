@@ -0,0 +1,93 @@
+import asyncio
+from itertools import count
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from core.single_flight import FlightResult, SingleFlight
+
+
+def make_request(client="10.0.0.1"):
+    return Request({"type": "http", "headers": [], "client": (client, 1234)})
+
+
+def test_concurrent_identical_reads_share_one_fetch():
+    flights = SingleFlight(0, {}, 10)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return FlightResult(b"[1]")
+
+    async def main():
+        return await asyncio.gather(
+            *(
+                flights.run(make_request(), "movies.get", "krakow", {"limit": 20}, fetch)
+                for _ in range(10)
+            ),
+            flights.run(make_request(), "movies.get", "warsaw", {"limit": 20}, fetch),
+        )
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 2
+    assert {result.body for result in results} == {b"[1]"}
+    assert flights.stats()["routes"]["movies.get"] == {
+        "executed": 2,
+        "coalesced": 9,
+        "fresh": 0,
+        "stale": 0,
+        "bypassed": 0,
+        "failed": 0,
+    }
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_fresh_result_is_served_then_revalidated_once_stale():
+    flights = SingleFlight(0.05, {"show.get_details": 60}, 10)
+    versions = count(1)
+
+    async def fetch():
+        await asyncio.sleep(0)
+        return FlightResult(b"[%d]" % next(versions))
+
+    async def read():
+        return await flights.run(
+            make_request(), "show.get_details", "krakow", {"cursor": None}, fetch
+        )
+
+    async def main():
+        first = await read()
+        fresh = await read()
+        await asyncio.sleep(0.06)
+        # Served stale while (2) is fetched
+        stale = await read()
+        await asyncio.sleep(0.01)
+        refreshed = await read()
+        flights.invalidate("krakow")
+        after_write = await read()
+        return first, fresh, stale, refreshed, after_write
+
+    bodies = [result.body for result in asyncio.run(main())]
+
+    assert bodies == [b"[1]", b"[1]", b"[1]", b"[2]", b"[3]"]
+    counters = flights.stats()["routes"]["show.get_details"]
+    assert (counters["executed"], counters["fresh"], counters["stale"]) == (3, 2, 1)
+
+
+def test_rejected_request_is_not_counted_as_failed(caplog):
+    flights = SingleFlight(0, {}, 10)
+
+    async def fetch():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    async def main():
+        await flights.run(make_request(), "movies.get", "krakow", {"cursor": "x"}, fetch)
+
+    with pytest.raises(HTTPException):
+        asyncio.run(main())
+
+    assert flights.stats()["routes"]["movies.get"]["failed"] == 0
+    assert "Coalesced read failed" not in caplog.text
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from core import TmdbClient, TmdbError
+
+
+class StubTmdb:
+    """Local stand-in for the TMDB API, answering `/movie/<id>` from a script."""
+
+    def __init__(self):
+        self.requests = []
+        self.failures = {}
+        self.delay = 0
+        self.delays = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                tmdb_id = int(url.path.rsplit("/", 1)[-1])
+                with stub.lock:
+                    stub.requests.append((tmdb_id, parse_qs(url.query)))
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    pending = stub.failures.get(tmdb_id)
+                    status = pending.pop(0) if pending else 200
+                time.sleep(stub.delays.get(tmdb_id, stub.delay))
+                with stub.lock:
+                    stub.in_flight -= 1
+
+                body = json.dumps({"id": tmdb_id, "title": f"Movie {tmdb_id}"})
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body.encode())
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubTmdb()
+    yield server
+    server.close()
+
+
+def make_client(stub, **kwargs):
+    options = dict(timeout=2, retries=2, max_concurrency=4, backoff_factor=0)
+    options.update(kwargs)
+    return TmdbClient(stub.url, "secret", **options)
+
+
+def test_fetches_movie_with_key_and_language(stub):
+    client = make_client(stub)
+    data = asyncio.run(client.fetch_movie(603, "pl-PL"))
+    client.close()
+
+    assert data == {"id": 603, "title": "Movie 603"}
+    tmdb_id, params = stub.requests[0]
+    assert tmdb_id == 603
+    assert params["api_key"] == ["secret"]
+    assert params["language"] == ["pl-PL"]
+
+
+def test_retries_transient_errors(stub):
+    stub.failures[1] = [503, 500]
+    client = make_client(stub)
+    data = asyncio.run(client.fetch_movie(1, "en-US"))
+    client.close()
+
+    assert data["id"] == 1
+    assert len(stub.requests) == 3
+
+
+def test_does_not_retry_not_found(stub):
+    stub.failures[2] = [404]
+    client = make_client(stub)
+    with pytest.raises(TmdbError) as error:
+        asyncio.run(client.fetch_movie(2, "en-US"))
+    client.close()
+
+    assert error.value.status_code == 404
+    assert len(stub.requests) == 1
+
+
+def test_times_out(stub):
+    stub.delay = 0.5
+    client = make_client(stub, timeout=0.1, retries=0)
+    with pytest.raises(TmdbError) as error:
+        asyncio.run(client.fetch_movie(3, "en-US"))
+    client.close()
+
+    assert error.value.status_code == 502
+
+
+def test_slow_movie_is_given_up_at_the_deadline(stub):
+    # Each attempt times out, so the retries alone would take over a second
+    stub.delays[5] = 0.5
+    client = make_client(stub, timeout=0.4, retries=2, deadline=0.3)
+
+    async def run():
+        started = time.monotonic()
+        results = await asyncio.gather(
+            client.fetch_movie(5, "en-US"),
+            client.fetch_movie(6, "en-US"),
+            return_exceptions=True,
+        )
+        return results, time.monotonic() - started
+
+    (slow, fast), elapsed = asyncio.run(run())
+    client.close()
+
+    assert isinstance(slow, TmdbError) and slow.status_code == 504
+    assert fast["id"] == 6
+    assert elapsed < 1
+
+
+def test_bounds_concurrency_without_blocking_the_loop(stub):
+    stub.delay = 0.1
+    client = make_client(stub, max_concurrency=2)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        movies = await asyncio.gather(*(client.fetch_movie(i, "en-US") for i in range(6)))
+        task.cancel()
+        return movies, ticks
+
+    movies, ticks = asyncio.run(run())
+    client.close()
+
+    assert [movie["id"] for movie in movies] == list(range(6))
+    assert stub.max_in_flight == 2
+    assert ticks >= 10
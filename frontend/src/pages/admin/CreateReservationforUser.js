@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from "react";
 import { useParams, useNavigate } from "react-router-dom";
-import api from "../../utils/api";
+import api, { fetchAllPages } from "../../utils/api";
 import HallView from "../../components/HallView";
 import RegionSelector from "../../components/RegionSelector";
 import Loading from "../../components/Loading";
@@ -31,7 +31,7 @@ const CreateReservationForUser = () => {
     const fetchUsers = async () => {
       try {
         const token = localStorage.getItem("token");
-        const { data } = await api.get("/users/get", {
+        const data = await fetchAllPages("/users/get", {
           headers: { Authorization: `Bearer ${token}` },
         });
         setUsers(data);
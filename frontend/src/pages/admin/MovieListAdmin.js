@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
-import api from "../../utils/api";
+import { fetchAllPages } from "../../utils/api";
 import RegionSelector from "../../components/RegionSelector";
 import BackButton from "../../components/BackButton";
 import Loading from "../../components/Loading";
@@ -19,8 +19,11 @@ const MovieListAdmin = () => {
       setLoading(true); // Show loading when region changes
       try {
         // Fetch movies for the selected region
-        const response = await api.get(`/movies/get?region=${selectedRegion}`);
-        const movies = response.data.map((movie) => ({
+        const movies = (
+          await fetchAllPages("/movies/get", {
+            params: { region: selectedRegion },
+          })
+        ).map((movie) => ({
           ...movie,
           region: selectedRegion,
         }));
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from "react";
-import api from "../../utils/api";
+import { fetchAllPages } from "../../utils/api";
 import BackButton from "../../components/BackButton";
 import Loading from "../../components/Loading";
 import ErrorMessage from "../../components/ErrorMessage";
@@ -18,13 +18,13 @@ const PaymetListAdmin = () => {
       setError(null);
       try {
         const token = localStorage.getItem("token");
-        const response = await api.get("/payment/get-all", {
+        const payments = await fetchAllPages("/payment/get-all", {
           params: { region: selectedRegion },
           headers: {
             Authorization: `Bearer ${token}`,
           },
         });
-        setPayments(response.data);
+        setPayments(payments);
       } catch (err) {
         setError("Failed to fetch payments.");
         console.error(err);
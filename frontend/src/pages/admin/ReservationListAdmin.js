@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from "react";
-import api from "../../utils/api";
+import api, { fetchAllPages, fetchUsersByIds } from "../../utils/api";
 import { useNavigate } from "react-router-dom";
 import RegionSelector from "../../components/RegionSelector";
 import BackButton from "../../components/BackButton";
@@ -29,19 +29,19 @@ const ReservationListAdmin = () => {
         if (!token)
           throw new Error("Authentication token is missing. Please log in.");
 
-        // Fetch users
-        const usersResponse = await api.get("/users/get", {
-          headers: { Authorization: `Bearer ${token}` },
-        });
-        setUsers(usersResponse.data);
-
-        // Fetch reservations
-        const response = await api.get("/reservation/get-all", {
+        // Fetch all pages of reservations
+        const reservations = await fetchAllPages("/reservation/get-all", {
           headers: { Authorization: `Bearer ${token}` },
           params: { region: selectedRegion },
         });
 
-        setReservations(response.data);
+        // Fetch only the users owning these reservations
+        const users = await fetchUsersByIds(
+          reservations.map((reservation) => reservation.user_id),
+          { headers: { Authorization: `Bearer ${token}` } }
+        );
+        setUsers(users);
+        setReservations(reservations);
       } catch (err) {
         setError(
           typeof err.response?.data?.detail === "string"
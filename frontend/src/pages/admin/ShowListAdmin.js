@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from "react";
-import api from "../../utils/api";
+import api, { fetchAllPages } from "../../utils/api";
 import { Link } from "react-router-dom";
 import RegionSelector from "../../components/RegionSelector";
 import BackButton from "../../components/BackButton";
@@ -16,11 +16,11 @@ const ShowListAdmin = () => {
   useEffect(() => {
     const fetchShows = async () => {
       try {
-        const response = await api.get("/show/get_details", {
+        const shows = await fetchAllPages("/show/get_details", {
           params: { region: selectedRegion },
         });
 
-        setShows(Array.isArray(response.data) ? response.data : []);
+        setShows(shows);
         setError(null); // Clear any previous errors
       } catch (err) {
         console.error(err);
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
-import api from "../../utils/api";
+import { fetchAllPages } from "../../utils/api";
 import BackButton from "../../components/BackButton";
 import Loading from "../../components/Loading";
 import ErrorMessage from "../../components/ErrorMessage";
@@ -17,12 +17,12 @@ const UserList = () => {
     const fetchUsers = async () => {
       try {
         const token = localStorage.getItem("token");
-        const response = await api.get("/users/get", {
+        const users = await fetchAllPages("/users/get", {
           headers: {
             Authorization: `Bearer ${token}`,
           },
         });
-        setUsers(response.data);
+        setUsers(users);
       } catch (err) {
         console.error("Error fetching users:", err);
         setError("Failed to fetch users. Please try again later.");
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
-import api from "../../utils/api";
+import { fetchAllPages } from "../../utils/api";
 import Loading from "../../components/Loading";
 import ErrorMessage from "../../components/ErrorMessage";
 import BackButton from "../../components/BackButton";
@@ -20,14 +20,17 @@ const ReservationsUserList = () => {
         const allReservations = [];
 
         for (const region of regions) {
-          const response = await api.get("/reservation/my-reservations", {
-            headers: {
-              Authorization: `Bearer ${token}`, // Include token in Authorization header
-            },
-            params: { region }, // Pass region as a parameter
-          });
+          const reservations = await fetchAllPages(
+            "/reservation/my-reservations",
+            {
+              headers: {
+                Authorization: `Bearer ${token}`, // Include token in Authorization header
+              },
+              params: { region }, // Pass region as a parameter
+            }
+          );
 
-          const reservationsWithDetails = response.data.map(
+          const reservationsWithDetails = reservations.map(
             (reservationData) => {
               const {
                 reservation,
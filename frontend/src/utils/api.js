@@ -27,4 +27,42 @@ api.interceptors.response.use(
   }
 );
 
+// Largest page the list endpoints return
+const PAGE_SIZE = 200;
+
+// Request every page of a paginated list endpoint, following the
+// X-Next-Cursor header until the last page
+export const fetchAllPages = async (url, config = {}) => {
+  const items = [];
+  let cursor = null;
+  do {
+    const response = await api.get(url, {
+      ...config,
+      params: {
+        ...config.params,
+        limit: PAGE_SIZE,
+        ...(cursor ? { cursor } : {}),
+      },
+    });
+    items.push(...response.data);
+    cursor = response.headers["x-next-cursor"];
+  } while (cursor);
+  return items;
+};
+
+// Fetch the users with the given IDs, in batches of one page
+export const fetchUsersByIds = async (ids, config = {}) => {
+  const uniqueIds = [...new Set(ids)];
+  const users = [];
+  for (let i = 0; i < uniqueIds.length; i += PAGE_SIZE) {
+    const batch = await fetchAllPages("/users/get", {
+      ...config,
+      params: { ...config.params, ids: uniqueIds.slice(i, i + PAGE_SIZE) },
+      paramsSerializer: { indexes: null },
+    });
+    users.push(...batch);
+  }
+  return users;
+};
+
 export default api;
\ No newline at end of file
@@ -0,0 +1,41 @@
+import api, { fetchUsersByIds } from "./api";
+
+// Answers like /users/get: the requested users in ID order, one page at a
+// time, with the cursor of the next page in X-Next-Cursor
+const usersEndpoint = (url, { params }) => {
+  const after = params.cursor ? Number(params.cursor) : 0;
+  const matching = params.ids.filter((id) => id > after).sort((a, b) => a - b);
+  const page = matching.slice(0, Math.min(params.limit ?? 50, 200));
+  const more = matching.length > page.length;
+  return Promise.resolve({
+    data: page.map((id) => ({ id })),
+    headers: more ? { "x-next-cursor": String(page[page.length - 1]) } : {},
+  });
+};
+
+afterEach(() => {
+  jest.restoreAllMocks();
+});
+
+test("fetches every requested user beyond the default page size", async () => {
+  const get = jest.spyOn(api, "get").mockImplementation(usersEndpoint);
+  const ids = Array.from({ length: 120 }, (_, i) => i + 1);
+
+  const users = await fetchUsersByIds([...ids, 7, 42]);
+
+  expect(users.map((user) => user.id)).toEqual(ids);
+  expect(get).toHaveBeenCalledTimes(1);
+  expect(get.mock.calls[0][1].params.limit).toBe(200);
+});
+
+test("fetches more users than fit on a page in batches", async () => {
+  const get = jest.spyOn(api, "get").mockImplementation(usersEndpoint);
+  const ids = Array.from({ length: 450 }, (_, i) => i + 1);
+
+  const users = await fetchUsersByIds(ids);
+
+  expect(users.map((user) => user.id)).toEqual(ids);
+  expect(get.mock.calls.map(([, config]) => config.params.ids.length)).toEqual([
+    200, 200, 50,
+  ]);
+});